@@ -3,6 +3,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict, Any
 import logging
 
+from app.core.config import (
+    MAX_UPLOAD_SIZE, INFERENCE_MODE, LLM_MODEL_ID, ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL_SECONDS,
+    SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MIN_OVERLAP,
+    SEMANTIC_CACHE_AUDIT_RATE, SEMANTIC_CACHE_AUDIT_MIN_SIMILARITY
+)
 from app.core.token_generator import verify_token as verify_jwt_token
 from app.services.application_facade import ApplicationFacade
 from app.services.implementations.admin_service import JwtAdminService
@@ -10,11 +15,19 @@ from app.services.implementations.document_service import PdfDocumentService
 from app.services.implementations.document_service import QdrantVectorService
 from app.services.implementations.pdf_processor import PdfProcessor
 from app.services.implementations.local_llm_service import LocalLlmService
+from app.services.implementations.remote_llm_service import RemoteLlmService
+from app.services.implementations.openai_llm_service import OpenAiLlmService
+from app.services.interfaces.llm_interface import LlmInterface
+from app.services.implementations.ingestion_service import IngestionJobService
+from app.services.utils.answer_cache import AnswerCache
+from app.services.utils.semantic_answer_cache import SemanticAnswerCache
 
 
 # Repositories
 from app.persistence.mongodb.admin_repository import AdminMongoRepository
 from app.persistence.mongodb.document_repository import DocumentMongoRepository
+from app.persistence.mongodb.job_repository import JobMongoRepository
+from app.persistence.mongodb.corpus_repository import CorpusMongoRepository
 from app.persistence.qdrant.vector_repository import VectorQdrantRepository
 
 from app.api.schemas.auth import TokenData
@@ -31,6 +44,8 @@ class ServiceFactory:
         self._admin_repo = AdminMongoRepository()
         self._document_repo = DocumentMongoRepository()
         self._vector_repo = VectorQdrantRepository()
+        self._job_repo = JobMongoRepository()
+        self._corpus_repo = CorpusMongoRepository()
         
         # Services
         self._admin_service = None
@@ -38,6 +53,7 @@ class ServiceFactory:
         self._vector_service = None
         self._llm_service = None
         self._pdf_processor = None
+        self._ingestion_service = None
         self._facade = None
     
     def get_admin_service(self) -> JwtAdminService:
@@ -50,9 +66,14 @@ class ServiceFactory:
             self._vector_service = QdrantVectorService(self._vector_repo)
         return self._vector_service
     
-    def get_llm_service(self) -> LocalLlmService:
+    def get_llm_service(self) -> LlmInterface:
         if self._llm_service is None:
-            self._llm_service = LocalLlmService()
+            if INFERENCE_MODE == "remote":
+                self._llm_service = RemoteLlmService()
+            elif INFERENCE_MODE == "openai":
+                self._llm_service = OpenAiLlmService()
+            else:
+                self._llm_service = LocalLlmService()
         return self._llm_service
     
     def get_pdf_processor(self) -> PdfProcessor:
@@ -65,17 +86,51 @@ class ServiceFactory:
             self._document_service = PdfDocumentService(
                 self._document_repo,
                 self.get_vector_service(),
-                self.get_pdf_processor()
+                self.get_pdf_processor(),
+                self._corpus_repo
             )
         return self._document_service
     
+    def get_ingestion_service(self) -> IngestionJobService:
+        if self._ingestion_service is None:
+            self._ingestion_service = IngestionJobService(
+                self._job_repo,
+                self.get_document_service()
+            )
+        return self._ingestion_service
+    
+    def get_answer_cache(self) -> Optional[AnswerCache]:
+        if ANSWER_CACHE_SIZE <= 0:
+            return None
+        return AnswerCache(
+            LLM_MODEL_ID,
+            LocalLlmService.rag_prompt_version(),
+            max_entries=ANSWER_CACHE_SIZE,
+            ttl_seconds=ANSWER_CACHE_TTL_SECONDS
+        )
+    
+    def get_semantic_cache(self) -> Optional[SemanticAnswerCache]:
+        if SEMANTIC_CACHE_SIZE <= 0:
+            return None
+        return SemanticAnswerCache(
+            max_entries=SEMANTIC_CACHE_SIZE,
+            threshold=SEMANTIC_CACHE_THRESHOLD,
+            min_overlap=SEMANTIC_CACHE_MIN_OVERLAP,
+            ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+            audit_rate=SEMANTIC_CACHE_AUDIT_RATE,
+            audit_min_similarity=SEMANTIC_CACHE_AUDIT_MIN_SIMILARITY
+        )
+    
     def get_application_facade(self) -> ApplicationFacade:
         if self._facade is None:
             self._facade = ApplicationFacade(
                 self.get_admin_service(),
                 self.get_document_service(),
                 self.get_vector_service(),
-                self.get_llm_service()
+                self.get_llm_service(),
+                self.get_ingestion_service(),
+                self.get_answer_cache(),
+                self.get_semantic_cache()
             )
         return self._facade
 
@@ -143,12 +198,11 @@ def validate_file_upload(file: UploadFile) -> UploadFile:
             detail="Seuls les fichiers PDF sont acceptés"
         )
     
-    # Vérifier la taille (exemple: max 50MB)
-    max_size = 50 * 1024 * 1024  # 50MB
-    if hasattr(file, 'size') and file.size and file.size > max_size:
+    # Vérifier la taille annoncée ; la limite est de toute façon appliquée pendant la copie sur disque
+    if hasattr(file, 'size') and file.size and file.size > MAX_UPLOAD_SIZE:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="Fichier trop volumineux (max 50MB)"
+            detail=f"Fichier trop volumineux (max {MAX_UPLOAD_SIZE // (1024 * 1024)}MB)"
         )
     
     return file
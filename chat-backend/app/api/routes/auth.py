@@ -5,6 +5,7 @@ import logging
 from app.api.schemas.auth import LoginRequest, TokenResponse, TokenData
 from app.api.deps import get_services, get_current_user
 from app.services.application_facade import ApplicationFacade
+from app.core.executors import run_cpu
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 logger = logging.getLogger(__name__)
@@ -24,7 +25,8 @@ async def login(
     try:
         logger.info(f"Tentative de connexion pour: {request.username}")
         
-        result = services.login(request.username, request.password)
+        # bcrypt est volontairement coûteux : hors de l'event loop
+        result = await run_cpu(services.login, request.username, request.password)
         
         logger.info(f"Connexion réussie pour: {request.username}")
         
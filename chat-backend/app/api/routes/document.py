@@ -1,51 +1,53 @@
 # app/api/routes/document.py
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Depends
-from typing import List
+from typing import List, Optional
 import logging
-import time
 
 from app.api.schemas.document import (
-    UploadResponse, DocumentListResponse, DeleteResponse, 
-    DocumentMetadata, DocumentDetailResponse
+    DocumentListResponse, DeleteResponse,
+    DocumentMetadata, DocumentDetailResponse,
+    IngestionJobResponse, IngestionJobStatusResponse
 )
 from app.api.deps import get_services, require_admin, validate_file_upload, paginate
 from app.services.application_facade import ApplicationFacade
+from app.core.executors import run_io
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 logger = logging.getLogger(__name__)
 
 @router.post("/upload",
-             response_model=UploadResponse,
+             response_model=IngestionJobResponse,
+             status_code=status.HTTP_202_ACCEPTED,
              summary="Uploader un fichier PDF",
-             description="Upload et vectorise un fichier PDF")
+             description="Enregistre un fichier PDF et planifie sa vectorisation en arrière-plan")
 async def upload_pdf(
     system_name: str = Form(..., description="Nom du système source"),
     file: UploadFile = File(..., description="Fichier PDF à uploader"),
+    chunking_strategy: Optional[str] = Form(
+        None, description='Découpage : "semantic" ou "token_window" (défaut : configuration serveur)'
+    ),
     current_user: dict = Depends(require_admin),
     services: ApplicationFacade = Depends(get_services),
     validated_file: UploadFile = Depends(validate_file_upload)
 ):
     """
-    Upload, traite et vectorise un fichier PDF
+    Enregistre le PDF et retourne immédiatement l'identifiant du job d'ingestion
     """
-    start_time = time.time()
-    
     try:
         logger.info(f"Upload du fichier '{file.filename}'")
         
         # Reset file pointer after validation
         await file.seek(0)
         
-        result = await services.upload_and_vectorize_document(file, system_name)
-        
-        processing_time = time.time() - start_time
-        logger.info(f"Fichier '{file.filename}' traité en {processing_time:.2f}s")
+        # Copie sur disque par blocs, hors de l'event loop
+        job = await run_io(
+            services.submit_document_ingestion, file, system_name, chunking_strategy
+        )
         
-        return UploadResponse(
-            status=result["status"],
-            message=result["message"],
-            file_hash=result["file_hash"],
-            document_id=result.get("document_id")
+        return IngestionJobResponse(
+            status=job["status"],
+            message="Document enregistré, vectorisation en cours",
+            job_id=job["job_id"]
         )
         
     except HTTPException:
@@ -57,6 +59,80 @@ async def upload_pdf(
             detail="Erreur lors du traitement du fichier"
         )
 
+@router.put("/replace",
+            response_model=IngestionJobResponse,
+            status_code=status.HTTP_202_ACCEPTED,
+            summary="Remplacer un document",
+            description="Planifie la mise à jour incrémentale du document de même nom et même système")
+async def replace_pdf(
+    system_name: str = Form(..., description="Nom du système source"),
+    file: UploadFile = File(..., description="Nouvelle version du fichier PDF"),
+    chunking_strategy: Optional[str] = Form(
+        None, description='Découpage : "semantic" ou "token_window" (défaut : configuration serveur)'
+    ),
+    current_user: dict = Depends(require_admin),
+    services: ApplicationFacade = Depends(get_services),
+    validated_file: UploadFile = Depends(validate_file_upload)
+):
+    """
+    Enregistre la nouvelle version et retourne l'identifiant du job de remplacement
+    """
+    try:
+        logger.info(f"Remplacement du fichier '{file.filename}' ({system_name})")
+        
+        await file.seek(0)
+        
+        job = await run_io(
+            services.submit_document_replacement, file, system_name, chunking_strategy
+        )
+        
+        return IngestionJobResponse(
+            status=job["status"],
+            message="Nouvelle version enregistrée, mise à jour en cours",
+            job_id=job["job_id"]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors du remplacement: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors du traitement du fichier"
+        )
+
+@router.get("/jobs/{job_id}",
+            response_model=IngestionJobStatusResponse,
+            summary="État d'un job d'ingestion",
+            description="Récupère l'avancement, les étapes et la durée d'un job d'ingestion")
+async def get_ingestion_job(
+    job_id: str,
+    current_user: dict = Depends(require_admin),
+    services: ApplicationFacade = Depends(get_services)
+):
+    """
+    Retourne l'état d'un job d'ingestion
+    """
+    try:
+        job = await run_io(services.get_ingestion_job, job_id)
+        
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job non trouvé"
+            )
+        
+        return IngestionJobStatusResponse(**job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération du job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la récupération du job"
+        )
+
 @router.get("/",
             response_model=DocumentListResponse,
             summary="Lister tous les documents",
@@ -70,7 +146,7 @@ async def list_documents(
     Récupère la liste paginée des documents
     """
     try:
-        documents_data = services.get_all_documents()
+        documents_data = await run_io(services.get_all_documents)
         
         # Application de la pagination
         skip = pagination["skip"]
@@ -109,7 +185,7 @@ async def get_document_details(
     Récupère les détails d'un document spécifique
     """
     try:
-        doc_data = services.get_document_by_hash(file_hash)
+        doc_data = await run_io(services.get_document_by_hash, file_hash)
         
         if "error" in doc_data:
             raise HTTPException(
@@ -149,7 +225,7 @@ async def delete_document(
     try:
         logger.info(f"Suppression du document {file_hash}")
         
-        result = services.delete_document_by_hash(file_hash)
+        result = await run_io(services.delete_document_by_hash, file_hash)
         
         return DeleteResponse(
             status=result.get("status", "success"),
@@ -176,7 +252,7 @@ async def health_check(
     Endpoint de vérification de santé
     """
     try:
-        health_status = services.health_check()
+        health_status = await run_io(services.health_check)
         return health_status
         
     except Exception as e:
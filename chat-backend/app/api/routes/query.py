@@ -1,5 +1,8 @@
 # app/api/routes/query.py
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict
+import json
 import logging
 import time
 
@@ -9,6 +12,7 @@ from app.api.schemas.query import (
 )
 from app.api.deps import get_services, optional_auth
 from app.services.application_facade import ApplicationFacade
+from app.core.executors import run_io
 
 router = APIRouter(prefix="/search", tags=["Search & RAG"])
 logger = logging.getLogger(__name__)
@@ -30,7 +34,7 @@ async def query_with_rag(
     try:
         logger.info(f"Requête RAG: '{request.question[:50]}...'")
         
-        result = services.search_and_generate_answer(
+        result = await services.search_and_generate_answer(
             question=request.question,
             top_k=request.top_k
         )
@@ -42,9 +46,12 @@ async def query_with_rag(
             answer=result["answer"],
             sources_count=result["sources_count"],
             chunks_used=result["chunks_used"],
-            processing_time=processing_time
+            processing_time=processing_time,
+            from_cache=result["from_cache"]
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur lors de la requête RAG: {str(e)}")
         raise HTTPException(
@@ -52,6 +59,55 @@ async def query_with_rag(
             detail="Erreur lors du traitement de la requête"
         )
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Formate un événement Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/query/stream",
+             summary="Question avec RAG (streaming)",
+             description="Pose une question et reçoit la réponse en Server-Sent Events : "
+                         "métadonnées de recherche, puis tokens au fil de la génération",
+             response_class=StreamingResponse)
+async def query_with_rag_stream(
+    request: QueryRequest,
+    http_request: Request,
+    services: ApplicationFacade = Depends(get_services),
+    current_user: dict = Depends(optional_auth)
+):
+    """
+    Recherche sémantique + génération de réponse en streaming.
+    Événements : metadata, token (répétés), done ; error en cas d'échec.
+    La génération est interrompue si le client se déconnecte.
+    """
+    logger.info(f"Requête RAG (streaming): '{request.question[:50]}...'")
+    # File de génération pleine : 429 avant d'ouvrir le flux
+    await run_io(services.ensure_generation_capacity)
+    events = services.stream_search_and_answer(
+        question=request.question,
+        top_k=request.top_k
+    )
+    
+    async def event_stream():
+        try:
+            async for event in events:
+                if await http_request.is_disconnected():
+                    logger.info("Client déconnecté, arrêt de la génération")
+                    break
+                yield _sse(event["event"], event["data"])
+        except HTTPException as e:
+            yield _sse("error", {"status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error(f"Erreur lors de la requête RAG en streaming: {str(e)}")
+            yield _sse("error", {"detail": "Erreur lors du traitement de la requête"})
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/semantic",
              response_model=SearchResult,
              summary="Recherche sémantique pure",
@@ -67,7 +123,7 @@ async def semantic_search(
     try:
         logger.info(f"Recherche sémantique: '{request.question[:50]}...'")
         
-        results = services.semantic_search_only(
+        results = await services.semantic_search_only(
             question=request.question,
             top_k=request.top_k
         )
@@ -146,7 +202,9 @@ async def get_search_stats(
             "total_queries": 0,  # À récupérer depuis une base de données
             "avg_processing_time": 0.0,
             "most_common_topics": [],
-            "documents_indexed": len(services.get_all_documents())
+            "documents_indexed": len(await run_io(services.get_all_documents)),
+            "generation": await run_io(services.get_generation_stats),
+            "query_embeddings": services.get_embedding_stats()
         }
         
         return stats
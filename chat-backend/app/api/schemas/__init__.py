@@ -6,5 +6,6 @@ from .query import *
 __all__ = [
     'LoginRequest', 'TokenResponse', 'TokenData',
     'UploadResponse', 'DocumentMetadata', 'DeleteResponse', 'DocumentListResponse',
+    'IngestionJobResponse', 'IngestionJobStatusResponse',
     'QueryRequest', 'QueryResponse', 'RetrievedChunk', 'SearchResult'
 ]
\ No newline at end of file
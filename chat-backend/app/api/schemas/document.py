@@ -29,3 +29,30 @@ class DocumentDetailResponse(BaseModel):
     metadata: DocumentMetadata = Field(..., description="Métadonnées du document")
     chunks_count: Optional[int] = Field(None, description="Nombre de chunks vectorisés")
     last_accessed: Optional[datetime] = Field(None, description="Dernier accès")
+
+class IngestionJobResponse(BaseModel):
+    status: str = Field(..., description="Statut du job d'ingestion")
+    message: str = Field(..., description="Message descriptif")
+    job_id: str = Field(..., description="Identifiant du job d'ingestion")
+
+class IngestionStage(BaseModel):
+    status: str = Field(..., description="Statut de l'étape")
+    started_at: Optional[datetime] = Field(None, description="Début de l'étape")
+    duration: Optional[float] = Field(None, description="Durée de l'étape en secondes")
+
+class IngestionJobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="Identifiant du job d'ingestion")
+    filename: str = Field(..., description="Nom du fichier")
+    system_name: str = Field(..., description="Nom du système source")
+    mode: str = Field(default="create", description="create (nouveau document) ou replace (nouvelle version)")
+    chunking_strategy: Optional[str] = Field(None, description="Stratégie de découpage demandée (défaut : configuration serveur)")
+    status: str = Field(..., description="queued, running, completed ou failed")
+    current_stage: Optional[str] = Field(None, description="Étape en cours")
+    progress: float = Field(..., description="Avancement en pourcentage")
+    stages: Dict[str, IngestionStage] = Field(default_factory=dict, description="Détail et durée de chaque étape")
+    chunks_count: Optional[int] = Field(None, description="Nombre de chunks vectorisés")
+    file_hash: Optional[str] = Field(None, description="Hash du document indexé")
+    document_id: Optional[str] = Field(None, description="ID du document en base")
+    error: Optional[str] = Field(None, description="Message d'erreur en cas d'échec")
+    created_at: datetime = Field(..., description="Date de création du job")
+    updated_at: datetime = Field(..., description="Dernière mise à jour du job")
@@ -20,6 +20,7 @@ class QueryResponse(BaseModel):
     sources_count: int = Field(..., description="Nombre de sources utilisées")
     chunks_used: List[str] = Field(default_factory=list, description="Aperçu des chunks utilisés")
     processing_time: Optional[float] = Field(None, description="Temps de traitement en secondes")
+    from_cache: bool = Field(False, description="Réponse servie depuis le cache de réponses")
 
 class SearchResult(BaseModel):
     results: List[RetrievedChunk] = Field(..., description="Résultats de la recherche")
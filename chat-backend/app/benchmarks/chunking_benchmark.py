@@ -0,0 +1,101 @@
+"""
+Compare les stratégies de découpage ("semantic", "token_window") sur un corpus d'exemple.
+
+Usage :
+    python -m app.benchmarks.chunking_benchmark <dossier_pdfs> [--queries questions.jsonl] [--k 5]
+
+Pour chaque stratégie : temps de découpage et d'embedding des chunks (hors cache),
+nombre et taille moyenne des chunks, et rappel@k d'une recherche par similarité cosinus.
+`--queries` : fichier JSONL de lignes {"question": ..., "expected": ...} où `expected` est
+un extrait du texte attendu. Sans ce fichier, des phrases du corpus tirées au hasard
+servent à la fois de question et d'extrait attendu.
+"""
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.config import CHUNKING_STRATEGIES
+from app.core.embedding import embed_model
+from app.services.implementations.pdf_processor import PdfProcessor
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def sample_queries(texts: List[str], count: int, seed: int = 0) -> List[Tuple[str, str]]:
+    sentences = [
+        sentence.strip()
+        for text in texts
+        for sentence in re.split(r"(?<=[.!?])\s+", text)
+        if 40 <= len(sentence.strip()) <= 300
+    ]
+    random.Random(seed).shuffle(sentences)
+    return [(sentence, sentence) for sentence in sentences[:count]]
+
+
+def load_queries(path: Path) -> List[Tuple[str, str]]:
+    with path.open(encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["question"], row["expected"]) for row in rows]
+
+
+def _unit(vectors: List[List[float]]) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def run(texts: List[str], queries: List[Tuple[str, str]], k: int) -> None:
+    processor = PdfProcessor()
+    query_vectors = _unit(embed_model.get_text_embedding_batch([q for q, _ in queries]))
+    print(f"{len(queries)} requêtes, rappel@{k}")
+    print(f"{'stratégie':<13} {'chunks':>7} {'tokens moy.':>12} {'découpage':>10} {'embedding':>10} {'rappel':>7}")
+
+    for strategy in CHUNKING_STRATEGIES:
+        start = time.perf_counter()
+        nodes = [node for i, text in enumerate(texts) for node in processor.split_text(text, f"doc{i}", strategy)]
+        split_time = time.perf_counter() - start
+
+        chunks = [node.text for node in nodes]
+        start = time.perf_counter()
+        chunk_vectors = _unit(embed_model.get_text_embedding_batch(chunks))
+        embed_time = time.perf_counter() - start
+
+        tokenizer = processor.get_token_window_splitter().tokenizer
+        mean_tokens = np.mean([len(tokenizer(c, add_special_tokens=False)["input_ids"]) for c in chunks])
+
+        normalized = [_normalize(chunk) for chunk in chunks]
+        top_k = np.argsort(-(query_vectors @ chunk_vectors.T), axis=1)[:, :k]
+        hits = sum(
+            any(_normalize(expected) in normalized[j] for j in row)
+            for (_, expected), row in zip(queries, top_k)
+        )
+        print(f"{strategy:<13} {len(chunks):>7} {mean_tokens:>12.1f} {split_time:>9.2f}s "
+              f"{embed_time:>9.2f}s {hits / len(queries):>7.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus_dir", type=Path)
+    parser.add_argument("--queries", type=Path, default=None)
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = sorted(args.corpus_dir.glob("*.pdf"))
+    if not corpus:
+        raise SystemExit(f"Aucun PDF trouvé dans {args.corpus_dir}")
+
+    processor = PdfProcessor()
+    texts = [processor.clean_text(processor.extract_full_text(str(pdf))) for pdf in corpus]
+    queries = load_queries(args.queries) if args.queries else sample_queries(texts, args.samples)
+    if not queries:
+        raise SystemExit("Aucune requête disponible")
+    run(texts, queries, args.k)
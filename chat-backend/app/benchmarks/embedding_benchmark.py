@@ -0,0 +1,88 @@
+"""
+Compare les backends d'embedding (torch, onnx, onnx-int8) sur des chunks d'un corpus d'exemple.
+
+Usage :
+    python -m app.benchmarks.embedding_benchmark <dossier_pdfs> [--backends torch,onnx,onnx-int8]
+        [--max-chunks 512] [--min-cosine 0.98]
+
+Pour chaque backend : débit en lots (chunks/s), latence d'une requête unitaire (ms),
+et parité avec le backend de référence (le premier de la liste) : similarité cosinus
+moyenne et minimale entre les vecteurs des mêmes textes. Le script sort en erreur si
+la similarité minimale passe sous --min-cosine.
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from app.core.embedding import build_embed_model
+from app.services.implementations.pdf_processor import PdfProcessor
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Similarité cosinus ligne à ligne entre deux matrices d'embeddings."""
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return np.sum(reference * candidate, axis=1)
+
+
+def load_chunks(corpus: List[Path], max_chunks: int) -> List[str]:
+    processor = PdfProcessor()
+    chunks: List[str] = []
+    for pdf in corpus:
+        text = processor.clean_text(processor.extract_full_text(str(pdf)))
+        chunks.extend(node.text for node in processor.split_text(text, pdf.name, "token_window"))
+        if len(chunks) >= max_chunks:
+            break
+    return chunks[:max_chunks]
+
+
+def run(chunks: List[str], backends: List[str], queries: int, min_cosine: float) -> bool:
+    vectors: Dict[str, np.ndarray] = {}
+    parity_ok = True
+    print(f"{len(chunks)} chunks")
+    print(f"{'backend':<10} {'chunks/s':>9} {'requête (ms)':>13} {'cos. moy.':>10} {'cos. min':>9}")
+
+    for backend in backends:
+        model = build_embed_model(backend)
+        model.get_text_embedding_batch(chunks[:8])  # chauffe
+
+        start = time.perf_counter()
+        vectors[backend] = np.asarray(model.get_text_embedding_batch(chunks), dtype=np.float32)
+        throughput = len(chunks) / (time.perf_counter() - start)
+
+        latencies = []
+        for text in chunks[:queries]:
+            start = time.perf_counter()
+            model.get_query_embedding(text[:200])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        similarities = cosine_parity(vectors[backends[0]], vectors[backend])
+        if similarities.min() < min_cosine:
+            parity_ok = False
+        print(f"{backend:<10} {throughput:>9.1f} {statistics.median(latencies):>13.2f} "
+              f"{similarities.mean():>10.4f} {similarities.min():>9.4f}")
+    return parity_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus_dir", type=Path)
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--max-chunks", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    corpus = sorted(args.corpus_dir.glob("*.pdf"))
+    if not corpus:
+        raise SystemExit(f"Aucun PDF trouvé dans {args.corpus_dir}")
+    chunks = load_chunks(corpus, args.max_chunks)
+    if not chunks:
+        raise SystemExit("Aucun texte extrait du corpus")
+
+    if not run(chunks, args.backends.split(","), args.queries, args.min_cosine):
+        raise SystemExit(f"Parité insuffisante : similarité cosinus < {args.min_cosine}")
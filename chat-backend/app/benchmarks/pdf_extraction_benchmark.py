@@ -0,0 +1,65 @@
+"""
+Compare les backends d'extraction PDF sur un corpus d'exemple.
+
+Usage :
+    python -m app.benchmarks.pdf_extraction_benchmark <dossier_pdfs> [--backends pypdf,pdfium,pymupdf]
+
+Pour chaque backend : pages/seconde, et fidélité du texte (F1 sur les mots)
+par rapport au backend de référence (le premier de la liste).
+"""
+import argparse
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+from app.services.implementations.pdf_extractors import get_pdf_extractor
+
+
+def _words(text: str) -> Counter:
+    return Counter(re.findall(r"\w+", text.lower()))
+
+
+def word_f1(reference: str, candidate: str) -> float:
+    ref, cand = _words(reference), _words(candidate)
+    common = sum((ref & cand).values())
+    if not ref and not cand:
+        return 1.0
+    if common == 0:
+        return 0.0
+    precision = common / sum(cand.values())
+    recall = common / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def run(corpus: List[Path], backends: List[str]) -> None:
+    texts: Dict[str, Dict[Path, str]] = {}
+    print(f"{'backend':<10} {'pages':>7} {'secondes':>9} {'pages/s':>9} {'fidélité':>9}")
+
+    for backend in backends:
+        extractor = get_pdf_extractor(backend)
+        texts[backend] = {}
+        pages = 0
+        start = time.perf_counter()
+        for pdf in corpus:
+            count = extractor.count_pages(str(pdf))
+            texts[backend][pdf] = "\n".join(extractor.extract_page_range(str(pdf), 0, count))
+            pages += count
+        elapsed = time.perf_counter() - start
+
+        reference = texts[backends[0]]
+        fidelity = sum(word_f1(reference[pdf], texts[backend][pdf]) for pdf in corpus) / len(corpus)
+        print(f"{backend:<10} {pages:>7} {elapsed:>9.2f} {pages / elapsed:>9.1f} {fidelity:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus_dir", type=Path)
+    parser.add_argument("--backends", default="pypdf,pdfium,pymupdf")
+    args = parser.parse_args()
+
+    corpus = sorted(args.corpus_dir.glob("*.pdf"))
+    if not corpus:
+        raise SystemExit(f"Aucun PDF trouvé dans {args.corpus_dir}")
+    run(corpus, args.backends.split(","))
@@ -0,0 +1,116 @@
+"""
+Compare les précisions CPU du LLM (float32, bfloat16, int8, int4) : mémoire, débit et
+dérive des réponses par rapport à la référence float32.
+
+Usage :
+    python -m app.benchmarks.precision_benchmark [--model <chemin ou nom HF>]
+        [--precisions float32 bfloat16 int8 int4] [--runs 3] [--max-new-tokens 64]
+
+Pour chaque précision, le script génère en décodage glouton sur des prompts RAG et rapporte :
+- l'empreinte mémoire des poids ;
+- le débit médian (tokens/s) ;
+- le taux de réponses identiques à float32 ;
+- l'accord top-1 : part des tokens de la réponse float32 que le modèle quantifié aurait
+  lui-même prédits (réponse float32 imposée en entrée), mesure de dérive plus fine.
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from app.core.config import MODEL_HF_NAME
+from app.services.implementations.local_llm_service import LocalLlmService
+from app.services.utils.model_loading import (
+    CPU_PRECISIONS, precision_model_kwargs, quantize_after_load, model_memory_footprint
+)
+
+QUESTIONS = [
+    "Comment installer le logiciel ?",
+    "Quelles sont les étapes de configuration ?",
+    "Comment résoudre une erreur de connexion ?",
+]
+CHUNK = (
+    "Pour installer le logiciel, ouvrez le panneau d'administration, sélectionnez "
+    "l'onglet Maintenance puis lancez l'assistant d'installation. "
+)
+
+
+def load(model_name: str, precision: str):
+    model = AutoModelForCausalLM.from_pretrained(model_name, low_cpu_mem_usage=True,
+                                                 **precision_model_kwargs(precision))
+    model.eval()
+    return quantize_after_load(model, precision)
+
+
+def generate(model, tokenizer, prompts: List[str], max_new_tokens: int) -> List[torch.Tensor]:
+    """Tokens générés (sans le prompt) pour chaque prompt, en décodage glouton."""
+    outputs = []
+    for prompt in prompts:
+        inputs = tokenizer(prompt, return_tensors="pt")
+        with torch.no_grad():
+            output = model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False,
+                                    pad_token_id=tokenizer.pad_token_id)
+        outputs.append(output[0, inputs["input_ids"].shape[1]:])
+    return outputs
+
+
+def top1_agreement(model, tokenizer, prompts: List[str], references: List[torch.Tensor]) -> float:
+    """Part des tokens de référence que `model` prédit en top-1, référence imposée en entrée."""
+    matches, total = 0, 0
+    for prompt, reference in zip(prompts, references):
+        if len(reference) == 0:
+            continue
+        prompt_ids = tokenizer(prompt, return_tensors="pt")["input_ids"][0]
+        input_ids = torch.cat([prompt_ids, reference]).unsqueeze(0)
+        with torch.no_grad():
+            logits = model(input_ids=input_ids).logits[0]
+        # Le logit en position i prédit le token i + 1
+        predicted = logits[len(prompt_ids) - 1:-1].argmax(dim=-1)
+        matches += (predicted == reference).sum().item()
+        total += len(reference)
+    return matches / total if total else 1.0
+
+
+def benchmark(model, tokenizer, prompts: List[str], runs: int, max_new_tokens: int) -> Dict:
+    generate(model, tokenizer, prompts[:1], max_new_tokens)  # chauffe
+    rates, outputs = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        outputs = generate(model, tokenizer, prompts, max_new_tokens)
+        elapsed = time.perf_counter() - start
+        rates.append(sum(len(output) for output in outputs) / elapsed)
+    return {"tokens_per_s": statistics.median(rates), "outputs": outputs}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_HF_NAME)
+    parser.add_argument("--precisions", nargs="+", default=list(CPU_PRECISIONS), choices=CPU_PRECISIONS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    prompts = [LocalLlmService.build_rag_prompt(question, [CHUNK]) for question in QUESTIONS]
+
+    # Référence float32, toujours mesurée en premier
+    precisions = ["float32"] + [p for p in args.precisions if p != "float32"]
+    reference = None
+    print(f"{'précision':<10} {'mémoire':>10} {'tokens/s':>10} {'identiques':>11} {'accord top-1':>13}")
+    for precision in precisions:
+        model = load(args.model, precision)
+        result = benchmark(model, tokenizer, prompts, args.runs, args.max_new_tokens)
+        if reference is None:
+            reference = result["outputs"]
+        identical = sum(torch.equal(a, b) for a, b in zip(result["outputs"], reference)) / len(reference)
+        agreement = top1_agreement(model, tokenizer, prompts, reference)
+        print(
+            f"{precision:<10} {model_memory_footprint(model) / 1024 ** 2:>7.1f} Mo "
+            f"{result['tokens_per_s']:>10.1f} {identical:>11.0%} {agreement:>13.1%}"
+        )
+        del model
@@ -0,0 +1,65 @@
+"""
+Mesure le gain du KV-cache de préfixe sur le temps jusqu'au premier token.
+
+Usage :
+    python -m app.benchmarks.prefix_cache_benchmark [--model <chemin ou nom HF>] [--runs 5]
+
+Pour chaque mode (sans cache, avec cache), génère un seul token sur des prompts RAG
+construits avec le template de production et rapporte le temps médian : il correspond
+au préremplissage du prompt, soit l'essentiel du temps jusqu'au premier token.
+"""
+import argparse
+import statistics
+import time
+
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from app.core.config import MODEL_HF_NAME
+from app.services.implementations.local_llm_service import LocalLlmService
+from app.services.utils.generation_scheduler import GenerationRequest, GenerationScheduler
+from app.services.utils.prefix_cache import PrefixKVCache
+
+CHUNK = (
+    "Pour installer le logiciel, ouvrez le panneau d'administration, sélectionnez "
+    "l'onglet Maintenance puis lancez l'assistant d'installation. "
+)
+
+
+def time_to_first_token(scheduler: GenerationScheduler, runs: int, chunks: int) -> float:
+    prefix = LocalLlmService.rag_prompt_prefix()
+    timings = []
+    for run in range(runs + 1):
+        prompt = LocalLlmService.build_rag_prompt(
+            f"Comment procéder à l'étape {run} ?", [CHUNK * 3] * chunks
+        )
+        start = time.perf_counter()
+        scheduler.submit(GenerationRequest(
+            prompt=prompt, max_new_tokens=1, temperature=0.7, top_p=0.95, prefix=prefix
+        )).result()
+        if run > 0:  # premier passage : chauffe
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_HF_NAME)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chunks", type=int, default=3)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    model = AutoModelForCausalLM.from_pretrained(args.model, low_cpu_mem_usage=True)
+
+    results = {}
+    for mode, prefix_cache in [("sans cache", None), ("avec cache", PrefixKVCache(model, tokenizer))]:
+        scheduler = GenerationScheduler(model, tokenizer, max_batch_size=1, prefix_cache=prefix_cache)
+        scheduler.start()
+        results[mode] = time_to_first_token(scheduler, args.runs, args.chunks)
+        scheduler.stop()
+        print(f"{mode:<11} premier token : {results[mode]:8.1f} ms (médiane sur {args.runs})")
+
+    gain = 1 - results["avec cache"] / results["sans cache"]
+    print(f"Gain : {gain:.1%}")
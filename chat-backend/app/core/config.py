@@ -23,7 +23,9 @@ MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "snrt-documents")
 MONGODB_COLLECTIONS = {
     "documents": os.getenv("MONGODB_COLLECTION_DOCUMENTS", "vectorized-documents"),
-    "admins":    os.getenv("MONGODB_COLLECTION_ADMINS",    "admins")
+    "admins":    os.getenv("MONGODB_COLLECTION_ADMINS",    "admins"),
+    "jobs":      os.getenv("MONGODB_COLLECTION_JOBS",      "ingestion-jobs"),
+    "corpus":    os.getenv("MONGODB_COLLECTION_CORPUS",    "corpus-state")
 }
 
 # ——— Environnement & CORS —————————————————————————————
@@ -37,11 +39,136 @@ ALLOWED_ORIGINS = os.getenv(
 BASE_DIR = Path(__file__).resolve().parent.parent  # Racine du projet
 
 UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", BASE_DIR / "app/documents/uploaded"))
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE_MB", "50")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", "1024")) * 1024
 CACHE_DIR = Path(os.getenv("TRANSFORMERS_CACHE", BASE_DIR / "cache"))
 
 # ——— Modèles LLM ————————————————————————————————
 GPT_OSS_MODEL_PATH = Path(os.getenv("GPT_OSS_MODEL_PATH", BASE_DIR / "llms_models/gpt-oss-20b"))
 GPT2_MODEL_PATH = Path(os.getenv("GPT2_MODEL_PATH", BASE_DIR / "llms_models/gpt2"))
+# Hors ligne : aucun accès au Hub, échec immédiat si aucun snapshot local n'est disponible
+LLM_OFFLINE = os.getenv("LLM_OFFLINE", os.getenv("HF_HUB_OFFLINE", "0")).lower() in ("1", "true")
+# Précision du LLM sur CPU : float32, bfloat16, int8 (quantification dynamique) ou int4 (optimum-quanto)
+LLM_CPU_PRECISION = os.getenv("LLM_CPU_PRECISION", "float32")
+
+# ——— Serveur de modèles ——————————————————————————————
+# "local" : LLM et embeddings chargés dans chaque processus de l'API
+# "remote" : délégués au serveur de modèles (uvicorn app.model_server:app), partagé par les workers
+# "openai" : génération par un serveur compatible OpenAI (vLLM, llama.cpp, TGI), embeddings en local
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "local")
+MODEL_SERVER_URL = os.getenv("MODEL_SERVER_URL", "http://127.0.0.1:8100")
+# Socket Unix du serveur ; prioritaire sur MODEL_SERVER_URL s'il est défini
+MODEL_SERVER_SOCKET = os.getenv("MODEL_SERVER_SOCKET", "")
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT_SECONDS", "300"))
+MODEL_SERVER_STARTUP_TIMEOUT = float(os.getenv("MODEL_SERVER_STARTUP_TIMEOUT_SECONDS", "900"))
+
+# ——— Génération compatible OpenAI (INFERENCE_MODE=openai) ———————————
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "http://127.0.0.1:8000/v1")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", MODEL_HF_NAME)
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "120"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+# Tentatives supplémentaires (connexion, 429, 5xx), avec backoff exponentiel et jitter
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_RETRY_BACKOFF = float(os.getenv("OPENAI_RETRY_BACKOFF_SECONDS", "0.5"))
+# Connexions keep-alive du pool, et générations simultanées au-delà desquelles l'API répond 429
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+# Identifiant du modèle qui génère les réponses : le cache de réponses ne mélange pas les modèles
+LLM_MODEL_ID = OPENAI_MODEL if INFERENCE_MODE == "openai" else f"{MODEL_HF_NAME}@{LLM_CPU_PRECISION}"
+
+# Ordonnanceur de génération : requêtes compatibles regroupées en lots pour `generate`
+LLM_MAX_BATCH_SIZE = int(os.getenv("LLM_MAX_BATCH_SIZE", "4"))
+LLM_BATCH_MAX_WAIT_MS = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", "50"))
+LLM_MAX_QUEUE_SIZE = int(os.getenv("LLM_MAX_QUEUE_SIZE", "16"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "1"))
+LLM_RETRY_AFTER = int(os.getenv("LLM_RETRY_AFTER_SECONDS", "10"))
+# KV-cache des consignes système, calculé au démarrage et réutilisé par chaque génération
+LLM_PREFIX_CACHE = os.getenv("LLM_PREFIX_CACHE", "true").lower() == "true"
+# Température des réponses RAG ; 0 = décodage glouton (déterministe)
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+# Décodage assisté par un petit modèle brouillon :
+# "auto" (générations déterministes uniquement ; brouillon chargé seulement si LLM_TEMPERATURE=0), "always" ou "off"
+LLM_ASSISTED_DECODING = os.getenv("LLM_ASSISTED_DECODING", "auto")
+LLM_DRAFT_MODEL_PATH = Path(os.getenv("LLM_DRAFT_MODEL_PATH", GPT2_MODEL_PATH))
+# Tokenizers différents : décodage assisté universel (sinon le brouillon est ignoré)
+LLM_ASSISTED_UNIVERSAL = os.getenv("LLM_ASSISTED_UNIVERSAL", "true").lower() == "true"
+
+# ——— Embeddings ————————————————————————————————————
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# Backend d'inférence : "torch" (PyTorch fp32), "onnx" (ONNX Runtime fp32)
+# ou "onnx-int8" (ONNX Runtime, graphe quantifié dynamiquement en int8)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Jeu d'instructions ciblé par la quantification int8 : "avx2", "avx512", "avx512_vnni" ou "arm64"
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+# Dossier des graphes ONNX exportés (export fait une seule fois, au premier démarrage)
+EMBEDDING_ONNX_DIR = Path(os.getenv("EMBEDDING_ONNX_DIR", CACHE_DIR / "onnx"))
+# Identifiant des vecteurs produits : les caches d'embeddings ne mélangent pas les backends
+EMBEDDING_MODEL_ID = (
+    EMBEDDING_MODEL_NAME if EMBEDDING_BACKEND == "torch"
+    else f"{EMBEDDING_MODEL_NAME}@{EMBEDDING_BACKEND}"
+)
+# Micro-batching des embeddings de requêtes : les requêtes concurrentes arrivées
+# pendant la fenêtre (ms) sont embeddées en un seul appel, jusqu'à QUERY_EMBEDDING_MAX_BATCH
+QUERY_EMBEDDING_BATCHING = os.getenv("QUERY_EMBEDDING_BATCHING", "true").lower() == "true"
+QUERY_EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("QUERY_EMBEDDING_BATCH_WINDOW_MS", "5"))
+QUERY_EMBEDDING_MAX_BATCH = int(os.getenv("QUERY_EMBEDDING_MAX_BATCH", "32"))
+# Cache LRU des embeddings de questions normalisées (0 pour désactiver)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+
+# ——— Cache de réponses ——————————————————————————————
+# Réponses RAG par (question normalisée, top_k, chunks retrouvés, modèle, version du prompt),
+# invalidées à chaque modification du corpus (0 pour désactiver)
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+# Cache sémantique (questions reformulées) : réponse d'une question proche, servie si la
+# similarité cosinus atteint le seuil et si les chunks retrouvés se recouvrent assez
+# (indice de Jaccard) ; même durée de vie que le cache exact (0 pour désactiver)
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MIN_OVERLAP = float(os.getenv("SEMANTIC_CACHE_MIN_OVERLAP", "0.6"))
+# Part des réponses sémantiques régénérées pour mesurer les fausses réponses : une réponse
+# est fausse si le cosinus entre son embedding et celui de la réponse régénérée est sous le seuil
+SEMANTIC_CACHE_AUDIT_RATE = float(os.getenv("SEMANTIC_CACHE_AUDIT_RATE", "0.05"))
+SEMANTIC_CACHE_AUDIT_MIN_SIMILARITY = float(os.getenv("SEMANTIC_CACHE_AUDIT_MIN_SIMILARITY", "0.8"))
+
+# ——— Ingestion —————————————————————————————————————
+# "batch"    : ré-embedding exact des chunks en appels groupés (embed_batch_size)
+# "splitter" : réutilise les embeddings calculés par le découpage sémantique (moyenne normalisée)
+CHUNK_EMBEDDING_STRATEGY = os.getenv("CHUNK_EMBEDDING_STRATEGY", "batch")
+# Découpage : "semantic" (points de coupure par similarité) ou "token_window"
+# (fenêtres de tokens fixes avec recouvrement, linéaire et sans embedding)
+CHUNKING_STRATEGIES = ("semantic", "token_window")
+CHUNKING_STRATEGY = os.getenv("CHUNKING_STRATEGY", "semantic")
+# Tailles en tokens du tokenizer d'embedding (MiniLM tronque au-delà de 256)
+CHUNK_WINDOW_TOKENS = int(os.getenv("CHUNK_WINDOW_TOKENS", "200"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "40"))
+CHUNK_MIN_TOKENS = int(os.getenv("CHUNK_MIN_TOKENS", "32"))
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "256"))
+# Backend d'extraction PDF : "pypdf", "pdfium" (pypdfium2) ou "pymupdf"
+PDF_EXTRACTION_BACKEND = os.getenv("PDF_EXTRACTION_BACKEND", "pypdf")
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", CACHE_DIR / "embeddings.sqlite"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+# Upserts Qdrant par lots, avec un nombre borné de lots en vol
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "128"))
+QDRANT_UPSERT_MAX_IN_FLIGHT = int(os.getenv("QDRANT_UPSERT_MAX_IN_FLIGHT", "2"))
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_QUEUE_SIZE = int(os.getenv("INGESTION_QUEUE_SIZE", "20"))
+# Bail d'un job en cours (renouvelé pendant l'exécution) : passé ce délai sans nouvelle du
+# worker, le job est repris par un autre processus. Les workers inactifs cherchent des jobs
+# à reprendre à chaque intervalle.
+INGESTION_LEASE_SECONDS = float(os.getenv("INGESTION_LEASE_SECONDS", "60"))
+INGESTION_POLL_SECONDS = float(os.getenv("INGESTION_POLL_SECONDS", "15"))
+
+# ——— Exécuteurs ————————————————————————————————————
+# Le travail bloquant des routes est déporté hors de l'event loop, par classe de charge :
+# CPU (génération LLM, embedding, bcrypt), peu de threads pour ne pas surcharger les cœurs ;
+# I/O (MongoDB, Qdrant, disque), beaucoup de threads qui passent leur temps à attendre.
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", "2"))
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "32"))
 
 # ——— Device ——————————————————————————————————————
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
@@ -54,6 +181,8 @@ if DEVICE == "cuda":
 
 # Variables d'environnement pour Transformers
 os.environ["TRANSFORMERS_CACHE"] = str(CACHE_DIR)
+if LLM_OFFLINE:
+    os.environ["HF_HUB_OFFLINE"] = "1"
 
 # ——— Debug / affichage —————————————————————————————
 print(f"Configuration chargée:")
@@ -61,6 +190,9 @@ print(f"- ENVIRONMENT: {ENVIRONMENT}")
 print(f"- MODEL_PATH GPT-OSS: {GPT_OSS_MODEL_PATH}")
 print(f"- MODEL_PATH GPT2: {GPT2_MODEL_PATH}")
 print(f"- MODEL_HF_NAME: {MODEL_HF_NAME}")
+print(f"- LLM_OFFLINE: {LLM_OFFLINE}")
+print(f"- LLM_CPU_PRECISION: {LLM_CPU_PRECISION}")
+print(f"- INFERENCE_MODE: {INFERENCE_MODE}")
 print(f"- DEVICE: {DEVICE}")
 print(f"- MAX_LENGTH: {MAX_LENGTH}")
 if DEVICE == "cuda":
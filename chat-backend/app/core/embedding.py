@@ -1,6 +1,105 @@
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+import logging
+from pathlib import Path
+from typing import List, Optional
 
-embed_model = HuggingFaceEmbedding(
-    model_name="sentence-transformers/all-MiniLM-L6-v2",
-    embed_batch_size=32
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from llama_index.embeddings.huggingface.utils import (
+    get_query_instruct_for_model_name, get_text_instruct_for_model_name
 )
+from app.core.config import (
+    EMBEDDING_MODEL_NAME, EMBEDDING_BATCH_SIZE, EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_QUANTIZATION, EMBEDDING_ONNX_DIR, INFERENCE_MODE
+)
+from app.services.utils.model_server_client import ModelServerClient
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+logger = logging.getLogger(__name__)
+
+
+def export_onnx_model(model_name: str, quantization: Optional[str] = None) -> Path:
+    """
+    Exporte le modèle en graphe ONNX (et sa variante int8 si `quantization` est fourni)
+    dans EMBEDDING_ONNX_DIR. L'export n'est fait qu'une fois ; retourne le dossier du modèle.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    target = EMBEDDING_ONNX_DIR / model_name.replace("/", "__")
+    onnx_file = target / "onnx" / "model.onnx"
+    if not onnx_file.exists():
+        logger.info(f"Export ONNX du modèle d'embedding {model_name} vers {target}")
+        SentenceTransformer(model_name, backend="onnx", device="cpu").save_pretrained(str(target))
+
+    if quantization and not (target / "onnx" / f"model_qint8_{quantization}.onnx").exists():
+        logger.info(f"Quantification int8 ({quantization}) du modèle d'embedding {model_name}")
+        model = SentenceTransformer(str(target), backend="onnx", device="cpu")
+        export_dynamic_quantized_onnx_model(model, quantization, str(target))
+    return target
+
+
+def build_embed_model(backend: str = EMBEDDING_BACKEND,
+                      model_name: str = EMBEDDING_MODEL_NAME,
+                      batch_size: int = EMBEDDING_BATCH_SIZE) -> HuggingFaceEmbedding:
+    """
+    Construit le modèle d'embedding pour le backend demandé.
+    Tous les backends exposent la même interface llama-index (get_text_embedding,
+    get_text_embedding_batch, ...) et produisent des vecteurs normalisés de même dimension.
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Backend d'embedding inconnu: {backend} (valeurs possibles: {', '.join(EMBEDDING_BACKENDS)})")
+
+    if backend == "torch":
+        return HuggingFaceEmbedding(model_name=model_name, embed_batch_size=batch_size)
+
+    quantization = EMBEDDING_ONNX_QUANTIZATION if backend == "onnx-int8" else None
+    model_dir = export_onnx_model(model_name, quantization)
+    file_name = f"onnx/model_qint8_{quantization}.onnx" if quantization else "onnx/model.onnx"
+    return HuggingFaceEmbedding(
+        model_name=str(model_dir),
+        embed_batch_size=batch_size,
+        # Les instructions dépendent du nom du modèle d'origine, pas du dossier exporté
+        query_instruction=get_query_instruct_for_model_name(model_name),
+        text_instruction=get_text_instruct_for_model_name(model_name),
+        device="cpu",
+        backend="onnx",
+        model_kwargs={"file_name": file_name}
+    )
+
+
+class RemoteEmbedding(BaseEmbedding):
+    """
+    Embeddings calculés par le serveur de modèles (app.model_server).
+    Même interface llama-index que les backends locaux ; le serveur regroupe en lots
+    les textes envoyés par tous les workers de l'API.
+    """
+
+    _client: ModelServerClient = PrivateAttr()
+
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE, **kwargs):
+        super().__init__(model_name="model-server", embed_batch_size=batch_size, **kwargs)
+        self._client = ModelServerClient()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "RemoteEmbedding"
+
+    def _embed(self, texts: List[str], query: bool = False) -> List[List[float]]:
+        return self._client.post("/embeddings", {"texts": texts, "query": query})["embeddings"]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed([query], query=True)[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts)
+
+
+# En mode "remote", le modèle d'embedding n'est chargé que par le serveur de modèles
+embed_model = RemoteEmbedding() if INFERENCE_MODE == "remote" else build_embed_model()
@@ -0,0 +1,41 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.config import CPU_EXECUTOR_WORKERS, IO_EXECUTOR_WORKERS
+
+T = TypeVar("T")
+
+# Calcul : génération LLM, embedding, vérification bcrypt
+cpu_executor = ThreadPoolExecutor(
+    max_workers=CPU_EXECUTOR_WORKERS, thread_name_prefix="cpu"
+)
+# I/O bloquantes : pymongo, client Qdrant, fichiers
+io_executor = ThreadPoolExecutor(
+    max_workers=IO_EXECUTOR_WORKERS, thread_name_prefix="io"
+)
+
+
+async def _run_in(executor: ThreadPoolExecutor, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    # Le contexte (contextvars) de la requête suit l'appel dans le thread
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Exécute un calcul bloquant (inférence, hachage) sans bloquer l'event loop."""
+    return await _run_in(cpu_executor, func, *args, **kwargs)
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Exécute un appel d'I/O bloquant sans bloquer l'event loop."""
+    return await _run_in(io_executor, func, *args, **kwargs)
+
+
+def shutdown_executors() -> None:
+    cpu_executor.shutdown(wait=False, cancel_futures=True)
+    io_executor.shutdown(wait=False, cancel_futures=True)
@@ -6,9 +6,12 @@ import os
 import logging
 
 from app.api.routes import auth_router, document_router, query_router
+from app.api.deps import service_factory
 from app.api.logging_config import setup_api_logging
 from app.core.config import ENVIRONMENT , ALLOWED_ORIGINS
 from app.services.startup_service import startup_service 
+from app.services.utils.pdf_extraction import shutdown_executor
+from app.core.executors import shutdown_executors
 
 # Configuration des logs
 setup_api_logging()
@@ -38,12 +41,17 @@ app.add_middleware(
 async def startup_event():
     logger.info("Initialisation des services...")
     await startup_service.initialize_services()
+    service_factory.get_ingestion_service().start()
     logger.info("✅ Services prêts !")
 
 # (Optionnel) Libérer les ressources à l'arrêt
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Arrêt de l'application, libération des ressources...")
+    service_factory.get_ingestion_service().stop()
+    service_factory.get_llm_service().shutdown()
+    shutdown_executor()
+    shutdown_executors()
     # Ici tu peux ajouter une méthode dans StartupService pour libérer GPU/mémoire si besoin
 
 # Inclusion des routes avec préfixes
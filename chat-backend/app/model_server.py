@@ -0,0 +1,201 @@
+"""
+Serveur de modèles : un seul processus charge le LLM et le modèle d'embedding et les
+sert à tous les workers de l'API (INFERENCE_MODE=remote).
+
+Lancement (un seul worker : c'est lui qui possède les modèles) :
+    uvicorn app.model_server:app --uds /run/snrt/model-server.sock
+    uvicorn app.model_server:app --host 127.0.0.1 --port 8100
+
+La génération passe par l'ordonnanceur du LLM (lots de requêtes compatibles) et les
+embeddings courts sont regroupés en lots entre workers. /health renvoie 503 tant que
+les modèles sont en cours de chargement.
+"""
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional
+import json
+import logging
+import threading
+import time
+
+from app.core.config import (
+    INFERENCE_MODE, EMBEDDING_MODEL_ID, QUERY_EMBEDDING_MAX_BATCH, QUERY_EMBEDDING_BATCH_WINDOW_MS,
+    LLM_RETRY_AFTER
+)
+from app.core.embedding import embed_model
+from app.services.implementations.local_llm_service import LocalLlmService
+from app.services.utils.embedding_batcher import EmbeddingBatcher
+
+# N'importe pas app.api : les workers de l'API (Mongo, Qdrant, routes) n'ont rien à faire ici
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Serveur de modèles - SNRT", docs_url=None, redoc_url=None)
+
+
+class GenerateRequest(BaseModel):
+    prompt: str
+    max_tokens: int = 800
+    temperature: float = 1.0
+    top_p: float = 0.95
+
+
+class ContextQueryRequest(BaseModel):
+    question: str
+    chunks: List[str]
+
+
+class EmbeddingRequest(BaseModel):
+    texts: List[str]
+    # Embedding de requête (instruction de requête du modèle) plutôt que de document
+    query: bool = False
+
+
+class _Models:
+    """Modèles du serveur, chargés en arrière-plan au démarrage."""
+
+    def __init__(self):
+        self.llm: Optional[LocalLlmService] = None
+        self.batcher: Optional[EmbeddingBatcher] = None
+        self.error: Optional[str] = None
+        self.load_time: Optional[float] = None
+
+    def load(self) -> None:
+        started = time.perf_counter()
+        try:
+            self.batcher = EmbeddingBatcher(
+                embed_model.get_text_embedding_batch,
+                max_batch_size=QUERY_EMBEDDING_MAX_BATCH,
+                window_ms=QUERY_EMBEDDING_BATCH_WINDOW_MS
+            )
+            self.llm = LocalLlmService()
+            self.load_time = time.perf_counter() - started
+            logger.info(f"Serveur de modèles prêt en {self.load_time:.1f} s")
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement des modèles: {str(e)}")
+            self.error = str(e)
+
+    def ready(self) -> LocalLlmService:
+        """Retourne le LLM, ou lève 503 tant que les modèles ne sont pas chargés."""
+        if self.llm is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Échec du chargement des modèles: {self.error}" if self.error
+                else "Modèles en cours de chargement",
+                headers={"Retry-After": str(LLM_RETRY_AFTER)}
+            )
+        return self.llm
+
+
+models = _Models()
+
+
+@app.on_event("startup")
+async def startup_event():
+    if INFERENCE_MODE == "remote":
+        raise RuntimeError("Le serveur de modèles doit être lancé avec INFERENCE_MODE=local")
+    threading.Thread(target=models.load, name="model-loader", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if models.llm is not None:
+        models.llm.shutdown()
+
+
+@app.get("/health")
+async def health_check():
+    if models.llm is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "error" if models.error else "loading",
+                "detail": models.error,
+                "embedding_model": EMBEDDING_MODEL_ID
+            }
+        )
+    return {
+        "status": "ready",
+        "model": models.llm.get_model_info(),
+        "embedding_model": EMBEDDING_MODEL_ID,
+        "load_time": round(models.load_time, 1)
+    }
+
+
+@app.get("/stats")
+def get_stats():
+    llm = models.ready()
+    return {
+        "scheduler": llm.get_scheduler_stats(),
+        "embeddings": models.batcher.stats()
+    }
+
+
+@app.get("/capacity")
+def check_capacity():
+    models.ready().ensure_generation_capacity()
+    return {"status": "ok"}
+
+
+@app.post("/generate")
+def generate(request: GenerateRequest):
+    text = models.ready().generate_response(
+        request.prompt,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature,
+        top_p=request.top_p
+    )
+    return {"text": text}
+
+
+@app.post("/query")
+def query_with_context(request: ContextQueryRequest):
+    return {"answer": models.ready().query_with_context(request.question, request.chunks)}
+
+
+@app.post("/query/stream")
+async def query_with_context_stream(request: ContextQueryRequest, http_request: Request):
+    """
+    Génération en streaming, en NDJSON : {"token": ...} répétés puis {"done": true},
+    ou {"error": ..., "status": ...}. La génération s'arrête si le client se déconnecte.
+    """
+    llm = models.ready()
+    llm.ensure_generation_capacity()
+
+    async def events():
+        stop = threading.Event()
+        fragments = llm.stream_with_context(request.question, request.chunks, stop.is_set)
+        try:
+            while True:
+                if await http_request.is_disconnected():
+                    return
+                fragment = await run_in_threadpool(next, fragments, None)
+                if fragment is None:
+                    break
+                yield json.dumps({"token": fragment}, ensure_ascii=False) + "\n"
+            yield json.dumps({"done": True}) + "\n"
+        except HTTPException as e:
+            yield json.dumps({"error": e.detail, "status": e.status_code}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"Erreur lors de la génération en streaming: {str(e)}")
+            yield json.dumps({"error": str(e), "status": 500}, ensure_ascii=False) + "\n"
+        finally:
+            stop.set()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.post("/embeddings")
+def embeddings(request: EmbeddingRequest):
+    models.ready()
+    if request.query:
+        vectors = [embed_model.get_query_embedding(text) for text in request.texts]
+    elif len(request.texts) < QUERY_EMBEDDING_MAX_BATCH:
+        # Textes courts (questions) : regroupés avec ceux des autres workers
+        futures = [models.batcher.submit(text) for text in request.texts]
+        vectors = [future.result() for future in futures]
+    else:
+        vectors = embed_model.get_text_embedding_batch(request.texts)
+    return {"embeddings": vectors}
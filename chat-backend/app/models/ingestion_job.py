@@ -0,0 +1,28 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+@dataclass
+class IngestionJob:
+    job_id: str
+    filename: str
+    system_name: str
+    file_path: str
+    source_hash: Optional[str] = None
+    # "create" : nouveau document ; "replace" : nouvelle version d'un document existant
+    mode: str = "create"
+    # Stratégie de découpage demandée ; None = CHUNKING_STRATEGY
+    chunking_strategy: Optional[str] = None
+    status: str = "queued"
+    current_stage: Optional[str] = None
+    progress: float = 0.0
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    chunks_count: Optional[int] = None
+    file_hash: Optional[str] = None
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+    # Worker qui exécute le job et échéance de son bail, renouvelé tant que le job avance
+    owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Optional
 
 @dataclass
 class PDFMetadata:
@@ -7,3 +8,10 @@ class PDFMetadata:
     file_hash: str
     system_name: str
     created_at: datetime = field(default_factory=datetime.utcnow)
+    source_hash: Optional[str] = None
+    chunks_count: Optional[int] = None
+    # Hash servant à dériver les IDs des chunks ; conservé d'une version à l'autre
+    chunk_namespace: Optional[str] = None
+    version: int = 1
+    # Stratégie de découpage utilisée ("semantic" ou "token_window")
+    chunking_strategy: Optional[str] = None
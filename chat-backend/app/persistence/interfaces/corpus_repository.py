@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+
+class AbstractCorpusRepository(ABC):
+    @abstractmethod
+    def get_version(self) -> int:
+        pass
+    @abstractmethod
+    def bump_version(self) -> int:
+        pass
@@ -1,17 +1,29 @@
 from abc import ABC , abstractmethod
-from typing import List , Optional
+from typing import Any, Dict, List , Optional
 from app.models.pdf_metadata import PDFMetadata
 
 class AbstractDocumentRepository(ABC):
     @abstractmethod
-    def insert_pdf_metadata(self, metadata: PDFMetadata) -> str:
+    def insert_pdf_metadata(self, metadata: PDFMetadata) -> Optional[str]:
         pass
     @abstractmethod
     def find_by_hash(self, file_hash: str) -> Optional[dict]:
         pass
     @abstractmethod
+    def find_by_chunk_namespace(self, chunk_namespace: str) -> Optional[dict]:
+        pass
+    @abstractmethod
+    def find_by_source_hash(self, source_hash: str) -> Optional[dict]:
+        pass
+    @abstractmethod
     def list_documents(self, limit: int = 100) -> list[PDFMetadata]:
         pass
     @abstractmethod
     def delete_by_hash(self, file_hash: str) -> bool:
-        pass
\ No newline at end of file
+        pass
+    @abstractmethod
+    def find_by_name(self, filename: str, system_name: str) -> Optional[dict]:
+        pass
+    @abstractmethod
+    def update_by_hash(self, file_hash: str, fields: Dict[str, Any]) -> bool:
+        pass
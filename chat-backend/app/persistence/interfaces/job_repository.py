@@ -0,0 +1,23 @@
+from abc import ABC , abstractmethod
+from typing import Any, Dict, List , Optional
+from app.models.ingestion_job import IngestionJob
+
+class AbstractJobRepository(ABC):
+    @abstractmethod
+    def insert_job(self, job: IngestionJob) -> str:
+        pass
+    @abstractmethod
+    def find_by_id(self, job_id: str) -> Optional[dict]:
+        pass
+    @abstractmethod
+    def update_job(self, job_id: str, fields: Dict[str, Any], owner: Optional[str] = None) -> bool:
+        pass
+    @abstractmethod
+    def claim_job(self, job_id: Optional[str], owner: str, lease_seconds: float) -> Optional[dict]:
+        pass
+    @abstractmethod
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        pass
+    @abstractmethod
+    def find_unfinished_by_source_hash(self, source_hash: str) -> Optional[dict]:
+        pass
@@ -1,5 +1,5 @@
 from abc import ABC , abstractmethod
-from typing import List , Optional
+from typing import Iterable, List , Optional
 from app.models.qdrant_dto import QdrantDocumentInput
 from app.models.documents import Document
 from qdrant_client.http import models
@@ -9,6 +9,9 @@ class AbstractVectorRepository(ABC):
     @abstractmethod
     def add_documents(self, documents: List[QdrantDocumentInput]) -> None:
         pass
+    @abstractmethod
+    def add_documents_stream(self, batches: Iterable[List[QdrantDocumentInput]]) -> int:
+        pass
     def semantic_search(
         self,
         query_vector: List[float],
@@ -26,4 +29,10 @@ class AbstractVectorRepository(ABC):
         pass
     @abstractmethod
     def delete_document(self, file_hash: str) -> bool:
-        pass
\ No newline at end of file
+        pass
+    @abstractmethod
+    def get_document_chunks(self, doc_hash: str) -> List[QdrantDocumentInput]:
+        pass
+    @abstractmethod
+    def delete_points(self, ids: List[str]) -> None:
+        pass
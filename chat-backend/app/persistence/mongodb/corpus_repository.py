@@ -0,0 +1,28 @@
+from app.persistence.interfaces.corpus_repository import AbstractCorpusRepository
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+from app.persistence.clients.mongodb_client import get_collection
+
+CORPUS_STATE_ID = "corpus"
+
+class CorpusMongoRepository(AbstractCorpusRepository):
+    """
+    Version du corpus indexé, incrémentée à chaque ajout, remplacement ou suppression
+    de document. Stockée dans MongoDB pour être partagée par tous les workers de l'API.
+    """
+
+    def __init__(self):
+        self.collection: Collection = get_collection(collectionname="corpus")
+
+    def get_version(self) -> int:
+        state = self.collection.find_one({"_id": CORPUS_STATE_ID})
+        return state["version"] if state else 0
+
+    def bump_version(self) -> int:
+        state = self.collection.find_one_and_update(
+            {"_id": CORPUS_STATE_ID},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return state["version"]
@@ -1,22 +1,71 @@
 from app.persistence.interfaces.document_repository import AbstractDocumentRepository
+from pymongo import ASCENDING
 from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from app.models.pdf_metadata import PDFMetadata
 from app.persistence.clients.mongodb_client import  get_collection
-from typing import Optional
+from typing import Any, Dict, Optional
 from dataclasses import asdict
+import logging
+
+logger = logging.getLogger(__name__)
 
 class DocumentMongoRepository(AbstractDocumentRepository):
     
     def __init__(self):
         self.collection: Collection = get_collection(collectionname="documents")
+        self._ensure_indexes()
+
+    def _ensure_indexes(self) -> None:
+        # L'index unique sur file_hash ferme la course entre deux uploads concurrents
+        try:
+            self.collection.create_index([("file_hash", ASCENDING)], unique=True)
+        except OperationFailure as e:
+            logger.warning(f"Index unique sur file_hash non créé (doublons existants ?): {e}")
+        # Un namespace de chunks par document : deux documents ne doivent jamais partager d'IDs de points
+        # (les documents antérieurs sans namespace utilisent leur file_hash, déjà unique)
+        try:
+            self.collection.create_index(
+                [("chunk_namespace", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"chunk_namespace": {"$type": "string"}}
+            )
+        except OperationFailure as e:
+            logger.warning(f"Index unique sur chunk_namespace non créé: {e}")
+        self.collection.create_index([("source_hash", ASCENDING)])
+        self.collection.create_index([("filename", ASCENDING), ("system_name", ASCENDING)])
 
-    def insert_pdf_metadata(self, metadata: PDFMetadata) -> str:
-        result = self.collection.insert_one(asdict(metadata))
+    def insert_pdf_metadata(self, metadata: PDFMetadata) -> Optional[str]:
+        """Insère les métadonnées ; retourne None si un document avec ce hash existe déjà."""
+        try:
+            result = self.collection.insert_one(asdict(metadata))
+        except DuplicateKeyError:
+            return None
         return str(result.inserted_id)
 
     def find_by_hash(self, file_hash: str) -> Optional[dict]:
         return self.collection.find_one({"file_hash": file_hash})
 
+    def find_by_chunk_namespace(self, chunk_namespace: str) -> Optional[dict]:
+        return self.collection.find_one({"chunk_namespace": chunk_namespace})
+
+    def find_by_source_hash(self, source_hash: str) -> Optional[dict]:
+        return self.collection.find_one({"source_hash": source_hash})
+
+    def find_by_name(self, filename: str, system_name: str) -> Optional[dict]:
+        return self.collection.find_one(
+            {"filename": filename, "system_name": system_name},
+            sort=[("created_at", -1)]
+        )
+
+    def update_by_hash(self, file_hash: str, fields: Dict[str, Any]) -> bool:
+        """Met à jour le document en place ; False si absent ou si le nouveau file_hash existe déjà."""
+        try:
+            result = self.collection.update_one({"file_hash": file_hash}, {"$set": fields})
+        except DuplicateKeyError:
+            return False
+        return result.matched_count > 0
+
     def list_documents(self, limit: int = 100) -> list[PDFMetadata]:
         return list(self.collection.find().sort("created_at", -1).limit(limit))
 
@@ -0,0 +1,78 @@
+from app.persistence.interfaces.job_repository import AbstractJobRepository
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.collection import Collection
+from app.models.ingestion_job import IngestionJob
+from app.persistence.clients.mongodb_client import get_collection
+from typing import Any, Dict, Optional
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+UNFINISHED_STATUSES = ["queued", "running"]
+
+class JobMongoRepository(AbstractJobRepository):
+
+    def __init__(self):
+        self.collection: Collection = get_collection(collectionname="jobs")
+        self.collection.create_index([("job_id", ASCENDING)], unique=True)
+        self.collection.create_index([("source_hash", ASCENDING), ("status", ASCENDING)])
+        self.collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+
+    def insert_job(self, job: IngestionJob) -> str:
+        result = self.collection.insert_one(asdict(job))
+        return str(result.inserted_id)
+
+    def find_by_id(self, job_id: str) -> Optional[dict]:
+        return self.collection.find_one({"job_id": job_id}, {"_id": 0})
+
+    def update_job(self, job_id: str, fields: Dict[str, Any], owner: Optional[str] = None) -> bool:
+        """Met à jour le job ; avec `owner`, seulement si ce worker en détient toujours le bail."""
+        query = {"job_id": job_id}
+        if owner is not None:
+            query["owner"] = owner
+        result = self.collection.update_one(
+            query,
+            {"$set": {**fields, "updated_at": datetime.utcnow()}}
+        )
+        return result.matched_count > 0
+
+    def claim_job(self, job_id: Optional[str], owner: str, lease_seconds: float) -> Optional[dict]:
+        """
+        Prend atomiquement un job en file, ou un job en cours dont le bail a expiré
+        (worker arrêté ou planté), et le passe en "running" pour `owner`.
+        Sans `job_id`, prend le plus ancien job disponible. Retourne None si aucun.
+        """
+        now = datetime.utcnow()
+        query: Dict[str, Any] = {"$or": [
+            {"status": "queued"},
+            # Jobs en cours sans bail : antérieurs aux baux, repris une fois
+            {"status": "running", "lease_expires_at": {"$lt": now}},
+            {"status": "running", "lease_expires_at": None},
+        ]}
+        if job_id is not None:
+            query["job_id"] = job_id
+        return self.collection.find_one_and_update(
+            query,
+            {"$set": {
+                "status": "running",
+                "owner": owner,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "error": None,
+                "updated_at": now
+            }},
+            projection={"_id": 0},
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        result = self.collection.update_one(
+            {"job_id": job_id, "owner": owner, "status": "running"},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds)}}
+        )
+        return result.matched_count > 0
+
+    def find_unfinished_by_source_hash(self, source_hash: str) -> Optional[dict]:
+        return self.collection.find_one(
+            {"source_hash": source_hash, "status": {"$in": UNFINISHED_STATUSES}},
+            {"_id": 0}
+        )
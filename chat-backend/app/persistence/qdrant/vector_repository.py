@@ -1,10 +1,15 @@
 from app.persistence.interfaces.vector_repository import AbstractVectorRepository
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import threading
 from qdrant_client.http import models
-from app.core.config import QDRANT_COLLECTION_NAME, VECTOR_SIZE
+from app.core.config import (
+    QDRANT_COLLECTION_NAME, VECTOR_SIZE, QDRANT_UPSERT_BATCH_SIZE, QDRANT_UPSERT_MAX_IN_FLIGHT
+)
 from app.persistence.clients.qdrant_client import get_qdrant_client, init_qdrant_collection
 from app.models.qdrant_dto import QdrantDocumentInput
 from app.models.documents import Document
+from app.services.utils.idsFactory import IdsFactory
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +21,83 @@ class VectorQdrantRepository(AbstractVectorRepository):
         init_qdrant_collection(VectorSize=VECTOR_SIZE)
 
     def add_documents(self, documents: List[QdrantDocumentInput]) -> None:
+        # Pas de nettoyage en cas d'échec : utilisé pour mettre à jour les points
+        # d'un document existant (remplacement), que ses métadonnées référencent toujours
+        self._upsert_batches(
+            documents[start:start + QDRANT_UPSERT_BATCH_SIZE]
+            for start in range(0, len(documents), QDRANT_UPSERT_BATCH_SIZE)
+        )
+
+    def add_documents_stream(self, batches: Iterable[List[QdrantDocumentInput]]) -> int:
+        """
+        Indexe un nouveau document lot par lot (voir _upsert_batches).
+        Si l'embedding ou un lot échoue en cours de route, les upserts en vol sont attendus
+        puis les points envoyés par cet appel sont supprimés avant de relever l'erreur :
+        aucune métadonnée ne les référencerait, mais la recherche les trouverait.
+        Seuls ces IDs sont supprimés, pas tout le doc_hash : une indexation concurrente du
+        même contenu, déjà validée, conserve ses points.
+        """
+        upserted_ids: List[str] = []
+        try:
+            return self._upsert_batches(batches, upserted_ids)
+        except Exception:
+            self._delete_partial_points(upserted_ids)
+            raise
+
+    def _delete_partial_points(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        try:
+            self.client.delete(
+                collection_name=QDRANT_COLLECTION_NAME,
+                points_selector=models.PointIdsList(points=ids),
+                wait=True
+            )
+            logger.info(f"Indexation interrompue : {len(ids)} points partiels supprimés")
+        except Exception as e:
+            logger.error(f"Impossible de supprimer les {len(ids)} points partiels: {str(e)}")
+
+    def _upsert_batches(
+        self,
+        batches: Iterable[List[QdrantDocumentInput]],
+        upserted_ids: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Upsert des lots dès leur production, avec au plus QDRANT_UPSERT_MAX_IN_FLIGHT
+        lots en vol (wait=False) : la production du lot N+1 (embedding) recouvre l'envoi du lot N.
+        Une fois tous les envois acquittés, le dernier lot est renvoyé avec wait=True (upsert
+        idempotent) : les mises à jour étant appliquées dans l'ordre, il sert d'attente de
+        cohérence finale.
+        Les IDs de chaque lot envoyé sont ajoutés à `upserted_ids` s'il est fourni.
+        Retourne le nombre de points upsertés.
+        """
+        in_flight = threading.BoundedSemaphore(QDRANT_UPSERT_MAX_IN_FLIGHT)
+        futures = []
+        last: Optional[List[QdrantDocumentInput]] = None
+        count = 0
+
+        with ThreadPoolExecutor(max_workers=QDRANT_UPSERT_MAX_IN_FLIGHT,
+                                thread_name_prefix="qdrant-upsert") as executor:
+            for batch in batches:
+                if not batch:
+                    continue
+                count += len(batch)
+                if upserted_ids is not None:
+                    upserted_ids.extend(doc.id for doc in batch)
+                in_flight.acquire()
+                future = executor.submit(self._upsert, batch, False)
+                future.add_done_callback(lambda _: in_flight.release())
+                futures.append(future)
+                last = batch
+
+            for future in futures:
+                future.result()
+
+        if last is not None:
+            self._upsert(last, True)
+        return count
+
+    def _upsert(self, documents: List[QdrantDocumentInput], wait: bool) -> None:
         points = [
             models.PointStruct(
                 id=doc.id,
@@ -29,7 +111,8 @@ class VectorQdrantRepository(AbstractVectorRepository):
 
         self.client.upsert(
             collection_name=QDRANT_COLLECTION_NAME,
-            points=points
+            points=points,
+            wait=wait
         )
 
     def semantic_search(
@@ -63,59 +146,81 @@ class VectorQdrantRepository(AbstractVectorRepository):
         main_results = self.semantic_search(query_vector, top_k=top_k, filter=filter)
         logger.debug(f"Found {len(main_results)} main results")
 
-        expanded_results: List[Document] = []
-        seen_ids = set()
-
+        # Les IDs des chunks voisins sont déterministes : on les calcule localement
+        # puis on les récupère tous en un seul appel `retrieve`.
+        neighbor_ids_by_doc: List[List[str]] = []
         for doc in main_results:
-            expanded_results.append(doc)
-            seen_ids.add(doc.id)
-
             file_hash = doc.metadata.get("doc_hash")
             chunk_index = doc.metadata.get("chunk_index")
             logger.debug(f"Processing doc id={doc.id}, hash={file_hash}, index={chunk_index}")
 
             if file_hash is None or chunk_index is None:
                 logger.warning(f"Skipping expansion for doc id={doc.id} due to missing metadata")
+                neighbor_ids_by_doc.append([])
                 continue
 
-            for neighbor_index in (chunk_index - 1, chunk_index + 1):
-                logger.debug(f"Looking for neighbor at index={neighbor_index}")
-                neighbor_filter = models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="doc_hash",
-                            match=models.MatchValue(value=file_hash)
-                        ),
-                        models.FieldCondition(
-                            key="chunk_index",
-                            match=models.MatchValue(value=neighbor_index)
-                        )
-                    ]
-                )
-                neighbors = self.semantic_search(query_vector, top_k=1, filter=neighbor_filter)
-                if neighbors:
-                    neighbor = neighbors[0]
-                    if neighbor.id not in seen_ids:
-                        expanded_results.append(neighbor)
-                        seen_ids.add(neighbor.id)
-                        logger.info(f"Added neighbor id={neighbor.id} at index={neighbor_index}")
-                    else:
-                        logger.debug(f"Neighbor id={neighbor.id} already seen, skipping")
+            neighbor_ids_by_doc.append([
+                IdsFactory.build_chunk_id(file_hash, neighbor_index)
+                for neighbor_index in (chunk_index - 1, chunk_index + 1)
+                if neighbor_index >= 0
+            ])
+
+        neighbors_by_id = self.retrieve_by_ids(
+            list({nid for ids in neighbor_ids_by_doc for nid in ids})
+        )
+
+        expanded_results: List[Document] = []
+        seen_ids = set()
+
+        for doc, neighbor_ids in zip(main_results, neighbor_ids_by_doc):
+            expanded_results.append(doc)
+            seen_ids.add(doc.id)
+
+            for neighbor_id in neighbor_ids:
+                neighbor = neighbors_by_id.get(neighbor_id)
+                if neighbor is None:
+                    logger.debug(f"No neighbor found with id={neighbor_id}")
+                elif neighbor.id not in seen_ids:
+                    expanded_results.append(neighbor)
+                    seen_ids.add(neighbor.id)
+                    logger.info(f"Added neighbor id={neighbor.id} at index={neighbor.metadata.get('chunk_index')}")
                 else:
-                    logger.debug(f"No neighbor found at index={neighbor_index}")
+                    logger.debug(f"Neighbor id={neighbor.id} already seen, skipping")
 
         logger.info(f"Expansion complete: total results = {len(expanded_results)}")
         return expanded_results
+
+    def retrieve_by_ids(self, ids: List[str]) -> Dict[str, Document]:
+        """
+        Récupère en un seul aller-retour les points dont les IDs sont fournis.
+        Les IDs absents de la collection sont simplement ignorés.
+        """
+        if not ids:
+            return {}
+
+        records = self.client.retrieve(
+            collection_name=QDRANT_COLLECTION_NAME,
+            ids=ids,
+            with_payload=True,
+            with_vectors=False,
+        )
+        return {
+            str(r.id): Document(
+                id=str(r.id),
+                text=r.payload.get("content", ""),
+                metadata={k: v for k, v in r.payload.items() if k != "content"},
+            ) for r in records
+        }
     
     def delete_document(self, file_hash: str) -> bool:
         """
-        Supprime tous les documents ayant le file_hash spécifié
+        Supprime tous les chunks dont le doc_hash est celui spécifié
         et vérifie s'ils ont bien été supprimés.
         """
         delete_filter = models.Filter(
             must=[
                 models.FieldCondition(
-                    key="file_hash",
+                    key="doc_hash",
                     match=models.MatchValue(value=file_hash)
                 )
             ]
@@ -134,4 +239,45 @@ class VectorQdrantRepository(AbstractVectorRepository):
             limit=1
         )
 
-        return len(remaining[0]) == 0  
\ No newline at end of file
+        return len(remaining[0]) == 0
+
+    def get_document_chunks(self, doc_hash: str) -> List[QdrantDocumentInput]:
+        """Récupère tous les chunks d'un document, avec leurs vecteurs."""
+        doc_filter = models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="doc_hash",
+                    match=models.MatchValue(value=doc_hash)
+                )
+            ]
+        )
+
+        chunks: List[QdrantDocumentInput] = []
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=QDRANT_COLLECTION_NAME,
+                scroll_filter=doc_filter,
+                limit=256,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            chunks.extend(
+                QdrantDocumentInput(
+                    id=str(r.id),
+                    content=r.payload.get("content", ""),
+                    metadata={k: v for k, v in r.payload.items() if k != "content"},
+                    embedding=r.vector
+                ) for r in records
+            )
+            if offset is None:
+                return chunks
+
+    def delete_points(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        self.client.delete(
+            collection_name=QDRANT_COLLECTION_NAME,
+            points_selector=models.PointIdsList(points=ids)
+        )
@@ -1,10 +1,22 @@
 from fastapi import UploadFile
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import logging
+import threading
+import time
 
 from app.services.interfaces.admin_interface import AdminInterface
 from app.services.interfaces.document_interface import DocumentInterface
 from app.services.interfaces.vector_interface import VectorInterface
 from app.services.interfaces.llm_interface import LlmInterface
+from app.services.interfaces.ingestion_interface import IngestionInterface
+from app.core.config import QUERY_EMBEDDING_BATCHING, INFERENCE_MODE
+from app.core.embedding import embed_model
+from app.core.executors import run_cpu, run_io
+from app.services.utils.latency_tracker import LatencyTracker
+from app.services.utils.answer_cache import AnswerCache
+from app.services.utils.semantic_answer_cache import SemanticAnswerCache, SemanticMatch
+
+logger = logging.getLogger(__name__)
 
 class ApplicationFacade:
     """
@@ -16,11 +28,20 @@ class ApplicationFacade:
                  admin_service: AdminInterface,
                  document_service: DocumentInterface,
                  vector_service: VectorInterface,
-                 llm_service: LlmInterface):
+                 llm_service: LlmInterface,
+                 ingestion_service: IngestionInterface,
+                 answer_cache: Optional[AnswerCache] = None,
+                 semantic_cache: Optional[SemanticAnswerCache] = None):
         self.admin_service = admin_service
         self.document_service = document_service
         self.vector_service = vector_service
         self.llm_service = llm_service
+        self.ingestion_service = ingestion_service
+        self.answer_cache = answer_cache
+        self.semantic_cache = semantic_cache
+        # Latence perçue des réponses RAG : premier fragment de réponse et réponse complète
+        self.time_to_first_token = LatencyTracker()
+        self.generation_time = LatencyTracker()
     
     # ==================== AUTHENTIFICATION ====================
     
@@ -34,6 +55,22 @@ class ApplicationFacade:
         """Upload, traite et vectorise un document PDF."""
         return await self.document_service.upload_and_process(file, system_name)
     
+    def submit_document_ingestion(self, file: UploadFile, system_name: str,
+                                  chunking_strategy: Optional[str] = None) -> Dict:
+        """Sauvegarde le document et planifie sa vectorisation en arrière-plan."""
+        return self.ingestion_service.submit_job(file, system_name,
+                                                 chunking_strategy=chunking_strategy)
+    
+    def submit_document_replacement(self, file: UploadFile, system_name: str,
+                                    chunking_strategy: Optional[str] = None) -> Dict:
+        """Planifie la mise à jour incrémentale du document de même nom et même système."""
+        return self.ingestion_service.submit_job(file, system_name, mode="replace",
+                                                 chunking_strategy=chunking_strategy)
+    
+    def get_ingestion_job(self, job_id: str) -> Optional[Dict]:
+        """Récupère l'état d'un job d'ingestion."""
+        return self.ingestion_service.get_job(job_id)
+    
     def get_all_documents(self) -> List[Dict]:
         """Récupère la liste de tous les documents."""
         return self.document_service.get_all_documents()
@@ -44,15 +81,23 @@ class ApplicationFacade:
     
     # ==================== RECHERCHE ET RAG ====================
     
-    def search_and_generate_answer(self, question: str, top_k: int = 3) -> Dict:
+    async def search_and_generate_answer(self, question: str, top_k: int = 3) -> Dict:
         """
         Orchestration complète RAG : recherche vectorielle + génération de réponse.
+        Chaque étape bloquante s'exécute dans l'exécuteur de sa classe de charge.
+        La réponse est servie depuis le cache si la même question, ou une reformulation
+        proche, a déjà été posée avec les mêmes chunks retrouvés, sur la même version du corpus.
         """
+        start_time = time.perf_counter()
+        # Version lue avant la recherche : une modification du corpus pendant la requête la rend périmée
+        corpus_version = await run_io(self._corpus_version)
+        
         # 1. Générer l'embedding de la question
-        question_vector = self.vector_service.get_text_embedding(question)
+        question_vector = await self._embed_question(question)
         
         # 2. Recherche sémantique avec expansion
-        similar_documents = self.vector_service.semantic_search_with_expansion(
+        similar_documents = await run_io(
+            self.vector_service.semantic_search_with_expansion,
             query_vector=question_vector,
             top_k=top_k
         )
@@ -60,21 +105,115 @@ class ApplicationFacade:
         # 3. Extraction des textes des chunks
         retrieved_chunks = [doc.text for doc in similar_documents]
         
-        # 4. Génération de la réponse avec contexte
-        answer = self.llm_service.query_with_context(question, retrieved_chunks)
+        # 4. Réponse en cache, sinon génération avec contexte
+        # (calcul fait par l'ordonnanceur de génération : l'appelant ne fait qu'attendre son lot)
+        chunk_ids = [doc.id for doc in similar_documents]
+        answer, audited = self._cached_answer(question, top_k, question_vector, chunk_ids, corpus_version)
+        from_cache = answer is not None
+        if not from_cache:
+            answer = await run_io(self.llm_service.query_with_context, question, retrieved_chunks)
+            await self._remember_answer(question, top_k, question_vector, chunk_ids,
+                                        corpus_version, answer, audited)
+        
+        # Sans streaming, le premier token n'arrive qu'avec la réponse complète
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.time_to_first_token.record(elapsed_ms)
+        self.generation_time.record(elapsed_ms)
         
         return {
             "question": question,
             "answer": answer,
             "sources_count": len(retrieved_chunks),
-            "chunks_used": retrieved_chunks[:2] if retrieved_chunks else []  # Limité pour la réponse
+            "chunks_used": retrieved_chunks[:2] if retrieved_chunks else [],  # Limité pour la réponse
+            "from_cache": from_cache
+        }
+    
+    def ensure_generation_capacity(self) -> None:
+        """Refuse immédiatement (429/503) une requête que la file de génération ne peut pas accepter."""
+        self.llm_service.ensure_generation_capacity()
+    
+    async def stream_search_and_answer(self, question: str, top_k: int = 3) -> AsyncIterator[Dict]:
+        """
+        RAG en streaming : produit d'abord un événement "metadata" (sources retrouvées),
+        puis des événements "token" au fil de la génération, et enfin "done" avec les
+        latences. Fermer l'itérateur (client déconnecté) interrompt la génération.
+        Une réponse en cache est envoyée en un seul événement "token".
+        """
+        start_time = time.perf_counter()
+        corpus_version = await run_io(self._corpus_version)
+        question_vector = await self._embed_question(question)
+        similar_documents = await run_io(
+            self.vector_service.semantic_search_with_expansion,
+            query_vector=question_vector,
+            top_k=top_k
+        )
+        retrieved_chunks = [doc.text for doc in similar_documents]
+        chunk_ids = [doc.id for doc in similar_documents]
+        cached_answer, audited = self._cached_answer(question, top_k, question_vector, chunk_ids, corpus_version)
+        
+        yield {
+            "event": "metadata",
+            "data": {
+                "question": question,
+                "from_cache": cached_answer is not None,
+                "sources_count": len(retrieved_chunks),
+                "sources": [
+                    {
+                        "filename": doc.metadata.get("filename"),
+                        "chunk_index": doc.metadata.get("chunk_index"),
+                        "page_start": doc.metadata.get("page_start"),
+                        "page_end": doc.metadata.get("page_end")
+                    }
+                    for doc in similar_documents
+                ],
+                "retrieval_time": round(time.perf_counter() - start_time, 3)
+            }
+        }
+        
+        if cached_answer is not None:
+            fragments = iter([cached_answer])
+            stop = None
+        else:
+            stop = threading.Event()
+            fragments = self.llm_service.stream_with_context(question, retrieved_chunks, stop.is_set)
+        first_token_ms = None
+        answer_parts = []
+        try:
+            while True:
+                fragment = await run_io(next, fragments, None)
+                if fragment is None:
+                    break
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start_time) * 1000
+                    self.time_to_first_token.record(first_token_ms)
+                answer_parts.append(fragment)
+                yield {"event": "token", "data": {"text": fragment}}
+        finally:
+            if stop is not None:
+                stop.set()
+        
+        # Seule une génération menée à son terme est mise en cache
+        if cached_answer is None:
+            await self._remember_answer(question, top_k, question_vector, chunk_ids,
+                                        corpus_version, "".join(answer_parts), audited)
+        
+        total_ms = (time.perf_counter() - start_time) * 1000
+        self.generation_time.record(total_ms)
+        yield {
+            "event": "done",
+            "data": {
+                "time_to_first_token": round(first_token_ms / 1000, 3) if first_token_ms is not None else None,
+                "processing_time": round(total_ms / 1000, 3),
+                "from_cache": cached_answer is not None
+            }
         }
     
-    def semantic_search_only(self, question: str, top_k: int = 5) -> List[Dict]:
+    async def semantic_search_only(self, question: str, top_k: int = 5) -> List[Dict]:
         """Effectue uniquement une recherche sémantique sans génération."""
-        question_vector = self.vector_service.get_text_embedding(question)
+        question_vector = await self._embed_question(question)
         
-        similar_documents = self.vector_service.semantic_search(
+        similar_documents = await run_io(
+            self.vector_service.semantic_search,
             query_vector=question_vector,
             top_k=top_k
         )
@@ -88,8 +227,92 @@ class ApplicationFacade:
             for doc in similar_documents
         ]
     
+    async def _embed_question(self, question: str) -> List[float]:
+        """
+        Embedding de la question. Avec le micro-batching, le calcul est fait par le thread
+        du batcher et l'appelant ne fait qu'attendre son lot : l'attente passe par
+        l'exécuteur I/O pour ne pas limiter la taille des lots au nombre de threads CPU.
+        En mode remote, l'embedding est un appel HTTP au serveur de modèles : I/O aussi.
+        """
+        if QUERY_EMBEDDING_BATCHING or INFERENCE_MODE == "remote":
+            return await run_io(self.vector_service.get_text_embedding, question)
+        return await run_cpu(self.vector_service.get_text_embedding, question)
+    
+    def _corpus_version(self) -> Optional[int]:
+        """Version du corpus pour les caches de réponses ; None (caches contournés) si indisponible."""
+        if self.answer_cache is None and self.semantic_cache is None:
+            return None
+        try:
+            return self.document_service.get_corpus_version()
+        except Exception as e:
+            logger.warning(f"Version du corpus indisponible, caches de réponses contournés: {str(e)}")
+            return None
+    
+    def _cached_answer(self, question: str, top_k: int, question_vector: List[float],
+                       chunk_ids: List[str], corpus_version: Optional[int]) -> Tuple[Optional[str], Optional[SemanticMatch]]:
+        """
+        Réponse en cache : cache exact, puis cache sémantique. Une réponse sémantique tirée
+        pour audit n'est pas servie : elle est retournée en second pour être comparée
+        à la réponse qui sera générée.
+        """
+        if corpus_version is None:
+            return None, None
+        if self.answer_cache is not None:
+            answer = self.answer_cache.get(self.answer_cache.key(question, top_k, chunk_ids), corpus_version)
+            if answer is not None:
+                return answer, None
+        if self.semantic_cache is not None:
+            match = self.semantic_cache.lookup(question_vector, chunk_ids, corpus_version)
+            if match is not None:
+                if self.semantic_cache.should_audit():
+                    return None, match
+                if self.answer_cache is not None:
+                    self.answer_cache.put(self.answer_cache.key(question, top_k, chunk_ids),
+                                          match.answer, corpus_version)
+                return match.answer, None
+        return None, None
+    
+    async def _remember_answer(self, question: str, top_k: int, question_vector: List[float],
+                               chunk_ids: List[str], corpus_version: Optional[int],
+                               answer: str, audited: Optional[SemanticMatch]) -> None:
+        """
+        Met en cache une réponse générée ; si elle remplace une réponse sémantique auditée, les compare.
+        Seules les générations réussies arrivent ici (un échec lève une exception) ;
+        une réponse vide n'est pas mise en cache.
+        """
+        if corpus_version is None or not answer.strip():
+            return
+        if self.answer_cache is not None:
+            self.answer_cache.put(self.answer_cache.key(question, top_k, chunk_ids), answer, corpus_version)
+        if self.semantic_cache is None:
+            return
+        if audited is None:
+            self.semantic_cache.put(question, question_vector, chunk_ids, answer, corpus_version)
+            return
+        # Appel direct au modèle : les réponses n'ont pas leur place dans le cache des embeddings de questions
+        cached_vector, fresh_vector = await run_cpu(embed_model.get_text_embedding_batch, [audited.answer, answer])
+        if self.semantic_cache.record_audit(cached_vector, fresh_vector):
+            logger.warning(
+                f"Audit du cache sémantique: la réponse de '{audited.question[:50]}' ne convient pas "
+                f"à '{question[:50]}' (similarité des questions {audited.similarity:.3f})"
+            )
+    
     # ==================== UTILITAIRES ====================
     
+    def get_generation_stats(self) -> Dict:
+        """Latences des réponses RAG ; le temps jusqu'au premier token est la latence de référence."""
+        return {
+            "time_to_first_token": self.time_to_first_token.stats(),
+            "total": self.generation_time.stats(),
+            "scheduler": self.llm_service.get_scheduler_stats(),
+            "answer_cache": self.answer_cache.stats() if self.answer_cache else None,
+            "semantic_cache": self.semantic_cache.stats() if self.semantic_cache else None
+        }
+    
+    def get_embedding_stats(self) -> Dict:
+        """Statistiques des embeddings de requêtes (micro-batching et cache)."""
+        return self.vector_service.get_embedding_stats()
+    
     def get_document_by_hash(self, file_hash: str) -> Dict:
         """Récupère un document spécifique par son hash."""
         doc = self.document_service.find_by_hash(file_hash)
@@ -1,70 +1,288 @@
 # app/services/implementations/document_service.py
 from fastapi import HTTPException, UploadFile
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
+import datetime
 import logging
+import os
 
 from app.services.interfaces.document_interface import DocumentInterface
 from app.services.implementations.pdf_processor import PdfProcessor
 from app.services.implementations.vector_service import QdrantVectorService
 from app.persistence.interfaces.document_repository import AbstractDocumentRepository
+from app.persistence.interfaces.corpus_repository import AbstractCorpusRepository
 from app.models.pdf_metadata import PDFMetadata
+from app.models.qdrant_dto import QdrantDocumentInput
+from app.services.utils.idsFactory import IdsFactory
+from app.core.config import CHUNKING_STRATEGY
 
 logger = logging.getLogger(__name__)
 
+# Étapes du pipeline d'ingestion, dans l'ordre d'exécution
+# ("indexing" recouvre l'embedding des chunks et leur upsert dans Qdrant)
+INGESTION_STAGES = ["extraction", "cleaning", "chunking", "indexing", "metadata"]
+
 class PdfDocumentService(DocumentInterface):
     def __init__(self, 
                  document_repository: AbstractDocumentRepository,
                  vector_service: QdrantVectorService,
-                 pdf_processor: PdfProcessor):
+                 pdf_processor: PdfProcessor,
+                 corpus_repository: AbstractCorpusRepository):
         self.document_repository = document_repository
         self.vector_service = vector_service
         self.pdf_processor = pdf_processor
+        self.corpus_repository = corpus_repository
     
     async def upload_and_process(self, file: UploadFile, system_name: str) -> Dict:
+        file_path, source_hash = self.save_upload(file)
+        self.ensure_not_duplicate(source_hash, file_path)
+        return await self.process_saved_file(file_path, file.filename, system_name,
+                                             source_hash=source_hash)
+    
+    def save_upload(self, file: UploadFile) -> Tuple[str, str]:
+        """Sauvegarde le fichier uploadé sur disque et retourne (chemin, hash des octets bruts)."""
+        return self.pdf_processor.save_uploaded_pdf(file)
+    
+    def ensure_not_duplicate(self, source_hash: str, file_path: Optional[str] = None) -> None:
+        """
+        Rejette immédiatement un fichier déjà vectorisé, à partir du hash des octets bruts.
+        Le fichier sauvegardé est supprimé en cas de doublon.
+        """
+        if self.document_repository.find_by_source_hash(source_hash) is not None:
+            if file_path:
+                self.discard_upload(file_path)
+            raise HTTPException(
+                status_code=400,
+                detail="Le fichier a déjà été vectorisé !"
+            )
+    
+    async def process_saved_file(self, 
+                                 file_path: str, 
+                                 file_name: str, 
+                                 system_name: str,
+                                 on_stage: Optional[Callable[[str], None]] = None,
+                                 source_hash: Optional[str] = None,
+                                 chunking_strategy: Optional[str] = None) -> Dict:
+        """
+        Extrait, découpe, vectorise et indexe un PDF déjà présent sur disque.
+        `on_stage` est appelé au début de chaque étape (voir INGESTION_STAGES).
+        `chunking_strategy` : "semantic" ou "token_window" (CHUNKING_STRATEGY par défaut).
+        """
+        notify = on_stage or (lambda stage: None)
+        duplicate_error = HTTPException(
+            status_code=400, 
+            detail="Le fichier a déjà été vectorisé !"
+        )
         try:
-            # Sauvegarde et extraction du texte
-            file_path = self.pdf_processor.save_uploaded_pdf(file)
-            full_text = self.pdf_processor.extract_full_text(file_path)
-            cleaned_text = self.pdf_processor.clean_text(full_text)
+            # Extraction du texte
+            notify("extraction")
+            pages = self.pdf_processor.extract_pages(file_path)
+            notify("cleaning")
+            cleaned_text = self.pdf_processor.clean_text(self.pdf_processor.join_pages(pages))
+            page_offsets = self.pdf_processor.locate_pages(pages, cleaned_text)
             
-            # Vectorisation
-            qdrant_dtos, pdf_metadata = await self.pdf_processor.vectorize_text(
+            # Vérification doublon sur le texte nettoyé, avant le découpage et l'embedding
+            content_hash = IdsFactory(cleaned_text).get_pdf_hash()
+            if self.document_repository.find_by_hash(content_hash) is not None:
+                raise duplicate_error
+            # Le hash sert de namespace aux IDs des chunks : s'il est celui d'un document remplacé
+            # depuis (version antérieure), les points de ce document seraient écrasés
+            if self.document_repository.find_by_chunk_namespace(content_hash) is not None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Le fichier correspond à une version antérieure d'un document déjà vectorisé"
+                )
+            
+            # Découpage ; les lots de chunks sont embeddés à la demande
+            notify("chunking")
+            chunk_batches, pdf_metadata = self.pdf_processor.vectorize_text_in_batches(
                 text=cleaned_text,
-                file_name=file.filename,
+                file_name=file_name,
                 system_name=system_name,
+                source_hash=source_hash,
+                page_offsets=page_offsets,
+                chunking_strategy=chunking_strategy,
             )
             
-            content_hash = pdf_metadata.file_hash
+            # Embedding et ajout dans le store vectoriel en pipeline
+            # (IDs déterministes : un upsert concurrent est idempotent)
+            notify("indexing")
+            try:
+                self.vector_service.add_documents_stream(chunk_batches)
+            finally:
+                self._bump_corpus_version()
             
-            # Vérification doublon
-            if self.document_repository.find_by_hash(content_hash) is None:
-                # Ajout dans le store vectoriel
-                self.vector_service.add_documents(qdrant_dtos)
-                
-                # Sauvegarde des métadonnées
-                doc_id = self.document_repository.insert_pdf_metadata(pdf_metadata)
+            # Sauvegarde des métadonnées ; l'index unique sur file_hash tranche les uploads concurrents
+            notify("metadata")
+            doc_id = self.document_repository.insert_pdf_metadata(pdf_metadata)
+            if doc_id is None:
+                raise duplicate_error
+            
+            return {
+                "status": "success",
+                "message": "Document vectorisé avec succès",
+                "file_hash": content_hash,
+                "document_id": doc_id,
+                "chunks_count": pdf_metadata.chunks_count
+            }
                 
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement du document: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail="Erreur lors du traitement du document"
+            )
+    
+    async def replace_saved_file(self,
+                                 file_path: str,
+                                 file_name: str,
+                                 system_name: str,
+                                 on_stage: Optional[Callable[[str], None]] = None,
+                                 source_hash: Optional[str] = None,
+                                 chunking_strategy: Optional[str] = None) -> Dict:
+        """
+        Remplace la version indexée du document (même filename et system_name) par ce fichier.
+        Seuls les chunks nouveaux sont embeddés ; seuls les chunks modifiés sont upsertés
+        et seuls les chunks en trop sont supprimés. Les IDs restent dérivés du même
+        namespace et des index, pour que l'expansion par voisins reste cohérente.
+        Sans stratégie explicite, celle de la version existante est reprise.
+        Sans version existante, le document est simplement créé.
+        """
+        existing = self.document_repository.find_by_name(file_name, system_name)
+        if existing is None:
+            return await self.process_saved_file(file_path, file_name, system_name,
+                                                 on_stage=on_stage, source_hash=source_hash,
+                                                 chunking_strategy=chunking_strategy)
+        chunking_strategy = chunking_strategy or existing.get("chunking_strategy") or CHUNKING_STRATEGY
+        
+        notify = on_stage or (lambda stage: None)
+        try:
+            notify("extraction")
+            pages = self.pdf_processor.extract_pages(file_path)
+            notify("cleaning")
+            cleaned_text = self.pdf_processor.clean_text(self.pdf_processor.join_pages(pages))
+            page_offsets = self.pdf_processor.locate_pages(pages, cleaned_text)
+            
+            new_hash = IdsFactory(cleaned_text).get_pdf_hash()
+            if new_hash == existing["file_hash"]:
                 return {
-                    "status": "success",
-                    "message": "Document vectorisé avec succès",
-                    "file_hash": content_hash,
-                    "document_id": doc_id
+                    "status": "unchanged",
+                    "message": "Le document est identique à la version indexée",
+                    "file_hash": new_hash,
+                    "document_id": str(existing["_id"]),
+                    "chunks_count": existing.get("chunks_count")
                 }
-            else:
+            if self.document_repository.find_by_hash(new_hash) is not None:
                 raise HTTPException(
-                    status_code=400, 
+                    status_code=400,
                     detail="Le fichier a déjà été vectorisé !"
                 )
-                
+            
+            # Diff par hash de contenu avec les chunks stockés
+            notify("chunking")
+            chunk_namespace = existing.get("chunk_namespace") or existing["file_hash"]
+            stored_chunks = self.vector_service.get_document_chunks(chunk_namespace)
+            stored_by_index = {chunk.metadata.get("chunk_index"): chunk for chunk in stored_chunks}
+            stored_vectors = {
+                chunk.metadata.get("content_hash") or IdsFactory.hash_content(chunk.content): chunk.embedding
+                for chunk in stored_chunks
+            }
+            
+            nodes = self.pdf_processor.split_text(cleaned_text, file_name, chunking_strategy)
+            
+            notify("indexing")
+            embeddings = [stored_vectors.get(IdsFactory.hash_content(node.text)) for node in nodes]
+            to_embed = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if to_embed:
+                computed = self.pdf_processor.embed_nodes([nodes[i] for i in to_embed])
+                for i, embedding in zip(to_embed, computed):
+                    embeddings[i] = embedding
+            
+            new_chunks = self.pdf_processor.build_chunk_inputs(
+                nodes, embeddings, chunk_namespace, file_name, system_name,
+                datetime.datetime.utcnow().isoformat(), page_offsets
+            )
+            changed = [chunk for chunk in new_chunks
+                       if not self._same_chunk(stored_by_index.get(chunk.metadata["chunk_index"]), chunk)]
+            removed_ids = [chunk.id for index, chunk in stored_by_index.items()
+                           if index is None or index >= len(new_chunks)]
+            
+            try:
+                self.vector_service.add_documents(changed)
+                self.vector_service.delete_points(removed_ids)
+            finally:
+                self._bump_corpus_version()
+            
+            notify("metadata")
+            updated = self.document_repository.update_by_hash(existing["file_hash"], {
+                "file_hash": new_hash,
+                "source_hash": source_hash,
+                "chunk_namespace": chunk_namespace,
+                "chunks_count": len(new_chunks),
+                "chunking_strategy": chunking_strategy,
+                "version": existing.get("version", 1) + 1,
+                "updated_at": datetime.datetime.utcnow().isoformat()
+            })
+            if not updated:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Le document a été modifié pendant le remplacement"
+                )
+            
+            logger.info(
+                f"Document '{file_name}' remplacé: {len(to_embed)} chunks embeddés, "
+                f"{len(changed)} upsertés, {len(removed_ids)} supprimés"
+            )
+            return {
+                "status": "success",
+                "message": "Document mis à jour avec succès",
+                "file_hash": new_hash,
+                "document_id": str(existing["_id"]),
+                "chunks_count": len(new_chunks),
+                "chunks_embedded": len(to_embed),
+                "chunks_upserted": len(changed),
+                "chunks_deleted": len(removed_ids)
+            }
+        
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Erreur lors du traitement du document: {str(e)}")
+            logger.error(f"Erreur lors du remplacement du document: {str(e)}")
             raise HTTPException(
                 status_code=500,
-                detail="Erreur lors du traitement du document"
+                detail="Erreur lors du remplacement du document"
             )
     
+    @staticmethod
+    def _same_chunk(stored: Optional[QdrantDocumentInput], new: QdrantDocumentInput) -> bool:
+        """Un chunk stocké est conservé tel quel si son contenu et ses pages n'ont pas changé."""
+        if stored is None:
+            return False
+        return (
+            stored.content == new.content
+            and stored.metadata.get("page_start") == new.metadata.get("page_start")
+            and stored.metadata.get("page_end") == new.metadata.get("page_end")
+        )
+    
+    def get_corpus_version(self) -> int:
+        return self.corpus_repository.get_version()
+    
+    def _bump_corpus_version(self) -> None:
+        """Signale une modification des chunks indexés (même partielle) : les réponses en cache sont périmées."""
+        try:
+            version = self.corpus_repository.bump_version()
+            logger.info(f"Corpus modifié, nouvelle version: {version}")
+        except Exception as e:
+            logger.error(f"Impossible d'incrémenter la version du corpus: {str(e)}")
+    
+    def discard_upload(self, file_path: str) -> None:
+        """Supprime un fichier uploadé qui ne sera pas traité."""
+        try:
+            os.remove(file_path)
+        except OSError as e:
+            logger.warning(f"Impossible de supprimer le fichier {file_path}: {str(e)}")
+    
     def get_all_documents(self) -> List[Dict]:
         try:
             documents: List[PDFMetadata] = self.document_repository.list_documents()
@@ -86,10 +304,13 @@ class PdfDocumentService(DocumentInterface):
     
     def delete_document(self, file_hash: str) -> Dict:
         try:
-            # Suppression du store vectoriel
-            deleted_vector = self.vector_service.delete_document(file_hash)
-            
+            # Suppression du store vectoriel (les IDs des chunks dérivent du namespace, stable entre versions)
+            document = self.document_repository.find_by_hash(file_hash)
+            chunk_namespace = (document or {}).get("chunk_namespace") or file_hash
+            deleted_vector = self.vector_service.delete_document(chunk_namespace)
             if deleted_vector:
+                self._bump_corpus_version()
+                
                 # Suppression des métadonnées
                 deleted_metadata = self.document_repository.delete_by_hash(file_hash)
                 
@@ -0,0 +1,262 @@
+# app/services/implementations/ingestion_service.py
+from fastapi import HTTPException, UploadFile, status
+from typing import Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+
+from app.core.config import (
+    INGESTION_WORKERS, INGESTION_QUEUE_SIZE, INGESTION_LEASE_SECONDS, INGESTION_POLL_SECONDS,
+    CHUNKING_STRATEGIES
+)
+from app.models.ingestion_job import IngestionJob
+from app.persistence.interfaces.job_repository import AbstractJobRepository
+from app.services.interfaces.document_interface import DocumentInterface
+from app.services.interfaces.ingestion_interface import IngestionInterface
+from app.services.implementations.document_service import INGESTION_STAGES
+
+logger = logging.getLogger(__name__)
+
+class IngestionJobService(IngestionInterface):
+    """
+    File d'ingestion asynchrone : l'upload enregistre le fichier et un job en base,
+    un pool borné de threads workers (hors event loop de l'API) exécute le pipeline.
+    Avec plusieurs processus (workers uvicorn), chaque job est pris atomiquement avec un
+    bail renouvelé pendant son exécution : un seul processus l'exécute, et les jobs d'un
+    processus arrêté ne sont repris qu'à l'expiration de leur bail.
+    """
+    
+    def __init__(self,
+                 job_repository: AbstractJobRepository,
+                 document_service: DocumentInterface,
+                 max_workers: int = INGESTION_WORKERS,
+                 max_pending: int = INGESTION_QUEUE_SIZE):
+        self.job_repository = job_repository
+        self.document_service = document_service
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        # Identifiant de ce processus auprès des autres, pour les baux des jobs
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    
+    def start(self) -> None:
+        if self._workers:
+            return
+        
+        # Les jobs interrompus par un redémarrage sont repris par les workers inactifs
+        # (voir _claim_orphan), une fois leur bail expiré
+        for i in range(self.max_workers):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"ingestion-worker-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"{self.max_workers} workers d'ingestion démarrés")
+    
+    def stop(self) -> None:
+        for _ in self._workers:
+            self._queue.put(None)
+        self._workers = []
+    
+    def submit_job(self, file: UploadFile, system_name: str, mode: str = "create",
+                   chunking_strategy: Optional[str] = None) -> Dict:
+        if chunking_strategy is not None and chunking_strategy not in CHUNKING_STRATEGIES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Stratégie de découpage inconnue: {chunking_strategy} "
+                       f"(valeurs possibles: {', '.join(CHUNKING_STRATEGIES)})"
+            )
+        if self._queue.qsize() >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="File d'ingestion pleine, réessayez plus tard",
+                headers={"Retry-After": "30"}
+            )
+        
+        file_path, source_hash = self.document_service.save_upload(file)
+        
+        # Rejet immédiat des doublons : document déjà indexé ou déjà en cours d'ingestion.
+        # En remplacement, un fichier identique à la version indexée est signalé "unchanged"
+        # par replace_saved_file, et un doublon d'un autre document y est rejeté par son hash.
+        if mode != "replace":
+            self.document_service.ensure_not_duplicate(source_hash, file_path)
+        if self.job_repository.find_unfinished_by_source_hash(source_hash) is not None:
+            self.document_service.discard_upload(file_path)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Ce fichier est déjà en cours de vectorisation"
+            )
+        
+        job = IngestionJob(
+            job_id=str(uuid.uuid4()),
+            filename=file.filename,
+            system_name=system_name,
+            file_path=file_path,
+            source_hash=source_hash,
+            mode=mode,
+            chunking_strategy=chunking_strategy
+        )
+        self.job_repository.insert_job(job)
+        self._queue.put(job.job_id)
+        
+        logger.info(f"Job d'ingestion {job.job_id} créé pour '{file.filename}'")
+        return self.get_job(job.job_id)
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        return self.job_repository.find_by_id(job_id)
+    
+    # ==================== WORKERS ====================
+    
+    def _worker_loop(self) -> None:
+        while True:
+            try:
+                job_id = self._queue.get(timeout=INGESTION_POLL_SECONDS)
+            except queue.Empty:
+                self._claim_orphan()
+                continue
+            if job_id is None:
+                self._queue.task_done()
+                break
+            try:
+                job = self.job_repository.claim_job(job_id, self.owner, INGESTION_LEASE_SECONDS)
+                if job is None:
+                    logger.info(f"Job d'ingestion {job_id} déjà pris en charge par un autre worker")
+                else:
+                    self._run_job(job)
+            except Exception as e:
+                logger.error(f"Erreur inattendue du worker sur le job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+    
+    def _claim_orphan(self) -> None:
+        """Reprend un job en file d'un autre processus, ou un job dont le worker a disparu."""
+        try:
+            job = self.job_repository.claim_job(None, self.owner, INGESTION_LEASE_SECONDS)
+            if job is not None:
+                logger.info(f"Reprise du job d'ingestion {job['job_id']} ({job['filename']})")
+                self._run_job(job)
+        except Exception as e:
+            logger.error(f"Erreur lors de la reprise des jobs d'ingestion: {str(e)}")
+    
+    def _run_job(self, job: Dict) -> None:
+        """Exécute un job déjà pris (status "running", bail détenu par ce processus)."""
+        job_id = job["job_id"]
+        tracker = _StageTracker(self.job_repository, job_id, self.owner)
+        start_time = time.time()
+        
+        with _LeaseHeartbeat(self.job_repository, job_id, self.owner):
+            self._execute(job, tracker)
+        logger.info(f"Job {job_id} traité en {time.time() - start_time:.2f}s")
+    
+    def _execute(self, job: Dict, tracker: "_StageTracker") -> None:
+        job_id = job["job_id"]
+        try:
+            process = (
+                self.document_service.replace_saved_file
+                if job.get("mode") == "replace"
+                else self.document_service.process_saved_file
+            )
+            result = asyncio.run(process(
+                job["file_path"],
+                job["filename"],
+                job["system_name"],
+                on_stage=tracker.enter,
+                source_hash=job.get("source_hash"),
+                chunking_strategy=job.get("chunking_strategy")
+            ))
+            tracker.finish()
+            self.job_repository.update_job(job_id, {
+                "status": "completed",
+                "current_stage": None,
+                "progress": 100.0,
+                "chunks_count": result.get("chunks_count"),
+                "file_hash": result.get("file_hash"),
+                "document_id": result.get("document_id"),
+                "lease_expires_at": None
+            }, owner=self.owner)
+        
+        except HTTPException as e:
+            tracker.finish(failed=True)
+            self.job_repository.update_job(job_id, {"status": "failed", "error": e.detail,
+                                                    "lease_expires_at": None}, owner=self.owner)
+            logger.warning(f"Job {job_id} en échec: {e.detail}")
+        except Exception as e:
+            tracker.finish(failed=True)
+            self.job_repository.update_job(job_id, {"status": "failed", "error": str(e),
+                                                    "lease_expires_at": None}, owner=self.owner)
+            logger.error(f"Job {job_id} en échec: {str(e)}")
+
+
+class _LeaseHeartbeat:
+    """Renouvelle le bail d'un job en arrière-plan tant que son exécution n'est pas terminée."""
+    
+    def __init__(self, job_repository: AbstractJobRepository, job_id: str, owner: str,
+                 lease_seconds: float = INGESTION_LEASE_SECONDS):
+        self.job_repository = job_repository
+        self.job_id = job_id
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{job_id[:8]}", daemon=True)
+    
+    def __enter__(self) -> "_LeaseHeartbeat":
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.job_repository.renew_lease(self.job_id, self.owner, self.lease_seconds):
+                    logger.warning(f"Bail du job {self.job_id} perdu : repris par un autre worker")
+                    return
+            except Exception as e:
+                logger.warning(f"Renouvellement du bail du job {self.job_id} impossible: {str(e)}")
+
+
+class _StageTracker:
+    """Enregistre en base l'avancement et la durée de chaque étape d'un job."""
+    
+    def __init__(self, job_repository: AbstractJobRepository, job_id: str, owner: Optional[str] = None):
+        self.job_repository = job_repository
+        self.job_id = job_id
+        self.owner = owner
+        self.stages: Dict[str, Dict] = {}
+        self._current: Optional[str] = None
+        self._started_at = 0.0
+    
+    def enter(self, stage: str) -> None:
+        self._close_current("completed")
+        self._current = stage
+        self._started_at = time.time()
+        self.stages[stage] = {"status": "running", "started_at": datetime.utcnow(), "duration": None}
+        
+        done = INGESTION_STAGES.index(stage) if stage in INGESTION_STAGES else 0
+        self.job_repository.update_job(self.job_id, {
+            "current_stage": stage,
+            "progress": round(100.0 * done / len(INGESTION_STAGES), 1),
+            "stages": self.stages
+        }, owner=self.owner)
+    
+    def finish(self, failed: bool = False) -> None:
+        self._close_current("failed" if failed else "completed")
+        self.job_repository.update_job(self.job_id, {"stages": self.stages}, owner=self.owner)
+    
+    def _close_current(self, stage_status: str) -> None:
+        if self._current is None:
+            return
+        self.stages[self._current]["status"] = stage_status
+        self.stages[self._current]["duration"] = round(time.time() - self._started_at, 3)
+        self._current = None
@@ -1,20 +1,43 @@
 # app/services/implementations/local_llm_service.py
-from typing import List, Dict
+from typing import Callable, Iterator, List, Dict, Optional
 import logging
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+from fastapi import HTTPException
+from transformers import AutoTokenizer, AutoModelForCausalLM, TextIteratorStreamer
 from app.services.interfaces.llm_interface import LlmInterface
-from app.core.config import MODEL_HF_NAME, DEVICE  
+from app.services.utils.generation_scheduler import GenerationRequest, GenerationScheduler
+from app.services.utils.prefix_cache import PrefixKVCache
+from app.services.utils.assisted_decoding import load_draft_model
+from app.services.utils.model_loading import (
+    LoadTimer, resolve_model_source, precision_model_kwargs, quantize_after_load,
+    model_memory_footprint, peak_rss_bytes
+)
+from app.services.utils.response_cleaning import StreamCleaner, clean_response
+from app.services.utils.idsFactory import IdsFactory
+from app.core.config import (
+    MODEL_HF_NAME, GPT_OSS_MODEL_PATH, LLM_OFFLINE, LLM_CPU_PRECISION, DEVICE,
+    LLM_MAX_BATCH_SIZE, LLM_BATCH_MAX_WAIT_MS, LLM_MAX_QUEUE_SIZE, LLM_CONCURRENCY, LLM_RETRY_AFTER,
+    LLM_PREFIX_CACHE, LLM_TEMPERATURE, LLM_ASSISTED_DECODING, LLM_DRAFT_MODEL_PATH, LLM_ASSISTED_UNIVERSAL
+)
 
 logger = logging.getLogger(__name__)
 
+RAG_SYSTEM_PROMPT = (
+    "Tu es un assistant expert chargé de créer des guides pas à pas. "
+    "Tu DOIS répondre EXCLUSIVEMENT en français. "
+    "Fournis des réponses sous forme d'un guide clair, structuré en étapes numérotées. "
+    "Ne montre jamais tes étapes de réflexion ou calcul, donne uniquement le guide final. "
+    "Utilise uniquement les informations fournies ; si elles sont absentes, "
+    "indique « Information non trouvée dans les documents fournis »."
+)
+
 class LocalLlmService(LlmInterface):
-    """Service LLM local qui charge le modèle depuis Hugging Face Hub (Singleton)."""
+    """Service LLM local : modèle chargé depuis un snapshot local ou Hugging Face Hub (Singleton)."""
 
     _instance = None
     _model = None
     _tokenizer = None
-    _pipeline = None
+    _scheduler = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -26,92 +49,172 @@ class LocalLlmService(LlmInterface):
             self._load_model()
 
     def _load_model(self):
-        """Charge le modèle directement depuis Hugging Face Hub et crée le pipeline."""
+        """Charge le modèle (snapshot local de préférence) et démarre l'ordonnanceur de génération."""
         try:
-            logger.info(f"Chargement du modèle depuis Hugging Face Hub: {MODEL_HF_NAME}")
+            source = resolve_model_source(GPT_OSS_MODEL_PATH, MODEL_HF_NAME, offline=LLM_OFFLINE)
+            logger.info(
+                f"Chargement du modèle depuis {'le snapshot local' if source.local else 'Hugging Face Hub'}: "
+                f"{source.location}"
+            )
             logger.info(f"Device demandé: {DEVICE} | GPU disponible: {torch.cuda.is_available()}")
 
-            tokenizer_kwargs = {"trust_remote_code": True}
+            timer = LoadTimer()
+            on_gpu = DEVICE == "cuda" and torch.cuda.is_available()
+            # Sur CPU, précision configurable (bfloat16, int8 dynamique, int4) ; float16 sur GPU
+            precision = "float16" if on_gpu else LLM_CPU_PRECISION
+            tokenizer_kwargs = {"trust_remote_code": True, "local_files_only": source.local}
             model_kwargs = {
                 "trust_remote_code": True,
-                "torch_dtype": torch.float16 if DEVICE == "cuda" and torch.cuda.is_available() else torch.float32,
-                "low_cpu_mem_usage": True
+                # Poids safetensors memory-mappés, copiés tenseur par tenseur
+                "low_cpu_mem_usage": True,
+                **source.from_pretrained_kwargs(),
+                **({"torch_dtype": torch.float16} if on_gpu else precision_model_kwargs(precision))
             }
 
             # Tokenizer
             logger.info("Chargement du tokenizer...")
-            self._tokenizer = AutoTokenizer.from_pretrained(MODEL_HF_NAME, **tokenizer_kwargs)
-            if self._tokenizer.pad_token is None:
-                self._tokenizer.pad_token = self._tokenizer.eos_token
+            with timer.phase("tokenizer"):
+                self._tokenizer = AutoTokenizer.from_pretrained(source.location, **tokenizer_kwargs)
+                if self._tokenizer.pad_token is None:
+                    self._tokenizer.pad_token = self._tokenizer.eos_token
+                # Génération par lots : padding à gauche pour un modèle décodeur
+                self._tokenizer.padding_side = "left"
 
             # Modèle
             logger.info("Chargement du modèle...")
-            if DEVICE == "cuda" and torch.cuda.is_available():
+            if on_gpu:
                 model_kwargs["device_map"] = "auto"
                 logger.info("Utilisation du GPU avec device_map=auto")
             else:
-                logger.info("Utilisation du CPU")
-
-            self._model = AutoModelForCausalLM.from_pretrained(MODEL_HF_NAME, **model_kwargs)
-
-            # Pipeline
-            device_index = 0 if DEVICE == "cuda" and torch.cuda.is_available() else -1
-            self._pipeline = pipeline(
-                "text-generation",
-                model=self._model,
-                tokenizer=self._tokenizer,
-                device=device_index,
-                return_full_text=False
+                logger.info(f"Utilisation du CPU (précision {precision})")
+
+            with timer.phase("poids"):
+                self._model = AutoModelForCausalLM.from_pretrained(source.location, **model_kwargs)
+            if not on_gpu and precision == "int8":
+                with timer.phase("quantification"):
+                    self._model = quantize_after_load(self._model, precision)
+            logger.info(
+                f"Empreinte mémoire du modèle ({precision}) : {model_memory_footprint(self._model) / 1024 ** 3:.2f} Go, "
+                f"pic RSS du processus : {peak_rss_bytes() / 1024 ** 3:.2f} Go"
             )
 
-            logger.info("Modèle et pipeline chargés avec succès depuis Hugging Face Hub !")
+            # Modèle brouillon pour le décodage assisté. En "auto", il ne sert qu'en décodage
+            # glouton : avec une température non nulle, les réponses RAG ne l'utiliseraient jamais
+            draft_model = None
+            if LLM_ASSISTED_DECODING == "auto" and LLM_TEMPERATURE > 0:
+                logger.info("Décodage assisté inactif (LLM_TEMPERATURE > 0) : modèle brouillon non chargé")
+            elif LLM_ASSISTED_DECODING != "off":
+                with timer.phase("brouillon"):
+                    draft_model = load_draft_model(
+                        LLM_DRAFT_MODEL_PATH, self._tokenizer, self._model.device,
+                        model_kwargs["torch_dtype"], allow_universal=LLM_ASSISTED_UNIVERSAL
+                    )
 
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement du modèle depuis Hub: {str(e)}")
-            raise RuntimeError(f"Impossible de charger le modèle depuis Hugging Face Hub: {e}")
+            # KV-cache des consignes système, calculé dès le chargement
+            prefix_cache = None
+            if LLM_PREFIX_CACHE:
+                with timer.phase("cache de préfixe"):
+                    prefix_cache = PrefixKVCache(self._model, self._tokenizer)
+                    prefix_cache.warm(self.rag_prompt_prefix())
 
-    def query_with_context(self, question: str, retrieved_chunks: List[str]) -> str:
-        """Génère un guide pas à pas basé sur les documents fournis."""
-        try:
-            context_text = "\n\n".join(f"[Document {i}]\n{chunk}" for i, chunk in enumerate(retrieved_chunks, start=1))
-
-            system_prompt = (
-                "Tu es un assistant expert chargé de créer des guides pas à pas. "
-                "Tu DOIS répondre EXCLUSIVEMENT en français. "
-                "Fournis des réponses sous forme d'un guide clair, structuré en étapes numérotées. "
-                "Ne montre jamais tes étapes de réflexion ou calcul, donne uniquement le guide final. "
-                "Utilise uniquement les informations fournies ; si elles sont absentes, "
-                "indique « Information non trouvée dans les documents fournis »."
-            )
+            # Ordonnanceur : seul point d'accès au modèle pour la génération
+            with timer.phase("ordonnanceur"):
+                self._scheduler = GenerationScheduler(
+                    self._model,
+                    self._tokenizer,
+                    max_batch_size=LLM_MAX_BATCH_SIZE,
+                    max_wait_ms=LLM_BATCH_MAX_WAIT_MS,
+                    max_queue_size=LLM_MAX_QUEUE_SIZE,
+                    concurrency=LLM_CONCURRENCY,
+                    retry_after=LLM_RETRY_AFTER,
+                    prefix_cache=prefix_cache,
+                    draft_model=draft_model,
+                    assisted_mode=LLM_ASSISTED_DECODING
+                )
+                self._scheduler.start()
 
-            prompt = f"""<|system|>
-{system_prompt}
+            logger.info(f"Modèle chargé et ordonnanceur démarré en {timer.summary()}")
+
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement du modèle: {str(e)}")
+            raise RuntimeError(f"Impossible de charger le modèle: {e}")
+
+    @staticmethod
+    def rag_prompt_prefix() -> str:
+        """Début constant du prompt RAG (consignes système), commun à toutes les questions."""
+        return f"""<|system|>
+{RAG_SYSTEM_PROMPT}
 
 <|user|>
 Contexte (documents fournis) :
-{context_text}
+"""
+
+    @staticmethod
+    def build_rag_prompt(question: str, retrieved_chunks: List[str]) -> str:
+        """Construit le prompt RAG (consignes, documents fournis, question)."""
+        context_text = "\n\n".join(f"[Document {i}]\n{chunk}" for i, chunk in enumerate(retrieved_chunks, start=1))
+
+        return LocalLlmService.rag_prompt_prefix() + f"""{context_text}
 
 Question : {question}
 
 <|assistant|>
 """
 
-            response = self._pipeline(
-                prompt,
-                max_new_tokens=800,
-                temperature=0.7,
-                top_p=0.95,
-                do_sample=True,
-                pad_token_id=self._tokenizer.eos_token_id,
-                eos_token_id=self._tokenizer.eos_token_id
-            )
+    @staticmethod
+    def rag_prompt_version() -> str:
+        """Empreinte du gabarit du prompt RAG : change dès que les consignes ou la mise en forme changent."""
+        return IdsFactory.hash_content(LocalLlmService.build_rag_prompt("{question}", ["{chunk}"]))[:12]
 
-            generated_text = response[0]['generated_text'].strip()
-            return self._clean_response(generated_text)
+    def query_with_context(self, question: str, retrieved_chunks: List[str]) -> str:
+        """Génère un guide pas à pas basé sur les documents fournis."""
+        try:
+            prompt = self.build_rag_prompt(question, retrieved_chunks)
 
+            generated_text = self._generate(prompt, max_new_tokens=800, temperature=LLM_TEMPERATURE, top_p=0.95,
+                                            prefix=self.rag_prompt_prefix())
+            return self._clean_response(generated_text.strip())
+
+        except HTTPException:
+            raise
         except Exception as e:
+            # Levée plutôt que renvoyée comme texte : un échec ne doit jamais être mis en cache
             logger.error(f"Erreur lors de l'inférence LLM: {str(e)}")
-            return f"Erreur lors de l'inférence : {e}"
+            raise HTTPException(
+                status_code=500,
+                detail="Erreur lors de la génération de la réponse"
+            )
+
+    def stream_with_context(self, question: str, retrieved_chunks: List[str],
+                            should_stop: Callable[[], bool]) -> Iterator[str]:
+        """
+        Génère le guide en streaming : produit des fragments de texte déjà nettoyés
+        au fur et à mesure de la génération. La génération s'arrête dès que
+        `should_stop()` renvoie True (client déconnecté).
+        """
+        prompt = self.build_rag_prompt(question, retrieved_chunks)
+        streamer = TextIteratorStreamer(self._tokenizer, skip_prompt=True, skip_special_tokens=True)
+        done = self._scheduler.submit(GenerationRequest(
+            prompt=prompt,
+            max_new_tokens=800,
+            temperature=LLM_TEMPERATURE,
+            top_p=0.95,
+            prefix=self.rag_prompt_prefix(),
+            streamer=streamer,
+            should_stop=should_stop
+        ))
+
+        cleaner = StreamCleaner()
+        for text in streamer:
+            delta = cleaner.feed(text)
+            if delta:
+                yield delta
+
+        # Propage une éventuelle erreur de génération
+        done.result()
+        delta = cleaner.flush()
+        if delta:
+            yield delta
 
     def generate_response(self, prompt: str, **kwargs) -> str:
         """Génère une réponse libre pour un prompt donné."""
@@ -120,32 +223,48 @@ Question : {question}
             temperature = kwargs.get('temperature', 1.0)
             top_p = kwargs.get('top_p', 0.95)
 
-            response = self._pipeline(
-                prompt,
-                max_new_tokens=max_tokens,
-                temperature=temperature,
-                top_p=top_p,
-                do_sample=True,
-                pad_token_id=self._tokenizer.eos_token_id,
-                eos_token_id=self._tokenizer.eos_token_id
-            )
-
-            generated_text = response[0]['generated_text'].strip()
-            return self._clean_response(generated_text)
+            generated_text = self._generate(prompt, max_new_tokens=max_tokens, temperature=temperature, top_p=top_p)
+            return self._clean_response(generated_text.strip())
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Erreur lors de la génération de réponse: {str(e)}")
-            return f"Erreur lors de la génération : {e}"
+            raise HTTPException(
+                status_code=500,
+                detail="Erreur lors de la génération de la réponse"
+            )
+
+    def _generate(self, prompt: str, max_new_tokens: int, temperature: float, top_p: float,
+                  prefix: Optional[str] = None) -> str:
+        """
+        Soumet le prompt à l'ordonnanceur et attend le texte généré (sans le prompt).
+        `prefix` : début constant du prompt, servi depuis le KV-cache de préfixe.
+        """
+        return self._scheduler.submit(GenerationRequest(
+            prompt=prompt,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            prefix=prefix
+        )).result()
+
+    def ensure_generation_capacity(self) -> None:
+        """Lève 429/503 si une nouvelle génération serait refusée."""
+        self._scheduler.ensure_capacity()
+
+    def get_scheduler_stats(self) -> Dict:
+        """Profondeur de file, taille des lots et attente des requêtes de génération."""
+        return self._scheduler.stats()
+
+    def shutdown(self) -> None:
+        """Arrête l'ordonnanceur ; les requêtes en attente reçoivent une 503."""
+        if self._scheduler is not None:
+            self._scheduler.stop()
 
     def _clean_response(self, text: str) -> str:
         """Nettoie la réponse générée."""
-        import re
-        text = text.replace("<|system|>", "")
-        text = text.replace("<|user|>", "")
-        text = text.replace("<|assistant|>", "")
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        return text.strip()
+        return clean_response(text)
 
     def get_model_info(self) -> Dict:
         """Retourne des informations sur le modèle chargé."""
@@ -154,4 +273,5 @@ Question : {question}
             "device": DEVICE,
             "model_loaded": self._model is not None,
             "tokenizer_loaded": self._tokenizer is not None
-        }
\ No newline at end of file
+        }
+
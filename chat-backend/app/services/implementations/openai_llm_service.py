@@ -0,0 +1,293 @@
+# app/services/implementations/openai_llm_service.py
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+import json
+import logging
+import random
+import threading
+import time
+import httpx
+from fastapi import HTTPException, status
+from app.services.interfaces.llm_interface import LlmInterface
+from app.services.implementations.local_llm_service import LocalLlmService
+from app.services.utils.latency_tracker import LatencyTracker
+from app.services.utils.response_cleaning import StreamCleaner, clean_response
+from app.core.config import (
+    OPENAI_BASE_URL, OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TIMEOUT, OPENAI_CONNECT_TIMEOUT,
+    OPENAI_MAX_RETRIES, OPENAI_RETRY_BACKOFF, OPENAI_MAX_CONNECTIONS, LLM_TEMPERATURE, LLM_RETRY_AFTER
+)
+
+logger = logging.getLogger(__name__)
+
+# Échecs transitoires : la requête n'a pas été traitée par le serveur, elle peut être renvoyée
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+_RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class OpenAiLlmService(LlmInterface):
+    """
+    Service LLM distant : complétions via un serveur compatible OpenAI (vLLM, llama.cpp, TGI).
+    Le prompt RAG est construit comme en local et envoyé à /completions ; les connexions
+    HTTP sont persistantes et partagées (Singleton).
+    """
+
+    _instance = None
+    _client = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(OpenAiLlmService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if self._client is not None:
+            return
+        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"} if OPENAI_API_KEY else None
+        OpenAiLlmService._client = httpx.Client(
+            base_url=OPENAI_BASE_URL,
+            headers=headers,
+            timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS,
+                                max_keepalive_connections=OPENAI_MAX_CONNECTIONS)
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+        self._latency = LatencyTracker()
+        logger.info(f"Génération déléguée à {OPENAI_BASE_URL} (modèle {OPENAI_MODEL})")
+
+    def query_with_context(self, question: str, retrieved_chunks: List[str]) -> str:
+        """Génère un guide pas à pas basé sur les documents fournis."""
+        prompt = LocalLlmService.build_rag_prompt(question, retrieved_chunks)
+        return clean_response(self._complete(prompt, max_tokens=800, temperature=LLM_TEMPERATURE, top_p=0.95))
+
+    def stream_with_context(self, question: str, retrieved_chunks: List[str],
+                            should_stop: Callable[[], bool]) -> Iterator[str]:
+        """
+        Génère le guide en streaming (SSE côté serveur OpenAI). Quand `should_stop()`
+        renvoie True, la connexion est fermée et le serveur abandonne la génération.
+        Les nouvelles tentatives n'ont lieu qu'avant la réception du premier fragment.
+        """
+        prompt = LocalLlmService.build_rag_prompt(question, retrieved_chunks)
+        payload = self._payload(prompt, max_tokens=800, temperature=LLM_TEMPERATURE, top_p=0.95, stream=True)
+        with self._slot():
+            response = self._send(payload, stream=True)
+            try:
+                cleaner = StreamCleaner()
+                for text in self._iter_stream(response):
+                    if should_stop():
+                        return
+                    delta = cleaner.feed(text)
+                    if delta:
+                        yield delta
+                delta = cleaner.flush()
+                if delta:
+                    yield delta
+            except httpx.TransportError as e:
+                raise self._unavailable(e)
+            finally:
+                response.close()
+
+    def generate_response(self, prompt: str, **kwargs) -> str:
+        """Génère une réponse libre pour un prompt donné."""
+        return clean_response(self._complete(
+            prompt,
+            max_tokens=kwargs.get('max_tokens', 800),
+            temperature=kwargs.get('temperature', 1.0),
+            top_p=kwargs.get('top_p', 0.95)
+        ))
+
+    def ensure_generation_capacity(self) -> None:
+        """Lève 429 si toutes les connexions vers le serveur de génération sont occupées."""
+        with self._lock:
+            if self._in_flight >= OPENAI_MAX_CONNECTIONS:
+                raise self._busy()
+
+    def get_scheduler_stats(self) -> Dict:
+        """Générations en cours, tentatives et latence des appels au serveur distant."""
+        with self._lock:
+            return {
+                "backend": "openai",
+                "in_flight": self._in_flight,
+                "max_in_flight": OPENAI_MAX_CONNECTIONS,
+                "requests": self._requests,
+                "retries": self._retries,
+                "failures": self._failures,
+                "latency": self._latency.stats(),
+            }
+
+    def shutdown(self) -> None:
+        """Ferme les connexions du pool."""
+        self._client.close()
+
+    def get_model_info(self) -> Dict:
+        """Vérifie que le serveur distant répond et sert le modèle configuré."""
+        try:
+            response = self._client.get("/models")
+            response.raise_for_status()
+            served = [model.get("id") for model in response.json().get("data", [])]
+            loaded = not served or OPENAI_MODEL in served
+            if not loaded:
+                logger.error(f"Modèle {OPENAI_MODEL} absent du serveur distant (modèles servis: {served})")
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Serveur de génération injoignable ({OPENAI_BASE_URL}): {str(e)}")
+            loaded = False
+        return {
+            "model_name": OPENAI_MODEL,
+            "device": OPENAI_BASE_URL,
+            "model_loaded": loaded,
+            "tokenizer_loaded": loaded
+        }
+
+    # ==================== HTTP ====================
+
+    def _payload(self, prompt: str, max_tokens: int, temperature: float, top_p: float,
+                 stream: bool = False) -> Dict:
+        return {
+            "model": OPENAI_MODEL,
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "stream": stream
+        }
+
+    def _complete(self, prompt: str, max_tokens: int, temperature: float, top_p: float) -> str:
+        with self._slot():
+            started = time.perf_counter()
+            response = self._send(self._payload(prompt, max_tokens, temperature, top_p))
+            self._latency.record((time.perf_counter() - started) * 1000)
+        try:
+            return response.json()["choices"][0]["text"].strip()
+        except (ValueError, KeyError, IndexError) as e:
+            raise self._bad_response(f"réponse inattendue ({e})")
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        """Compte la génération en cours ; lève 429 au-delà de OPENAI_MAX_CONNECTIONS."""
+        with self._lock:
+            if self._in_flight >= OPENAI_MAX_CONNECTIONS:
+                raise self._busy()
+            self._in_flight += 1
+            self._requests += 1
+        try:
+            yield
+        except HTTPException:
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _send(self, payload: Dict, stream: bool = False) -> httpx.Response:
+        """
+        POST /completions avec nouvelles tentatives (backoff exponentiel, jitter complet)
+        sur les erreurs de connexion et les statuts 429/502/503/504.
+        """
+        for attempt in range(OPENAI_MAX_RETRIES + 1):
+            last_attempt = attempt == OPENAI_MAX_RETRIES
+            try:
+                request = self._client.build_request("POST", "/completions", json=payload)
+                response = self._client.send(request, stream=stream)
+            except _RETRYABLE_ERRORS as e:
+                if last_attempt:
+                    raise self._unavailable(e)
+                delay = self._backoff(attempt)
+                reason = str(e)
+            except httpx.TransportError as e:
+                raise self._unavailable(e)
+            else:
+                if response.status_code not in _RETRYABLE_STATUSES or last_attempt:
+                    if response.is_error:
+                        raise self._upstream_error(response)
+                    return response
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                reason = f"HTTP {response.status_code}"
+                response.close()
+
+            with self._lock:
+                self._retries += 1
+            logger.warning(
+                f"Serveur de génération: {reason}, nouvelle tentative dans {delay:.2f} s "
+                f"({attempt + 1}/{OPENAI_MAX_RETRIES})"
+            )
+            time.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Délai avant la tentative suivante : Retry-After du serveur, sinon jitter complet."""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), OPENAI_TIMEOUT)
+            except ValueError:
+                pass
+        return random.uniform(0, OPENAI_RETRY_BACKOFF * 2 ** attempt)
+
+    def _iter_stream(self, response: httpx.Response) -> Iterator[str]:
+        """Fragments de texte d'une réponse SSE (`data: {...}` jusqu'à `data: [DONE]`)."""
+        for line in response.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return
+            try:
+                chunk = json.loads(data)
+            except ValueError:
+                raise self._bad_response(f"événement illisible: {data[:100]}")
+            if "error" in chunk:
+                raise self._bad_response(str(chunk["error"]))
+            choices = chunk.get("choices") or [{}]
+            text = choices[0].get("text")
+            if text:
+                yield text
+
+    # ==================== ERREURS ====================
+
+    @staticmethod
+    def _busy() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop de requêtes de génération en cours, réessayez plus tard",
+            headers={"Retry-After": str(LLM_RETRY_AFTER)}
+        )
+
+    @staticmethod
+    def _unavailable(error: Exception) -> HTTPException:
+        logger.error(f"Serveur de génération injoignable ({OPENAI_BASE_URL}): {str(error)}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service de génération indisponible",
+            headers={"Retry-After": str(LLM_RETRY_AFTER)}
+        )
+
+    @staticmethod
+    def _bad_response(reason: str) -> HTTPException:
+        logger.error(f"Réponse invalide du serveur de génération: {reason}")
+        return HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Réponse invalide du service de génération"
+        )
+
+    def _upstream_error(self, response: httpx.Response) -> HTTPException:
+        """Statut d'erreur du serveur distant, après épuisement des tentatives."""
+        response.read()
+        response.close()
+        retry_after = response.headers.get("Retry-After", str(LLM_RETRY_AFTER))
+        if response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+            return HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Service de génération saturé, réessayez plus tard",
+                headers={"Retry-After": retry_after}
+            )
+        if response.status_code >= 500:
+            logger.error(f"Serveur de génération en erreur (HTTP {response.status_code}): {response.text[:200]}")
+            return HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service de génération indisponible",
+                headers={"Retry-After": retry_after}
+            )
+        return self._bad_response(f"HTTP {response.status_code}: {response.text[:200]}")
@@ -0,0 +1,111 @@
+# app/services/implementations/pdf_extractors.py
+# Backends d'extraction de texte PDF. Les bibliothèques natives sont optionnelles
+# et importées à la demande ; ce module est aussi chargé par les processus workers.
+from typing import Dict, List, Type
+
+from app.services.interfaces.pdf_extractor_interface import PdfExtractorInterface
+
+
+class PypdfExtractor(PdfExtractorInterface):
+    """
+    Extraction pure Python avec pypdf (même rendu que PyPDFLoader, mode "plain").
+    Chaque page est redécoupée puis recollée comme le faisait `PyPDFLoader.load_and_split()`
+    (recouvrements de 200 caractères au-delà de 4000) : le texte nettoyé, donc le file_hash
+    et les IDs des chunks des documents déjà indexés, restent identiques.
+    """
+
+    def count_pages(self, file_path: str) -> int:
+        import pypdf
+        return len(pypdf.PdfReader(file_path).pages)
+
+    def extract_page_range(self, file_path: str, start: int, end: int) -> List[str]:
+        import pypdf
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        reader = pypdf.PdfReader(file_path)
+        splitter = RecursiveCharacterTextSplitter()
+        return [
+            "\n".join(splitter.split_text(self._extract_text(pypdf, reader.pages[i])))
+            for i in range(start, end)
+        ]
+
+    @staticmethod
+    def _extract_text(pypdf, page) -> str:
+        if pypdf.__version__.startswith("3"):
+            return page.extract_text()
+        return page.extract_text(extraction_mode="plain")
+
+
+class PdfiumExtractor(PdfExtractorInterface):
+    """Extraction native via pypdfium2 (bindings PDFium)."""
+
+    def count_pages(self, file_path: str) -> int:
+        pdfium = self._import()
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def extract_page_range(self, file_path: str, start: int, end: int) -> List[str]:
+        pdfium = self._import()
+        pdf = pdfium.PdfDocument(file_path)
+        texts = []
+        try:
+            for i in range(start, end):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        return texts
+
+    @staticmethod
+    def _import():
+        try:
+            import pypdfium2
+        except ImportError:
+            raise ImportError(
+                "`pypdfium2` n'est pas installé, installez-le avec `pip install pypdfium2`"
+            )
+        return pypdfium2
+
+
+class PymupdfExtractor(PdfExtractorInterface):
+    """Extraction native via PyMuPDF (bindings MuPDF)."""
+
+    def count_pages(self, file_path: str) -> int:
+        with self._import().open(file_path) as doc:
+            return doc.page_count
+
+    def extract_page_range(self, file_path: str, start: int, end: int) -> List[str]:
+        with self._import().open(file_path) as doc:
+            return [doc[i].get_text("text") for i in range(start, end)]
+
+    @staticmethod
+    def _import():
+        try:
+            import pymupdf
+        except ImportError:
+            raise ImportError(
+                "`pymupdf` n'est pas installé, installez-le avec `pip install pymupdf`"
+            )
+        return pymupdf
+
+
+PDF_EXTRACTORS: Dict[str, Type[PdfExtractorInterface]] = {
+    "pypdf": PypdfExtractor,
+    "pdfium": PdfiumExtractor,
+    "pymupdf": PymupdfExtractor,
+}
+
+
+def get_pdf_extractor(backend: str) -> PdfExtractorInterface:
+    """Instancie le backend d'extraction demandé ("pypdf", "pdfium" ou "pymupdf")."""
+    try:
+        return PDF_EXTRACTORS[backend]()
+    except KeyError:
+        raise ValueError(
+            f"Backend d'extraction PDF inconnu: {backend} (choix: {', '.join(PDF_EXTRACTORS)})"
+        )
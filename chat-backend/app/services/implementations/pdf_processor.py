@@ -1,47 +1,95 @@
 # app/services/implementations/processors/pdf_processor.py
 import os
 import re
+import hashlib
 import uuid
 import datetime
-from typing import List, Tuple
-from fastapi import UploadFile
-from langchain_community.document_loaders import PyPDFLoader
+import logging
+from bisect import bisect_right
+from typing import Iterator, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
 from llama_index.core import Document
 from llama_index.core.settings import Settings
-from llama_index.core.node_parser.text.semantic_splitter import SemanticSplitterNodeParser
 
+from app.core.config import (
+    CHUNK_EMBEDDING_STRATEGY, MAX_UPLOAD_SIZE, UPLOAD_CHUNK_SIZE,
+    PDF_EXTRACTION_BACKEND, PDF_EXTRACTION_WORKERS, PDF_PARALLEL_MIN_PAGES,
+    EMBEDDING_MODEL_NAME, EMBEDDING_MODEL_ID, EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES,
+    QDRANT_UPSERT_BATCH_SIZE, CHUNKING_STRATEGY, CHUNKING_STRATEGIES,
+    CHUNK_WINDOW_TOKENS, CHUNK_OVERLAP_TOKENS, CHUNK_MIN_TOKENS, CHUNK_MAX_TOKENS
+)
 from app.core.embedding import embed_model
 from app.models.qdrant_dto import QdrantDocumentInput
 from app.models.pdf_metadata import PDFMetadata
 from app.services.utils.idsFactory import IdsFactory
+from app.services.utils.semantic_splitter import EmbeddingAwareSemanticSplitter
+from app.services.utils.token_window_splitter import TokenWindowSplitter
+from app.services.utils import pdf_extraction
+from app.services.utils.embedding_cache import EmbeddingCache
 
 Settings.embed_model = embed_model
 Settings.llm = None
 
 UPLOAD_DIR = "app/documents/uploaded"
 
+logger = logging.getLogger(__name__)
+
 class PdfProcessor:
     def __init__(self):
         self.upload_dir = UPLOAD_DIR
         if not os.path.exists(self.upload_dir):
             os.makedirs(self.upload_dir)
+        self.embedding_cache = (
+            EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES)
+            if EMBEDDING_CACHE_ENABLED else None
+        )
+        self._token_window_splitter: Optional[TokenWindowSplitter] = None
     
-    def save_uploaded_pdf(self, file: UploadFile) -> str:
-        """Sauvegarde le fichier PDF uploadé et retourne son chemin absolu."""
+    def save_uploaded_pdf(self, file: UploadFile) -> Tuple[str, str]:
+        """
+        Sauvegarde le fichier PDF uploadé par blocs de taille fixe (mémoire bornée).
+        Retourne son chemin et le hash SHA-256 des octets bruts, calculé pendant l'écriture.
+        La copie est interrompue dès que la taille dépasse MAX_UPLOAD_SIZE.
+        Opération bloquante : à appeler hors de l'event loop.
+        """
         unique_filename = f"{uuid.uuid4()}_{file.filename}"
         file_path = os.path.join(self.upload_dir, unique_filename)
         
-        with open(file_path, "wb") as buffer:
-            buffer.write(file.file.read())
+        sha256 = hashlib.sha256()
+        written = 0
+        try:
+            with open(file_path, "wb") as buffer:
+                while True:
+                    data = file.file.read(UPLOAD_CHUNK_SIZE)
+                    if not data:
+                        break
+                    written += len(data)
+                    if written > MAX_UPLOAD_SIZE:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Fichier trop volumineux (max {MAX_UPLOAD_SIZE // (1024 * 1024)}MB)"
+                        )
+                    sha256.update(data)
+                    buffer.write(data)
+        except BaseException:
+            os.remove(file_path)
+            raise
         
-        return file_path
+        return file_path, sha256.hexdigest()
+    
+    def extract_pages(self, file_path: str) -> List[str]:
+        """Extrait le texte de chaque page, dans l'ordre, en parallèle sur un pool de processus."""
+        return pdf_extraction.extract_pages(
+            file_path, PDF_EXTRACTION_BACKEND, PDF_EXTRACTION_WORKERS, PDF_PARALLEL_MIN_PAGES
+        )
+    
+    def join_pages(self, pages: List[str]) -> str:
+        """Concatène les pages extraites (les pages vides sont ignorées)."""
+        return "\n".join(page for page in pages if page)
     
     def extract_full_text(self, file_path: str) -> str:
         """Charge le PDF, concatène toutes les pages, et renvoie le texte."""
-        loader = PyPDFLoader(file_path)
-        pages = loader.load_and_split()
-        raw = "\n".join(page.page_content for page in pages)
-        return raw
+        return self.join_pages(self.extract_pages(file_path))
     
     def clean_text(self, text: str) -> str:
         """Nettoyage du texte extrait."""
@@ -53,22 +101,122 @@ class PdfProcessor:
         lines = [line.strip() for line in text.splitlines() if line.strip()]
         return "\n".join(lines)
     
-    async def vectorize_text(self, text: str, file_name: str, system_name: str) -> Tuple[List[QdrantDocumentInput], PDFMetadata]:
-        """Vectorise le texte en chunks sémantiques."""
-        # 1. Chunking sémantique
-        parser = SemanticSplitterNodeParser.from_defaults(embed_model=embed_model)
-        seed_doc = Document(text=text, metadata={"source_file": file_name})
-        nodes = parser.get_nodes_from_documents([seed_doc])
+    def locate_pages(self, pages: List[str], cleaned_text: str) -> List[int]:
+        """
+        Retourne l'offset de début de chaque page dans le texte nettoyé.
+        Chaque page est repérée par le début de son texte nettoyé ; une page vide ou
+        introuvable prend l'offset de la page suivante.
+        """
+        offsets: List[Optional[int]] = []
+        cursor = 0
+        for page in pages:
+            anchor = self.clean_text(page)[:64]
+            position = cleaned_text.find(anchor, cursor) if anchor else -1
+            if position >= 0:
+                cursor = position
+                offsets.append(position)
+            else:
+                offsets.append(None)
+        
+        next_offset = len(cleaned_text)
+        for i in range(len(offsets) - 1, -1, -1):
+            if offsets[i] is None:
+                offsets[i] = next_offset
+            next_offset = offsets[i]
+        return offsets
+    
+    async def vectorize_text(self, text: str, file_name: str, system_name: str,
+                             source_hash: Optional[str] = None,
+                             page_offsets: Optional[List[int]] = None,
+                             chunking_strategy: Optional[str] = None) -> Tuple[List[QdrantDocumentInput], PDFMetadata]:
+        """
+        Vectorise le texte en chunks (voir split_text pour les stratégies de découpage).
+        Si `page_offsets` est fourni (voir locate_pages), chaque chunk porte ses numéros de page.
+        """
+        batches, pdf_metadata = self.vectorize_text_in_batches(
+            text, file_name, system_name, source_hash, page_offsets,
+            chunking_strategy=chunking_strategy
+        )
+        return [chunk for batch in batches for chunk in batch], pdf_metadata
+    
+    def vectorize_text_in_batches(self, text: str, file_name: str, system_name: str,
+                                  source_hash: Optional[str] = None,
+                                  page_offsets: Optional[List[int]] = None,
+                                  batch_size: int = QDRANT_UPSERT_BATCH_SIZE,
+                                  chunking_strategy: Optional[str] = None
+                                  ) -> Tuple[Iterator[List[QdrantDocumentInput]], PDFMetadata]:
+        """
+        Découpe le texte en chunks puis retourne un itérateur paresseux de lots
+        de chunks embeddés : chaque lot n'est embeddé qu'au moment où il est consommé, ce qui
+        permet de recouvrir l'embedding d'un lot avec l'upsert du précédent.
+        """
+        # 1. Chunking
+        chunking_strategy = chunking_strategy or CHUNKING_STRATEGY
+        nodes = self.split_text(text, file_name, chunking_strategy)
         
         # 2. Générer les IDs
         ids_factory = IdsFactory(text)
         created_at = datetime.datetime.utcnow().isoformat()
         
-        # 3. Embedding + Structuration
+        # 3. Embedding + Structuration, lot par lot
+        def batches() -> Iterator[List[QdrantDocumentInput]]:
+            for start in range(0, len(nodes), batch_size):
+                batch_nodes = nodes[start:start + batch_size]
+                yield self.build_chunk_inputs(
+                    batch_nodes, self.embed_nodes(batch_nodes), ids_factory.get_pdf_hash(),
+                    file_name, system_name, created_at, page_offsets, start_index=start
+                )
+        
+        # 4. Créer les métadonnées PDF
+        pdf_metadata = PDFMetadata(
+            filename=file_name,
+            file_hash=ids_factory.get_pdf_hash(),
+            created_at=created_at,
+            system_name=system_name,
+            source_hash=source_hash,
+            chunks_count=len(nodes),
+            chunk_namespace=ids_factory.get_pdf_hash(),
+            chunking_strategy=chunking_strategy
+        )
+        
+        return batches(), pdf_metadata
+    
+    def split_text(self, text: str, file_name: str, strategy: Optional[str] = None) -> list:
+        """
+        Découpe le texte en nodes (sans embedding des chunks).
+        `strategy` : "semantic" ou "token_window" ; CHUNKING_STRATEGY par défaut.
+        """
+        strategy = strategy or CHUNKING_STRATEGY
+        if strategy not in CHUNKING_STRATEGIES:
+            raise ValueError(f"Stratégie de découpage inconnue: {strategy}")
+        if strategy == "token_window":
+            return self.get_token_window_splitter().split(text, file_name)
+        
+        parser = EmbeddingAwareSemanticSplitter.from_defaults(embed_model=embed_model)
+        seed_doc = Document(text=text, metadata={"source_file": file_name})
+        return parser.get_nodes_from_documents([seed_doc])
+    
+    def get_token_window_splitter(self) -> TokenWindowSplitter:
+        """Splitter par fenêtres de tokens, créé au premier usage (chargement du tokenizer)."""
+        if self._token_window_splitter is None:
+            self._token_window_splitter = TokenWindowSplitter(
+                EMBEDDING_MODEL_NAME, CHUNK_WINDOW_TOKENS, CHUNK_OVERLAP_TOKENS,
+                CHUNK_MIN_TOKENS, CHUNK_MAX_TOKENS
+            )
+        return self._token_window_splitter
+    
+    def build_chunk_inputs(self, nodes: list, embeddings: List[List[float]], chunk_namespace: str,
+                           file_name: str, system_name: str, created_at: str,
+                           page_offsets: Optional[List[int]] = None,
+                           start_index: int = 0) -> List[QdrantDocumentInput]:
+        """
+        Construit les points Qdrant des chunks.
+        `chunk_namespace` est le hash qui sert à dériver les IDs (`doc_hash` du payload) ;
+        `start_index` est l'index du premier node dans le document.
+        """
         qdrant_inputs: List[QdrantDocumentInput] = []
-        for i, node in enumerate(nodes):
-            embedding = embed_model.get_text_embedding(node.text)
-            chunk_id = ids_factory.create_chunk_id(i)
+        for i, (node, embedding) in enumerate(zip(nodes, embeddings), start=start_index):
+            chunk_id = IdsFactory.build_chunk_id(chunk_namespace, i)
             
             metadata = {
                 "chunk_id": chunk_id,
@@ -76,8 +224,12 @@ class PdfProcessor:
                 "created_at": created_at,
                 "system_name": system_name,
                 "filename": file_name,
-                "doc_hash": ids_factory.get_pdf_hash()
+                "doc_hash": chunk_namespace,
+                "content_hash": IdsFactory.hash_content(node.text)
             }
+            if page_offsets and node.start_char_idx is not None:
+                metadata["page_start"] = bisect_right(page_offsets, node.start_char_idx)
+                metadata["page_end"] = bisect_right(page_offsets, max(node.start_char_idx, node.end_char_idx - 1))
             
             qdrant_inputs.append(QdrantDocumentInput(
                 id=chunk_id,
@@ -85,13 +237,33 @@ class PdfProcessor:
                 metadata=metadata,
                 embedding=embedding
             ))
+        return qdrant_inputs
+    
+    def embed_nodes(self, nodes: list) -> List[List[float]]:
+        """
+        Retourne un embedding par node.
+        En mode "splitter", réutilise les vecteurs issus du découpage. Les nodes restants
+        sont cherchés dans le cache d'embeddings, puis les manquants sont embeddés en un
+        seul appel groupé (par lots de embed_batch_size) et ajoutés au cache.
+        """
+        embeddings = [None] * len(nodes)
+        if CHUNK_EMBEDDING_STRATEGY == "splitter":
+            embeddings = [node.embedding for node in nodes]
         
-        # 4. Créer les métadonnées PDF
-        pdf_metadata = PDFMetadata(
-            filename=file_name,
-            file_hash=ids_factory.get_pdf_hash(),
-            created_at=created_at,
-            system_name=system_name
-        )
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing and self.embedding_cache is not None:
+            cached = self.embedding_cache.get_many(EMBEDDING_MODEL_ID, [nodes[i].text for i in missing])
+            for i, embedding in zip(missing, cached):
+                embeddings[i] = embedding
+            logger.info(f"Cache d'embeddings: {len(missing) - cached.count(None)}/{len(missing)} chunks trouvés")
+            missing = [i for i in missing if embeddings[i] is None]
+        
+        if missing:
+            texts = [nodes[i].text for i in missing]
+            computed = embed_model.get_text_embedding_batch(texts)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(EMBEDDING_MODEL_ID, texts, computed)
         
-        return qdrant_inputs, pdf_metadata
\ No newline at end of file
+        return embeddings
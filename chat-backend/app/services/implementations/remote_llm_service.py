@@ -0,0 +1,88 @@
+# app/services/implementations/remote_llm_service.py
+from typing import Callable, Iterator, List, Dict
+import logging
+import time
+from fastapi import HTTPException
+from app.services.interfaces.llm_interface import LlmInterface
+from app.services.utils.model_server_client import ModelServerClient
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteLlmService(LlmInterface):
+    """
+    Service LLM délégué au serveur de modèles (app.model_server) : le modèle n'est chargé
+    qu'une fois, dans le processus serveur, et partagé par tous les workers de l'API (Singleton).
+    """
+
+    _instance = None
+    _client = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RemoteLlmService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if self._client is None:
+            RemoteLlmService._client = ModelServerClient()
+            logger.info(f"Génération déléguée au serveur de modèles: {self._client.location}")
+
+    def query_with_context(self, question: str, retrieved_chunks: List[str]) -> str:
+        """Génère un guide pas à pas basé sur les documents fournis."""
+        return self._client.post("/query", {"question": question, "chunks": retrieved_chunks})["answer"]
+
+    def stream_with_context(self, question: str, retrieved_chunks: List[str],
+                            should_stop: Callable[[], bool]) -> Iterator[str]:
+        """
+        Relaie les fragments générés par le serveur. Quand `should_stop()` renvoie True,
+        la connexion est fermée et le serveur interrompt la génération.
+        """
+        with self._client.stream("/query/stream", {"question": question, "chunks": retrieved_chunks}) as events:
+            for event in events:
+                if "error" in event:
+                    raise HTTPException(status_code=event.get("status", 500), detail=event["error"])
+                if event.get("done") or should_stop():
+                    return
+                yield event["token"]
+
+    def generate_response(self, prompt: str, **kwargs) -> str:
+        """Génère une réponse libre pour un prompt donné."""
+        return self._client.post("/generate", {
+            "prompt": prompt,
+            "max_tokens": kwargs.get('max_tokens', 800),
+            "temperature": kwargs.get('temperature', 1.0),
+            "top_p": kwargs.get('top_p', 0.95)
+        })["text"]
+
+    def ensure_generation_capacity(self) -> None:
+        """Lève 429/503 si le serveur de modèles refuserait une nouvelle génération."""
+        self._client.get("/capacity")
+
+    def get_scheduler_stats(self) -> Dict:
+        """Statistiques de l'ordonnanceur du serveur de modèles."""
+        return self._client.get("/stats")["scheduler"]
+
+    def wait_until_ready(self, timeout: float, interval: float = 2.0) -> None:
+        """Attend que le serveur de modèles ait fini de charger ses modèles."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._client.get("/health")
+                return
+            except HTTPException as e:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"Serveur de modèles indisponible après {timeout:.0f} s: {e.detail}")
+            time.sleep(interval)
+
+    def shutdown(self) -> None:
+        """Ferme les connexions au serveur de modèles (le modèle reste chargé côté serveur)."""
+        self._client.close()
+
+    def get_model_info(self) -> Dict:
+        """Retourne des informations sur le modèle chargé par le serveur."""
+        try:
+            info = self._client.get("/health")["model"]
+        except HTTPException:
+            info = {"model_loaded": False, "tokenizer_loaded": False}
+        return {**info, "model_server": self._client.location}
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 import logging
 
 from app.services.interfaces.vector_interface import VectorInterface
@@ -7,6 +7,12 @@ from app.models.qdrant_dto import QdrantDocumentInput
 from app.models.documents import Document
 from qdrant_client.http import models
 from app.core.embedding import embed_model
+from app.core.config import (
+    QUERY_EMBEDDING_BATCHING, QUERY_EMBEDDING_BATCH_WINDOW_MS, QUERY_EMBEDDING_MAX_BATCH,
+    QUERY_EMBEDDING_CACHE_SIZE, EMBEDDING_MODEL_ID, INFERENCE_MODE
+)
+from app.services.utils.embedding_batcher import EmbeddingBatcher
+from app.services.utils.query_embedding_cache import QueryEmbeddingCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +20,20 @@ class QdrantVectorService(VectorInterface):
     def __init__(self, vector_repository: AbstractVectorRepository):
         self.vector_repository = vector_repository
         self.embed_model = embed_model
+        # En mode remote, le serveur de modèles regroupe déjà les embeddings de tous les
+        # workers : un second micro-batching local n'ajouterait que sa fenêtre d'attente
+        self.embedding_batcher = (
+            EmbeddingBatcher(
+                self.embed_model.get_text_embedding_batch,
+                max_batch_size=QUERY_EMBEDDING_MAX_BATCH,
+                window_ms=QUERY_EMBEDDING_BATCH_WINDOW_MS
+            )
+            if QUERY_EMBEDDING_BATCHING and INFERENCE_MODE != "remote" else None
+        )
+        self.query_cache = (
+            QueryEmbeddingCache(EMBEDDING_MODEL_ID, QUERY_EMBEDDING_CACHE_SIZE)
+            if QUERY_EMBEDDING_CACHE_SIZE > 0 else None
+        )
     
     def add_documents(self, documents: List[QdrantDocumentInput]) -> None:
         try:
@@ -22,6 +42,13 @@ class QdrantVectorService(VectorInterface):
             logger.error(f"Erreur lors de l'ajout des documents: {str(e)}")
             raise
     
+    def add_documents_stream(self, batches: Iterable[List[QdrantDocumentInput]]) -> int:
+        try:
+            return self.vector_repository.add_documents_stream(batches)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'ajout des documents par lots: {str(e)}")
+            raise
+    
     def semantic_search(self, query_vector: List[float], top_k: int = 5, 
                        filter: Optional[models.Filter] = None) -> List[Document]:
         try:
@@ -46,9 +73,41 @@ class QdrantVectorService(VectorInterface):
             logger.error(f"Erreur lors de la suppression du document: {str(e)}")
             raise
     
+    def get_document_chunks(self, doc_hash: str) -> List[QdrantDocumentInput]:
+        try:
+            return self.vector_repository.get_document_chunks(doc_hash)
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des chunks: {str(e)}")
+            raise
+    
+    def delete_points(self, ids: List[str]) -> None:
+        try:
+            self.vector_repository.delete_points(ids)
+        except Exception as e:
+            logger.error(f"Erreur lors de la suppression des chunks: {str(e)}")
+            raise
+    
     def get_text_embedding(self, text: str) -> List[float]:
         try:
-            return self.embed_model.get_text_embedding(text)
+            if self.query_cache is not None:
+                cached = self.query_cache.get(text)
+                if cached is not None:
+                    return cached
+            
+            if self.embedding_batcher is not None:
+                embedding = self.embedding_batcher.embed(text)
+            else:
+                embedding = self.embed_model.get_text_embedding(text)
+            
+            if self.query_cache is not None:
+                self.query_cache.put(text, embedding)
+            return embedding
         except Exception as e:
             logger.error(f"Erreur lors de la génération de l'embedding: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    def get_embedding_stats(self) -> Dict:
+        return {
+            "batching": self.embedding_batcher.stats() if self.embedding_batcher is not None else None,
+            "cache": self.query_cache.stats() if self.query_cache is not None else None
+        }
\ No newline at end of file
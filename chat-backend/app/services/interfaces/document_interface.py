@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 from fastapi import UploadFile
 from app.models.pdf_metadata import PDFMetadata
 
@@ -9,6 +9,37 @@ class DocumentInterface(ABC):
         """Upload, traite et vectorise un document"""
         pass
     
+    @abstractmethod
+    def save_upload(self, file: UploadFile) -> Tuple[str, str]:
+        """Sauvegarde le fichier uploadé et retourne son chemin et le hash de ses octets"""
+        pass
+    
+    @abstractmethod
+    def ensure_not_duplicate(self, source_hash: str, file_path: Optional[str] = None) -> None:
+        """Lève une erreur si un fichier identique a déjà été vectorisé"""
+        pass
+    
+    @abstractmethod
+    def discard_upload(self, file_path: str) -> None:
+        """Supprime un fichier uploadé qui ne sera pas traité"""
+        pass
+    
+    @abstractmethod
+    async def process_saved_file(self, file_path: str, file_name: str, system_name: str,
+                                 on_stage: Optional[Callable[[str], None]] = None,
+                                 source_hash: Optional[str] = None,
+                                 chunking_strategy: Optional[str] = None) -> Dict:
+        """Traite et vectorise un document déjà sauvegardé"""
+        pass
+    
+    @abstractmethod
+    async def replace_saved_file(self, file_path: str, file_name: str, system_name: str,
+                                 on_stage: Optional[Callable[[str], None]] = None,
+                                 source_hash: Optional[str] = None,
+                                 chunking_strategy: Optional[str] = None) -> Dict:
+        """Remplace incrémentalement la version indexée d'un document (même nom et système)"""
+        pass
+    
     @abstractmethod
     def get_all_documents(self) -> List[Dict]:
         """Récupère la liste de tous les documents"""
@@ -19,6 +50,11 @@ class DocumentInterface(ABC):
         """Supprime un document par son hash"""
         pass
     
+    @abstractmethod
+    def get_corpus_version(self) -> int:
+        """Version du corpus indexé, incrémentée à chaque ajout, remplacement ou suppression"""
+        pass
+    
     @abstractmethod
     def find_by_hash(self, file_hash: str) -> Optional[Dict]:
         """Trouve un document par son hash"""
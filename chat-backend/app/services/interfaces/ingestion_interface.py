@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict
+from fastapi import UploadFile
+
+class IngestionInterface(ABC):
+    @abstractmethod
+    def submit_job(self, file: UploadFile, system_name: str, mode: str = "create",
+                   chunking_strategy: Optional[str] = None) -> Dict:
+        """Sauvegarde le fichier et planifie son ingestion ("create" ou "replace"), retourne le job créé"""
+        pass
+    
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Retourne l'état d'un job d'ingestion"""
+        pass
+    
+    @abstractmethod
+    def start(self) -> None:
+        """Démarre les workers ; les jobs non terminés d'un processus arrêté sont repris à l'expiration de leur bail"""
+        pass
+    
+    @abstractmethod
+    def stop(self) -> None:
+        """Arrête les workers"""
+        pass
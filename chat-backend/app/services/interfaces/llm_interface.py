@@ -1,13 +1,29 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Callable, Iterator, List, Dict
 
 class LlmInterface(ABC):
     @abstractmethod
     def query_with_context(self, question: str, retrieved_chunks: List[str]) -> str:
-        """Interroge le LLM avec un contexte fourni"""
+        """Interroge le LLM avec un contexte fourni ; lève une HTTPException en cas d'échec"""
+        pass
+    
+    @abstractmethod
+    def stream_with_context(self, question: str, retrieved_chunks: List[str],
+                            should_stop: Callable[[], bool]) -> Iterator[str]:
+        """Interroge le LLM avec un contexte fourni et produit la réponse par fragments"""
         pass
     
     @abstractmethod
     def generate_response(self, prompt: str, **kwargs) -> str:
         """Génère une réponse à partir d'un prompt"""
+        pass
+    
+    @abstractmethod
+    def ensure_generation_capacity(self) -> None:
+        """Lève une erreur HTTP (429/503) si une nouvelle génération serait refusée"""
+        pass
+    
+    @abstractmethod
+    def get_scheduler_stats(self) -> Dict:
+        """Statistiques de la file de génération"""
         pass
\ No newline at end of file
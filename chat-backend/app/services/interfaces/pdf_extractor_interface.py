@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+class PdfExtractorInterface(ABC):
+    @abstractmethod
+    def count_pages(self, file_path: str) -> int:
+        """Retourne le nombre de pages du PDF"""
+        pass
+    
+    @abstractmethod
+    def extract_page_range(self, file_path: str, start: int, end: int) -> List[str]:
+        """Extrait le texte des pages [start, end), une entrée par page"""
+        pass
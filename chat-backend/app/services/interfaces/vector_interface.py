@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from app.models.qdrant_dto import QdrantDocumentInput
 from app.models.documents import Document
 from qdrant_client.http import models
@@ -10,6 +10,11 @@ class VectorInterface(ABC):
         """Ajoute des documents au store vectoriel"""
         pass
     
+    @abstractmethod
+    def add_documents_stream(self, batches: Iterable[List[QdrantDocumentInput]]) -> int:
+        """Ajoute les lots d'un nouveau document au fil de leur production ; en cas d'échec, les points écrits par cet appel sont supprimés"""
+        pass
+    
     @abstractmethod
     def semantic_search(self, query_vector: List[float], top_k: int = 5, 
                        filter: Optional[models.Filter] = None) -> List[Document]:
@@ -28,7 +33,22 @@ class VectorInterface(ABC):
         """Supprime un document du store vectoriel"""
         pass
     
+    @abstractmethod
+    def get_document_chunks(self, doc_hash: str) -> List[QdrantDocumentInput]:
+        """Récupère les chunks (avec vecteurs) d'un document"""
+        pass
+    
+    @abstractmethod
+    def delete_points(self, ids: List[str]) -> None:
+        """Supprime des chunks par leurs IDs"""
+        pass
+    
     @abstractmethod
     def get_text_embedding(self, text: str) -> List[float]:
         """Génère l'embedding d'un texte"""
+        pass
+    
+    @abstractmethod
+    def get_embedding_stats(self) -> Dict:
+        """Statistiques de génération des embeddings de requêtes"""
         pass
\ No newline at end of file
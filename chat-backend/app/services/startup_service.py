@@ -2,8 +2,12 @@
 import logging
 import sys
 import asyncio
-from typing import Optional
+from typing import Optional, Union
+from app.core.config import INFERENCE_MODE, MODEL_SERVER_STARTUP_TIMEOUT
+from app.core.executors import run_io
 from app.services.implementations.local_llm_service import LocalLlmService
+from app.services.implementations.remote_llm_service import RemoteLlmService
+from app.services.implementations.openai_llm_service import OpenAiLlmService
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +15,7 @@ class StartupService:
     """Service responsable du chargement des ressources au démarrage de l'application."""
     
     def __init__(self):
-        self.llm_service: Optional[LocalLlmService] = None
+        self.llm_service: Optional[Union[LocalLlmService, RemoteLlmService, OpenAiLlmService]] = None
         self.startup_completed = False
     
     async def initialize_services(self):
@@ -20,8 +24,16 @@ class StartupService:
             logger.info("Démarrage de l'initialisation des services...")
 
             # Chargement du modèle LLM
-            logger.info("Chargement du modèle LLM local...")
-            self.llm_service = LocalLlmService()
+            if INFERENCE_MODE == "remote":
+                logger.info("Attente du serveur de modèles...")
+                self.llm_service = RemoteLlmService()
+                await run_io(self.llm_service.wait_until_ready, MODEL_SERVER_STARTUP_TIMEOUT)
+            elif INFERENCE_MODE == "openai":
+                logger.info("Connexion au serveur de génération compatible OpenAI...")
+                self.llm_service = OpenAiLlmService()
+            else:
+                logger.info("Chargement du modèle LLM local...")
+                self.llm_service = LocalLlmService()
             
             # Vérification que le modèle est bien chargé
             model_info = self.llm_service.get_model_info()
@@ -39,7 +51,7 @@ class StartupService:
             logger.error(f"Erreur lors de l'initialisation des services: {str(e)}")
             raise
     
-    def get_llm_service(self) -> LocalLlmService:
+    def get_llm_service(self) -> Union[LocalLlmService, RemoteLlmService, OpenAiLlmService]:
         """Retourne le service LLM initialisé."""
         if not self.startup_completed:
             raise RuntimeError("Les services ne sont pas encore initialisés")
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.services.utils.query_embedding_cache import normalize_question
+
+AnswerKey = Tuple[str, int, Tuple[str, ...], str, str]
+
+
+class AnswerCache:
+    """
+    Cache LRU en mémoire des réponses RAG, avec durée de vie.
+    Clé : (question normalisée, top_k, IDs ordonnés des chunks retrouvés, identifiant du
+    modèle, version du prompt). Les entrées sont rattachées à la version du corpus au
+    moment de la recherche : dès qu'une version plus récente est vue, toutes les entrées
+    antérieures sont invalidées, si bien qu'une réponse n'est jamais servie après l'ajout,
+    le remplacement ou la suppression d'un document.
+    """
+
+    def __init__(self, model_id: str, prompt_version: str,
+                 max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.model_id = model_id
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # clé -> (réponse, échéance)
+        self._entries: "OrderedDict[AnswerKey, Tuple[str, float]]" = OrderedDict()
+        self._corpus_version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    def key(self, question: str, top_k: int, chunk_ids: List[str]) -> AnswerKey:
+        return (normalize_question(question), top_k, tuple(chunk_ids), self.model_id, self.prompt_version)
+
+    def get(self, key: AnswerKey, corpus_version: int) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            self._sync_corpus_version(corpus_version)
+            entry = self._entries.get(key) if corpus_version == self._corpus_version else None
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: AnswerKey, answer: str, corpus_version: int) -> None:
+        """Mémorise la réponse calculée sur la version `corpus_version` (lue avant la recherche)."""
+        with self._lock:
+            self._sync_corpus_version(corpus_version)
+            if corpus_version != self._corpus_version:
+                # Le corpus a changé pendant la génération : réponse déjà périmée
+                return
+            self._entries[key] = (answer, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _sync_corpus_version(self, corpus_version: int) -> None:
+        if corpus_version > self._corpus_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._corpus_version = corpus_version
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "corpus_version": self._corpus_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
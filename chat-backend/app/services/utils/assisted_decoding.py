@@ -0,0 +1,77 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+# Échantillon de contrôle : mêmes IDs attendus avec les deux tokenizers
+_TOKENIZER_PROBE = "Étape 1 : ouvrez le panneau d'administration, puis cliquez sur « Installer »."
+
+
+@dataclass
+class DraftModel:
+    """Modèle brouillon du décodage assisté (speculative decoding)."""
+    model: Any
+    tokenizer: Any
+    # Vocabulaires différents : décodage assisté « universel » (re-tokenisation des propositions)
+    universal: bool = False
+
+    def generate_kwargs(self, main_tokenizer) -> Dict:
+        kwargs = {"assistant_model": self.model}
+        if self.universal:
+            kwargs.update(tokenizer=main_tokenizer, assistant_tokenizer=self.tokenizer)
+        return kwargs
+
+
+def tokenizers_compatible(main_tokenizer, draft_tokenizer) -> bool:
+    """
+    Le brouillon peut proposer des tokens directement vérifiables par le modèle principal
+    si les deux tokenizers ont le même vocabulaire, le même token de fin et découpent
+    le texte de la même façon.
+    """
+    if main_tokenizer.eos_token_id != draft_tokenizer.eos_token_id:
+        return False
+    if main_tokenizer.get_vocab() != draft_tokenizer.get_vocab():
+        return False
+    return (
+        main_tokenizer(_TOKENIZER_PROBE, add_special_tokens=False)["input_ids"]
+        == draft_tokenizer(_TOKENIZER_PROBE, add_special_tokens=False)["input_ids"]
+    )
+
+
+def load_draft_model(path: Path, main_tokenizer, device: torch.device,
+                     torch_dtype: torch.dtype, allow_universal: bool = True) -> Optional[DraftModel]:
+    """
+    Charge le modèle brouillon depuis `path` et vérifie son tokenizer.
+    Retourne None (décodage assisté désactivé) si le modèle est absent ou si les
+    tokenizers sont incompatibles et que le mode universel n'est pas autorisé.
+    """
+    if not Path(path).exists():
+        logger.warning(f"Modèle brouillon introuvable ({path}) : décodage assisté désactivé")
+        return None
+
+    draft_tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+    universal = not tokenizers_compatible(main_tokenizer, draft_tokenizer)
+    if universal and not allow_universal:
+        logger.warning(
+            f"Tokenizer du modèle brouillon ({path}) incompatible avec le modèle principal : "
+            f"décodage assisté désactivé"
+        )
+        return None
+    if universal:
+        logger.warning(
+            f"Tokenizer du modèle brouillon ({path}) différent du modèle principal : "
+            f"décodage assisté universel (propositions re-tokenisées, gain réduit)"
+        )
+
+    draft_model = AutoModelForCausalLM.from_pretrained(
+        path, torch_dtype=torch_dtype, low_cpu_mem_usage=True, local_files_only=True
+    )
+    draft_model.to(device)
+    draft_model.eval()
+    logger.info(f"Modèle brouillon chargé depuis {path}")
+    return DraftModel(model=draft_model, tokenizer=draft_tokenizer, universal=universal)
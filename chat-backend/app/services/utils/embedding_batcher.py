@@ -0,0 +1,95 @@
+import logging
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching des embeddings de requêtes.
+
+    Les appelants (threads de l'API) déposent leur texte et attendent un Future.
+    Un thread dispatcher regroupe les textes arrivés pendant `window_ms` millisecondes,
+    ou jusqu'à `max_batch_size` textes, exécute un seul appel groupé à `embed_batch`
+    puis résout le Future de chaque appelant.
+    """
+
+    def __init__(self,
+                 embed_batch: Callable[[List[str]], List[List[float]]],
+                 max_batch_size: int = 32,
+                 window_ms: float = 5.0,
+                 history_size: int = 1000):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000
+        self._queue: "queue.Queue[Tuple[str, Future, float]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._batch_sizes: deque = deque(maxlen=history_size)
+        self._queue_waits: deque = deque(maxlen=history_size)
+        self._dispatcher = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._dispatcher.start()
+
+    def embed(self, text: str) -> List[float]:
+        """Retourne l'embedding de `text` (bloquant), calculé dans un lot partagé."""
+        return self.submit(text).result()
+
+    def submit(self, text: str) -> Future:
+        """Place `text` dans le prochain lot ; le Future reçoit son embedding."""
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def stats(self) -> Dict:
+        """Taille des lots et attente en file (ms) sur les derniers lots/requêtes."""
+        with self._lock:
+            sizes = list(self._batch_sizes)
+            waits = sorted(self._queue_waits)
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "pending": self._queue.qsize(),
+                "avg_batch_size": round(statistics.mean(sizes), 2) if sizes else 0.0,
+                "max_batch_size": max(sizes) if sizes else 0,
+                "avg_queue_wait_ms": round(statistics.mean(waits), 2) if waits else 0.0,
+                "p95_queue_wait_ms": round(waits[int(0.95 * (len(waits) - 1))], 2) if waits else 0.0,
+            }
+
+    def _collect(self) -> List[Tuple[str, Future, float]]:
+        """Attend une première requête puis complète le lot jusqu'à la fin de la fenêtre."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                vectors = self.embed_batch([text for text, _, _ in batch])
+                for (_, future, _), vector in zip(batch, vectors):
+                    future.set_result(vector)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'embedding d'un lot de {len(batch)} requêtes: {str(e)}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            with self._lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._batch_sizes.append(len(batch))
+                self._queue_waits.extend((started - queued_at) * 1000 for _, _, queued_at in batch)
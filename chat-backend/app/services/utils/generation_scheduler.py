@@ -0,0 +1,303 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional
+
+import torch
+from fastapi import HTTPException, status
+from transformers import StoppingCriteria, StoppingCriteriaList
+
+from app.services.utils.latency_tracker import LatencyTracker
+from app.services.utils.prefix_cache import PrefixKVCache
+from app.services.utils.assisted_decoding import DraftModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GenerationRequest:
+    prompt: str
+    max_new_tokens: int
+    temperature: float
+    top_p: float
+    # Préfixe constant du prompt (consignes), servi depuis le KV-cache de préfixe
+    prefix: Optional[str] = None
+    # Requête en streaming : les tokens sont poussés dans le streamer au fil de l'eau
+    streamer: Optional[object] = None
+    should_stop: Optional[Callable[[], bool]] = None
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class GenerationScheduler:
+    """
+    Ordonnanceur de génération : seul propriétaire du modèle.
+
+    Les requêtes attendent dans une file bornée (429 + Retry-After si elle est pleine).
+    `concurrency` threads prennent chacun la requête la plus ancienne et lui adjoignent
+    les requêtes compatibles arrivées dans les `max_wait_ms` suivant son arrivée, jusqu'à
+    `max_batch_size`, puis exécutent un seul `generate` sur le lot (padding à gauche).
+    Les requêtes en streaming sont exécutées seules.
+    Avec `prefix_cache`, une requête exécutée seule réutilise le KV-cache de son préfixe
+    (les lots paddés à gauche décalent le préfixe et sont encodés entièrement).
+    Avec `draft_model`, les requêtes éligibles sont exécutées seules en décodage assisté :
+    toutes (`assisted_mode="always"`) ou seulement en génération déterministe
+    (température 0, `assisted_mode="auto"`).
+    """
+
+    def __init__(self, model, tokenizer,
+                 max_batch_size: int = 4,
+                 max_wait_ms: float = 50.0,
+                 max_queue_size: int = 16,
+                 concurrency: int = 1,
+                 retry_after: int = 10,
+                 prefix_cache: Optional[PrefixKVCache] = None,
+                 draft_model: Optional[DraftModel] = None,
+                 assisted_mode: str = "auto"):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue_size = max_queue_size
+        self.concurrency = max(1, concurrency)
+        self.retry_after = retry_after
+        self.prefix_cache = prefix_cache
+        self.draft_model = draft_model
+        self.assisted_mode = assisted_mode
+        self._assisted = 0
+
+        self._pending: List[GenerationRequest] = []
+        self._condition = threading.Condition()
+        self._running = False
+        self._workers: List[threading.Thread] = []
+
+        self._batches = 0
+        self._requests = 0
+        self._rejected = 0
+        self._active = 0
+        self._max_depth = 0
+        self._queue_wait = LatencyTracker()
+
+    def start(self) -> None:
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.concurrency):
+            worker = threading.Thread(target=self._worker_loop, name=f"llm-scheduler-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(
+            f"Ordonnanceur de génération démarré (lots de {self.max_batch_size} max, "
+            f"attente {self.max_wait * 1000:.0f} ms, file de {self.max_queue_size}, {self.concurrency} worker(s))"
+        )
+
+    def stop(self) -> None:
+        with self._condition:
+            self._running = False
+            pending, self._pending = self._pending, []
+            self._condition.notify_all()
+        for request in pending:
+            self._fail(request, self._unavailable())
+        # Les workers terminent le lot en cours avant de s'arrêter
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers = []
+
+    def submit(self, request: GenerationRequest) -> Future:
+        """Place la requête en file ; lève 429 si la file est pleine, 503 si l'ordonnanceur est arrêté."""
+        with self._condition:
+            if not self._running:
+                raise self._unavailable()
+            if len(self._pending) >= self.max_queue_size:
+                self._rejected += 1
+                raise self._queue_full()
+            self._pending.append(request)
+            self._max_depth = max(self._max_depth, len(self._pending))
+            self._condition.notify_all()
+        return request.future
+
+    def ensure_capacity(self) -> None:
+        """Lève l'erreur que `submit` lèverait maintenant (contrôle avant d'ouvrir un stream)."""
+        with self._condition:
+            if not self._running:
+                raise self._unavailable()
+            if len(self._pending) >= self.max_queue_size:
+                raise self._queue_full()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self._max_depth,
+                "max_queue_size": self.max_queue_size,
+                "active_batches": self._active,
+                "batches": self._batches,
+                "requests": self._requests,
+                "rejected": self._rejected,
+                "assisted": self._assisted,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "queue_wait": self._queue_wait.stats(),
+                "prefix_cache": self.prefix_cache.stats() if self.prefix_cache is not None else None,
+            }
+
+    # ==================== WORKERS ====================
+
+    def _unavailable(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service de génération indisponible",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+    def _queue_full(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop de requêtes de génération en attente, réessayez plus tard",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+    def _next_batch(self) -> List[GenerationRequest]:
+        with self._condition:
+            while True:
+                if not self._running:
+                    return []
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+
+                head = self._pending[0]
+                if self._runs_alone(head):
+                    batch = [head]
+                else:
+                    key = self._batch_key(head)
+                    batch = [
+                        r for r in self._pending
+                        if not self._runs_alone(r) and self._batch_key(r) == key
+                    ][:self.max_batch_size]
+                remaining = head.enqueued_at + self.max_wait - time.perf_counter()
+                if len(batch) >= self.max_batch_size or remaining <= 0 or self._runs_alone(head):
+                    for request in batch:
+                        self._pending.remove(request)
+                    self._active += 1
+                    return batch
+                self._condition.wait(remaining)
+
+    @staticmethod
+    def _batch_key(request: GenerationRequest) -> Hashable:
+        """Requêtes regroupables : mêmes paramètres de génération."""
+        return (request.max_new_tokens, request.temperature, request.top_p)
+
+    def _runs_alone(self, request: GenerationRequest) -> bool:
+        """Streaming et décodage assisté ne traitent qu'une séquence à la fois."""
+        return request.streamer is not None or self._draft_applies(request)
+
+    def _draft_applies(self, request: GenerationRequest) -> bool:
+        if self.draft_model is None:
+            return False
+        if self.assisted_mode == "always":
+            return True
+        return self.assisted_mode == "auto" and request.temperature == 0
+
+    def _worker_loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                break
+            started = time.perf_counter()
+            for request in batch:
+                self._queue_wait.record((started - request.enqueued_at) * 1000)
+            try:
+                if batch[0].streamer is not None:
+                    self._generate_stream(batch[0])
+                else:
+                    self._generate_batch(batch)
+            except Exception as e:
+                logger.error(f"Erreur de génération sur un lot de {len(batch)} requête(s): {str(e)}")
+                for request in batch:
+                    self._fail(request, e)
+            finally:
+                with self._condition:
+                    self._active -= 1
+                    self._batches += 1
+                    self._requests += len(batch)
+
+    def _generation_kwargs(self, batch: List[GenerationRequest]) -> Dict:
+        """Paramètres de `generate` ; une température nulle donne un décodage glouton."""
+        request = batch[0]
+        kwargs = {
+            "max_new_tokens": request.max_new_tokens,
+            "pad_token_id": self.tokenizer.pad_token_id,
+            "eos_token_id": self.tokenizer.eos_token_id,
+        }
+        if request.temperature > 0:
+            kwargs.update(do_sample=True, temperature=request.temperature, top_p=request.top_p)
+        else:
+            kwargs.update(do_sample=False)
+
+        if len(batch) == 1 and self._draft_applies(request):
+            kwargs.update(self.draft_model.generate_kwargs(self.tokenizer))
+            with self._condition:
+                self._assisted += 1
+        return kwargs
+
+    def _encode(self, batch: List[GenerationRequest]) -> Dict:
+        """Entrées de `generate` pour le lot, depuis le KV-cache du préfixe si possible."""
+        request = batch[0]
+        if len(batch) == 1 and self.prefix_cache is not None and request.prefix:
+            self.prefix_cache.warm(request.prefix)
+            inputs = self.prefix_cache.encode(request.prompt)
+            if inputs is not None:
+                return inputs
+        return self.tokenizer(
+            [r.prompt for r in batch], return_tensors="pt", padding=True
+        ).to(self.model.device)
+
+    def _generate_batch(self, batch: List[GenerationRequest]) -> None:
+        inputs = self._encode(batch)
+        # no_grad plutôt qu'inference_mode : compatible avec les poids int4 (optimum-quanto)
+        with torch.no_grad():
+            outputs = self.model.generate(**inputs, **self._generation_kwargs(batch))
+
+        # Padding à gauche : les tokens générés commencent au même index pour tout le lot
+        generated = outputs[:, inputs["input_ids"].shape[1]:]
+        texts = self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+        for request, text in zip(batch, texts):
+            request.future.set_result(text)
+
+    def _generate_stream(self, request: GenerationRequest) -> None:
+        if request.should_stop is not None and request.should_stop():
+            # Client parti pendant l'attente en file
+            request.streamer.end()
+            request.future.set_result(None)
+            return
+
+        inputs = self._encode([request])
+        stopping = StoppingCriteriaList([_StopWhen(request.should_stop)]) if request.should_stop else None
+        with torch.no_grad():
+            self.model.generate(
+                **inputs,
+                streamer=request.streamer,
+                stopping_criteria=stopping,
+                **self._generation_kwargs([request])
+            )
+        request.future.set_result(None)
+
+    @staticmethod
+    def _fail(request: GenerationRequest, error: Exception) -> None:
+        if request.streamer is not None:
+            request.streamer.end()
+        if not request.future.done():
+            request.future.set_exception(error)
+
+
+class _StopWhen(StoppingCriteria):
+    """Interrompt `generate` dès que la condition devient vraie."""
+
+    def __init__(self, condition: Callable[[], bool]):
+        self.condition = condition
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.condition(), dtype=torch.bool, device=input_ids.device)
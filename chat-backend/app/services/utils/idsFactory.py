@@ -17,7 +17,7 @@ class IdsFactory:
 
         :return: Hash en hexadécimal.
         """
-        return hashlib.sha256(self.pdf_content.encode("utf-8")).hexdigest()
+        return IdsFactory.hash_content(self.pdf_content)
 
     def get_pdf_hash(self) -> str:
         """
@@ -34,5 +34,26 @@ class IdsFactory:
         :param chunk_index: Index du chunk dans le document.
         :return: UUID v5 (nommé) sous forme de chaîne.
         """
-        raw_id = f"{self._pdf_hash}_{chunk_index}"
+        return IdsFactory.build_chunk_id(self._pdf_hash, chunk_index)
+
+    @staticmethod
+    def hash_content(text: str) -> str:
+        """
+        Calcule le hash SHA-256 d'un texte (contenu d'un chunk).
+
+        :param text: Texte à hacher.
+        :return: Hash en hexadécimal.
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def build_chunk_id(pdf_hash: str, chunk_index: int) -> str:
+        """
+        Calcule l'identifiant d'un chunk à partir du hash du PDF, sans instancier la factory.
+
+        :param pdf_hash: Hash SHA-256 du document.
+        :param chunk_index: Index du chunk dans le document.
+        :return: UUID v5 (nommé) sous forme de chaîne.
+        """
+        raw_id = f"{pdf_hash}_{chunk_index}"
         return str(uuid.uuid5(uuid.NAMESPACE_DNS, raw_id))  # UUID stable et unique
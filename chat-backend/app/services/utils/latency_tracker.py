@@ -0,0 +1,31 @@
+import statistics
+import threading
+from collections import deque
+from typing import Dict
+
+
+class LatencyTracker:
+    """Fenêtre glissante de mesures de latence (ms) : nombre, moyenne, p50 et p95."""
+
+    def __init__(self, history_size: int = 1000):
+        self._values: deque = deque(maxlen=history_size)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, milliseconds: float) -> None:
+        with self._lock:
+            self._values.append(milliseconds)
+            self._count += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            values = sorted(self._values)
+            count = self._count
+        if not values:
+            return {"count": count, "avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+        return {
+            "count": count,
+            "avg_ms": round(statistics.mean(values), 2),
+            "p50_ms": round(values[int(0.50 * (len(values) - 1))], 2),
+            "p95_ms": round(values[int(0.95 * (len(values) - 1))], 2),
+        }
@@ -0,0 +1,133 @@
+import logging
+import resource
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import torch
+from huggingface_hub import snapshot_download
+from huggingface_hub.errors import LocalEntryNotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Précision des poids du LLM sur CPU : "int8" = quantification dynamique des couches
+# linéaires (torch), "int4" = poids 4 bits (optimum-quanto)
+CPU_PRECISIONS = ("float32", "bfloat16", "int8", "int4")
+
+
+@dataclass
+class ModelSource:
+    """Emplacement d'où charger un modèle : snapshot local ou nom du Hub."""
+    location: str
+    # Snapshot présent sur disque : aucun accès réseau
+    local: bool
+    # Poids au format safetensors : chargés par memory-mapping
+    safetensors: bool
+
+    def from_pretrained_kwargs(self) -> Dict:
+        kwargs = {"local_files_only": self.local}
+        if self.safetensors:
+            # Jamais de repli sur les .bin (pickle lu en entier en mémoire)
+            kwargs["use_safetensors"] = True
+        return kwargs
+
+
+def _is_snapshot(path: Path) -> bool:
+    return path.is_dir() and (path / "config.json").is_file()
+
+
+def _has_safetensors(path: Path) -> bool:
+    return any(path.glob("*.safetensors"))
+
+
+def resolve_model_source(local_path: Path, hub_name: str, offline: bool = False) -> ModelSource:
+    """
+    Choisit d'où charger le modèle, par ordre de préférence :
+    1. le snapshot local `local_path` (répertoire contenant config.json) ;
+    2. hors ligne, le snapshot de `hub_name` déjà présent dans le cache Hugging Face ;
+    3. en ligne, le Hub (`hub_name`).
+    Hors ligne sans snapshot disponible, échoue immédiatement plutôt que d'attendre le réseau.
+    """
+    local_path = Path(local_path)
+    if _is_snapshot(local_path):
+        source = ModelSource(str(local_path), local=True, safetensors=_has_safetensors(local_path))
+    elif offline:
+        try:
+            cached = Path(snapshot_download(hub_name, local_files_only=True))
+        except LocalEntryNotFoundError:
+            raise RuntimeError(
+                f"Mode hors ligne : aucun snapshot local dans {local_path} "
+                f"ni dans le cache Hugging Face pour {hub_name}"
+            )
+        source = ModelSource(str(cached), local=True, safetensors=_has_safetensors(cached))
+    else:
+        logger.warning(f"Aucun snapshot local dans {local_path} : téléchargement depuis le Hub ({hub_name})")
+        return ModelSource(hub_name, local=False, safetensors=False)
+
+    if not source.safetensors:
+        logger.warning(f"Pas de poids safetensors dans {source.location} : chargement complet en mémoire")
+    return source
+
+
+class LoadTimer:
+    """Durée de chaque phase d'un chargement, pour suivre les régressions de démarrage à froid."""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    @property
+    def total(self) -> float:
+        return sum(duration for _, duration in self.phases)
+
+    def summary(self) -> str:
+        details = ", ".join(f"{name} {duration:.2f} s" for name, duration in self.phases)
+        return f"{self.total:.2f} s ({details})"
+
+
+def precision_model_kwargs(precision: str) -> Dict:
+    """Arguments de `from_pretrained` pour charger le modèle dans la précision CPU demandée."""
+    if precision not in CPU_PRECISIONS:
+        raise ValueError(f"Précision CPU inconnue: {precision} (valeurs possibles: {', '.join(CPU_PRECISIONS)})")
+    if precision == "bfloat16":
+        return {"torch_dtype": torch.bfloat16}
+    if precision == "int4":
+        from transformers import QuantoConfig
+        return {"torch_dtype": torch.float32, "quantization_config": QuantoConfig(weights="int4")}
+    # int8 : chargement en float32 puis quantification dynamique après chargement
+    return {"torch_dtype": torch.float32}
+
+
+def quantize_after_load(model, precision: str):
+    """Quantification appliquée au modèle chargé (int8 dynamique : nn.Linear -> poids int8)."""
+    if precision != "int8":
+        return model
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def _tensor_bytes(value) -> int:
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        # Poids empaquetés des couches quantifiées dynamiquement : (poids int8, biais)
+        return sum(_tensor_bytes(item) for item in value)
+    return 0
+
+
+def model_memory_footprint(model) -> int:
+    """Taille en octets des poids et buffers du modèle, couches quantifiées comprises."""
+    return sum(_tensor_bytes(value) for value in model.state_dict().values())
+
+
+def peak_rss_bytes() -> int:
+    """Pic de mémoire résidente du processus (Linux : ru_maxrss en Ko)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -0,0 +1,78 @@
+import json
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.core.config import MODEL_SERVER_URL, MODEL_SERVER_SOCKET, MODEL_SERVER_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class ModelServerClient:
+    """
+    Client HTTP du serveur de modèles (app.model_server), par socket Unix ou HTTP local.
+    Les connexions sont persistantes et partagées entre les threads de l'API.
+    Les erreurs du serveur (429, 503, ...) sont relevées en HTTPException avec le même
+    statut et le même Retry-After ; un serveur injoignable donne une 503.
+    """
+
+    def __init__(self, url: str = MODEL_SERVER_URL,
+                 socket_path: Optional[str] = MODEL_SERVER_SOCKET,
+                 timeout: float = MODEL_SERVER_TIMEOUT):
+        self.location = socket_path or url
+        self._client = httpx.Client(
+            # Avec un socket Unix, l'hôte de l'URL n'est pas utilisé
+            base_url="http://model-server" if socket_path else url,
+            transport=httpx.HTTPTransport(uds=socket_path) if socket_path else None,
+            timeout=httpx.Timeout(timeout, connect=5.0)
+        )
+
+    def get(self, path: str) -> Dict:
+        return self._request("GET", path)
+
+    def post(self, path: str, payload: Dict) -> Dict:
+        return self._request("POST", path, json=payload)
+
+    @contextmanager
+    def stream(self, path: str, payload: Dict) -> Iterator[Iterator[Dict]]:
+        """Ouvre une réponse NDJSON et produit ses événements ; la fermer coupe la connexion."""
+        try:
+            with self._client.stream("POST", path, json=payload) as response:
+                if response.is_error:
+                    response.read()
+                    self._raise_for_status(response)
+                yield (json.loads(line) for line in response.iter_lines() if line)
+        except httpx.TransportError as e:
+            raise self._unreachable(e)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict:
+        try:
+            response = self._client.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            raise self._unreachable(e)
+        self._raise_for_status(response)
+        return response.json()
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        if not response.is_error:
+            return
+        try:
+            detail = response.json().get("detail", response.text)
+        except ValueError:
+            detail = response.text
+        headers = {"Retry-After": response.headers["Retry-After"]} if "Retry-After" in response.headers else None
+        raise HTTPException(status_code=response.status_code, detail=detail, headers=headers)
+
+    def _unreachable(self, error: Exception) -> HTTPException:
+        logger.debug(f"Serveur de modèles injoignable ({self.location}): {str(error)}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serveur de modèles injoignable"
+        )
@@ -0,0 +1,65 @@
+# app/services/utils/pdf_extraction.py
+# Module volontairement léger : il est réimporté par les processus workers
+# de l'extraction parallèle.
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Optional, Tuple
+
+from app.services.implementations.pdf_extractors import get_pdf_extractor
+
+_executor: Optional[ProcessPoolExecutor] = None
+# Plusieurs workers d'ingestion peuvent demander le pool en même temps
+_executor_lock = threading.Lock()
+
+
+def extract_page_range(backend: str, file_path: str, start: int, end: int) -> List[str]:
+    """Extrait le texte des pages [start, end) d'un PDF avec le backend demandé."""
+    return get_pdf_extractor(backend).extract_page_range(file_path, start, end)
+
+
+def _page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    size = max(1, -(-page_count // parts))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _get_executor(max_workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # "spawn" : les processus de l'API portent des threads et des modèles chargés
+            _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context("spawn"))
+        return _executor
+
+
+def extract_pages(file_path: str, backend: str, max_workers: int, min_parallel_pages: int) -> List[str]:
+    """
+    Extrait le texte de chaque page, dans l'ordre, en répartissant des plages de pages
+    sur un pool de processus. Les petits documents sont traités dans le processus courant.
+    """
+    page_count = get_pdf_extractor(backend).count_pages(file_path)
+    max_workers = max(1, min(max_workers, os.cpu_count() or 1))
+    if max_workers == 1 or page_count < min_parallel_pages:
+        return extract_page_range(backend, file_path, 0, page_count)
+
+    executor = _get_executor(max_workers)
+    # Plusieurs plages par worker pour lisser les pages coûteuses
+    ranges = _page_ranges(page_count, max_workers * 4)
+    futures = [
+        executor.submit(extract_page_range, backend, file_path, start, end)
+        for start, end in ranges
+    ]
+
+    pages: List[str] = []
+    for future in futures:
+        pages.extend(future.result())
+    return pages
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
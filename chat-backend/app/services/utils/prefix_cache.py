@@ -0,0 +1,83 @@
+import copy
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixKVCache:
+    """
+    KV-cache du préfixe constant des prompts (consignes système).
+
+    Les clés/valeurs d'attention du préfixe sont calculées une seule fois ; chaque
+    génération dont le prompt commence par ce préfixe repart d'une copie du cache et
+    n'encode que la suite (contexte et question). Le cache est lié au texte exact du
+    préfixe : si le template change, il est recalculé au premier prompt qui l'utilise.
+    """
+
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.prefix: Optional[str] = None
+        self._input_ids: Optional[torch.Tensor] = None
+        self._past_key_values = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.prefill_ms = 0.0
+
+    def warm(self, prefix: str) -> None:
+        """Calcule le cache du préfixe s'il n'est pas déjà celui en place."""
+        with self._lock:
+            if prefix == self.prefix:
+                return
+            started = time.perf_counter()
+            input_ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"].to(self.model.device)
+            with torch.no_grad():
+                past_key_values = self.model(input_ids=input_ids, use_cache=True).past_key_values
+
+            invalidated = self.prefix is not None
+            self.prefix = prefix
+            self._input_ids = input_ids
+            self._past_key_values = past_key_values
+            self.prefill_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"KV-cache du préfixe {'recalculé (template modifié)' if invalidated else 'calculé'} : "
+            f"{input_ids.shape[1]} tokens en {self.prefill_ms:.0f} ms"
+        )
+
+    def encode(self, prompt: str) -> Optional[Dict]:
+        """
+        Entrées de `generate` pour `prompt` réutilisant le cache du préfixe,
+        ou None si le prompt ne commence pas par le préfixe en cache.
+        """
+        with self._lock:
+            prefix, prefix_ids, past_key_values = self.prefix, self._input_ids, self._past_key_values
+            if prefix is None or not prompt.startswith(prefix) or len(prompt) == len(prefix):
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        suffix_ids = self.tokenizer(
+            prompt[len(prefix):], add_special_tokens=False, return_tensors="pt"
+        )["input_ids"].to(self.model.device)
+        input_ids = torch.cat([prefix_ids, suffix_ids], dim=1)
+        return {
+            "input_ids": input_ids,
+            "attention_mask": torch.ones_like(input_ids),
+            # generate() complète le cache en place : chaque génération a sa copie
+            "past_key_values": copy.deepcopy(past_key_values),
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "prefix_tokens": self._input_ids.shape[1] if self._input_ids is not None else 0,
+                "prefill_ms": round(self.prefill_ms, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,63 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_question(text: str) -> str:
+    """Normalise une question : casse, accents et espaces ("Comment  Procéder" -> "comment proceder")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", without_accents).strip()
+
+
+class QueryEmbeddingCache:
+    """
+    Cache LRU en mémoire des embeddings de questions.
+    Clé : (identifiant du modèle d'embedding, question normalisée) ; les vecteurs sont
+    stockés en float32. Au-delà de `max_entries`, l'entrée la moins récemment utilisée
+    est évincée.
+    """
+
+    def __init__(self, model_id: str, max_entries: int = 2048):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, question: str) -> Optional[List[float]]:
+        key = (self.model_id, normalize_question(question))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return vector.tolist()
+
+    def put(self, question: str, embedding: List[float]) -> None:
+        key = (self.model_id, normalize_question(question))
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_bytes": sum(vector.nbytes for vector in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,43 @@
+import re
+from typing import Callable, Optional
+
+
+def clean_response(text: str) -> str:
+    """Nettoie la réponse générée (balises du template, lignes vides et espaces multiples)."""
+    text = text.replace("<|system|>", "")
+    text = text.replace("<|user|>", "")
+    text = text.replace("<|assistant|>", "")
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip()
+
+
+class StreamCleaner:
+    """
+    Applique le nettoyage de réponse au fil du streaming.
+    Le texte est nettoyé jusqu'au dernier caractère « stable » : les espaces de fin
+    (qui peuvent encore être fusionnés) et une balise <|...|> incomplète sont retenus
+    jusqu'au fragment suivant. Seul le nouveau suffixe nettoyé est renvoyé.
+    """
+
+    _PENDING_TAIL = re.compile(r"(?:\s+|<(?:\|[a-z]*\|?)?)+$")
+
+    def __init__(self, clean: Optional[Callable[[str], str]] = None):
+        self.clean = clean or clean_response
+        self.raw = ""
+        self.emitted = ""
+
+    def feed(self, text: str) -> str:
+        self.raw += text
+        stable = self._PENDING_TAIL.sub("", self.raw)
+        return self._emit(self.clean(stable))
+
+    def flush(self) -> str:
+        return self._emit(self.clean(self.raw))
+
+    def _emit(self, cleaned: str) -> str:
+        if not cleaned.startswith(self.emitted):
+            return ""
+        delta = cleaned[len(self.emitted):]
+        self.emitted = cleaned
+        return delta
@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class SemanticEntry:
+    question: str
+    answer: str
+    chunk_ids: FrozenSet[str]
+
+
+@dataclass
+class SemanticMatch:
+    """Réponse trouvée pour une question proche."""
+    answer: str
+    # Question d'origine de la réponse
+    question: str
+    similarity: float
+    overlap: float
+
+
+def _normalize(vector: List[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+class SemanticAnswerCache:
+    """
+    Cache de réponses pour les questions reformulées : petit index vectoriel en mémoire
+    (matrice float32 des embeddings normalisés des questions déjà traitées).
+    Une réponse est servie si la similarité cosinus de la nouvelle question atteint
+    `threshold` et si les chunks retrouvés se recouvrent d'au moins `min_overlap`
+    (indice de Jaccard des IDs). Chaque entrée garde la version du corpus sur laquelle
+    elle a été calculée et disparaît dès qu'une version plus récente est vue, ou à
+    l'expiration de sa durée de vie ; index plein, l'entrée la moins récemment
+    utilisée est évincée.
+    Une part `audit_rate` des réponses trouvées n'est pas servie mais régénérée :
+    la comparaison des deux réponses mesure le taux de fausses réponses en cache.
+    """
+
+    def __init__(self, max_entries: int = 512, threshold: float = 0.92, min_overlap: float = 0.6,
+                 ttl_seconds: float = 3600, audit_rate: float = 0.05, audit_min_similarity: float = 0.8):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.min_overlap = min_overlap
+        self.ttl_seconds = ttl_seconds
+        self.audit_rate = audit_rate
+        self.audit_min_similarity = audit_min_similarity
+        # Index alloué au premier ajout (dimension des embeddings inconnue avant)
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Optional[SemanticEntry]] = [None] * max_entries
+        self._active = np.zeros(max_entries, dtype=bool)
+        self._versions = np.zeros(max_entries, dtype=np.int64)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.overlap_rejections = 0
+        self.invalidations = 0
+        self.expired = 0
+        self.evictions = 0
+        self.audits = 0
+        self.false_hits = 0
+
+    def lookup(self, question_vector: List[float], chunk_ids: List[str],
+               corpus_version: int) -> Optional[SemanticMatch]:
+        query = _normalize(question_vector)
+        chunks = frozenset(chunk_ids)
+        now = time.monotonic()
+        with self._lock:
+            self._drop_stale(corpus_version, now)
+            if self._vectors is None or not self._active.any():
+                self.misses += 1
+                return None
+            similarities = self._vectors @ query
+            eligible = self._active & (self._versions == corpus_version) & (similarities >= self.threshold)
+            candidates = np.flatnonzero(eligible)
+            for slot in candidates[np.argsort(-similarities[candidates])]:
+                entry = self._entries[slot]
+                overlap = self._jaccard(entry.chunk_ids, chunks)
+                if overlap >= self.min_overlap:
+                    self._last_used[slot] = now
+                    self.hits += 1
+                    return SemanticMatch(entry.answer, entry.question,
+                                         float(similarities[slot]), overlap)
+            if candidates.size:
+                # Question proche mais contexte différent : la réponse ne s'applique pas
+                self.overlap_rejections += 1
+            self.misses += 1
+            return None
+
+    def put(self, question: str, question_vector: List[float], chunk_ids: List[str],
+            answer: str, corpus_version: int) -> None:
+        """Mémorise la réponse calculée sur la version `corpus_version` (lue avant la recherche)."""
+        vector = _normalize(question_vector)
+        now = time.monotonic()
+        with self._lock:
+            self._drop_stale(corpus_version, now)
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            free = np.flatnonzero(~self._active)
+            if free.size:
+                slot = free[0]
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+            self._vectors[slot] = vector
+            self._entries[slot] = SemanticEntry(question, answer, frozenset(chunk_ids))
+            self._active[slot] = True
+            self._versions[slot] = corpus_version
+            self._expires[slot] = now + self.ttl_seconds
+            self._last_used[slot] = now
+
+    def should_audit(self) -> bool:
+        return random.random() < self.audit_rate
+
+    def record_audit(self, cached_answer_vector: List[float], fresh_answer_vector: List[float]) -> bool:
+        """Compare une réponse trouvée à la réponse régénérée ; retourne True si c'était une fausse réponse."""
+        similarity = float(_normalize(cached_answer_vector) @ _normalize(fresh_answer_vector))
+        false_hit = similarity < self.audit_min_similarity
+        with self._lock:
+            self.audits += 1
+            if false_hit:
+                self.false_hits += 1
+        return false_hit
+
+    def _drop_stale(self, corpus_version: int, now: float) -> None:
+        """Libère les entrées calculées sur une version antérieure du corpus ou expirées."""
+        outdated = self._active & (self._versions < corpus_version)
+        expired = self._active & ~outdated & (self._expires <= now)
+        stale = outdated | expired
+        if not stale.any():
+            return
+        self.invalidations += int(outdated.sum())
+        self.expired += int(expired.sum())
+        self._active[stale] = False
+        for slot in np.flatnonzero(stale):
+            self._entries[slot] = None
+
+    @staticmethod
+    def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": int(self._active.sum()),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "min_overlap": self.min_overlap,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "overlap_rejections": self.overlap_rejections,
+                "invalidations": self.invalidations,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "audits": self.audits,
+                "false_hits": self.false_hits,
+                "false_hit_rate": round(self.false_hits / self.audits, 4) if self.audits else None,
+            }
@@ -0,0 +1,93 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.node_parser.text.semantic_splitter import (
+    SemanticSplitterNodeParser,
+    SentenceCombination,
+)
+from llama_index.core.schema import BaseNode, Document
+
+
+class EmbeddingAwareSemanticSplitter(SemanticSplitterNodeParser):
+    """
+    SemanticSplitterNodeParser qui conserve les embeddings calculés pendant le découpage.
+
+    Le splitter embed déjà chaque groupe de phrases pour trouver les points de coupure.
+    Cette variante rattache à chaque node la moyenne normalisée des embeddings de ses
+    groupes de phrases (`node.embedding`), ce qui évite une nouvelle passe d'embedding
+    quand cette approximation est acceptable.
+    """
+
+    _pooled_embeddings: List[Tuple[str, Optional[List[float]]]] = PrivateAttr(default_factory=list)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "EmbeddingAwareSemanticSplitter"
+
+    def build_semantic_nodes_from_documents(
+        self,
+        documents: Sequence[Document],
+        show_progress: bool = False,
+    ) -> List[BaseNode]:
+        self._pooled_embeddings = []
+        nodes = super().build_semantic_nodes_from_documents(documents, show_progress)
+
+        # Un node est créé par chunk, dans le même ordre. Le vecteur n'est rattaché que si
+        # le texte du node est bien celui du chunk : sinon le node reste sans embedding
+        # et sera embeddé normalement.
+        if len(nodes) == len(self._pooled_embeddings):
+            for node, (chunk, embedding) in zip(nodes, self._pooled_embeddings):
+                if embedding is not None and node.get_content() == chunk:
+                    node.embedding = embedding
+
+        self._pooled_embeddings = []
+        return nodes
+
+    def _build_node_chunks(
+        self, sentences: List[SentenceCombination], distances: List[float]
+    ) -> List[str]:
+        chunks = super()._build_node_chunks(sentences, distances)
+        for chunk, group in zip(chunks, self._group_sentences_by_chunk(sentences, chunks)):
+            self._pooled_embeddings.append((chunk, self._pool(group) if group else None))
+        return chunks
+
+    @staticmethod
+    def _group_sentences_by_chunk(
+        sentences: List[SentenceCombination], chunks: List[str]
+    ) -> List[List[SentenceCombination]]:
+        """
+        Retrouve les phrases qui composent chaque chunk (concaténations consécutives).
+        Un groupe n'est retenu que si ses phrases jointes redonnent exactement le texte
+        du chunk ; sinon (texte normalisé par le splitter, décalage) il est laissé vide.
+        """
+        if len(chunks) == 1:
+            texts = [s["sentence"] for s in sentences]
+            matches = chunks[0] in ("".join(texts), " ".join(texts))
+            return [list(sentences) if matches else []]
+
+        groups: List[List[SentenceCombination]] = []
+        position = 0
+        for chunk in chunks:
+            group: List[SentenceCombination] = []
+            consumed = 0
+            while position < len(sentences) and consumed < len(chunk):
+                group.append(sentences[position])
+                consumed += len(sentences[position]["sentence"])
+                position += 1
+            joined = "".join(s["sentence"] for s in group)
+            groups.append(group if joined == chunk else [])
+        return groups
+
+    @staticmethod
+    def _pool(group: List[SentenceCombination]) -> Optional[List[float]]:
+        vectors = np.asarray(
+            [s["combined_sentence_embedding"] for s in group], dtype=np.float32
+        )
+        if vectors.size == 0:
+            return None
+        pooled = vectors.mean(axis=0)
+        norm = np.linalg.norm(pooled)
+        if norm > 0:
+            pooled /= norm
+        return pooled.tolist()
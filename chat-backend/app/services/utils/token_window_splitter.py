@@ -0,0 +1,70 @@
+from typing import List, Optional
+
+from llama_index.core.schema import TextNode
+from transformers import AutoTokenizer
+
+
+class TokenWindowSplitter:
+    """
+    Découpage en fenêtres de tokens de taille fixe avec recouvrement.
+
+    Le texte est tokenisé une seule fois (tokenizer du modèle d'embedding, avec offsets),
+    puis découpé en fenêtres d'au plus `window_tokens` tokens, chacune reprenant les
+    `overlap_tokens` derniers tokens de la précédente.
+    Coût linéaire, sans aucun embedding. Aucun chunk ne dépasse `max_tokens` ; un reliquat
+    final de moins de `min_tokens` est rattaché au chunk précédent quand le plafond le permet.
+    Les chunks sont des sous-chaînes exactes du texte (start/end_char_idx renseignés).
+    """
+
+    def __init__(self, tokenizer_name: str, window_tokens: int, overlap_tokens: int,
+                 min_tokens: int, max_tokens: int):
+        if not 0 <= overlap_tokens < window_tokens <= max_tokens:
+            raise ValueError("Il faut 0 <= overlap_tokens < window_tokens <= max_tokens")
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name, use_fast=True)
+        self.window_tokens = window_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+
+    def split(self, text: str, file_name: Optional[str] = None) -> List[TextNode]:
+        offsets = self.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+        )["offset_mapping"]
+        token_count = len(offsets)
+        if token_count == 0:
+            return []
+
+        windows = []
+        start = 0
+        while True:
+            end = self._word_boundary(offsets, start, min(start + self.window_tokens, token_count))
+            if token_count - end < self.min_tokens and token_count - start <= self.max_tokens:
+                # Reliquat trop court : on l'absorbe dans ce chunk
+                end = token_count
+            windows.append((start, end))
+            if end >= token_count:
+                break
+            start = max(end - self.overlap_tokens, start + 1)
+
+        metadata = {"source_file": file_name} if file_name else {}
+        nodes = []
+        for start, end in windows:
+            start_char, end_char = offsets[start][0], offsets[end - 1][1]
+            nodes.append(TextNode(
+                text=text[start_char:end_char],
+                start_char_idx=start_char,
+                end_char_idx=end_char,
+                metadata=dict(metadata),
+            ))
+        return nodes
+
+    def _word_boundary(self, offsets: List, start: int, end: int) -> int:
+        """Recule la fin de fenêtre pour ne pas couper un mot (sous-tokens contigus)."""
+        candidate = end
+        while (
+            candidate < len(offsets)
+            and candidate - start > self.min_tokens
+            and offsets[candidate][0] == offsets[candidate - 1][1]
+        ):
+            candidate -= 1
+        return candidate if candidate - start > self.min_tokens else end
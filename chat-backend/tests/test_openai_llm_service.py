@@ -0,0 +1,193 @@
+"""
+Tests du service de génération compatible OpenAI, contre un serveur simulé
+(httpx.MockTransport) : nouvelles tentatives, erreurs, streaming SSE et annulation.
+"""
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services.implementations import openai_llm_service
+from app.services.implementations.openai_llm_service import OpenAiLlmService
+
+
+class StubServer:
+    """Serveur /completions simulé : rejoue une réponse (ou une exception) par requête reçue."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(json.loads(request.content))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def completion(text: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"text": text}]})
+
+
+def sse(*events: str) -> httpx.Response:
+    body = "".join(f"{event}\n\n" for event in events)
+    return httpx.Response(200, content=body.encode(), headers={"Content-Type": "text/event-stream"})
+
+
+def delta(text: str) -> str:
+    return "data: " + json.dumps({"choices": [{"text": text}]})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Délais d'attente demandés entre les tentatives (sans attendre réellement)."""
+    recorded = []
+    monkeypatch.setattr(openai_llm_service.time, "sleep", recorded.append)
+    return recorded
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    monkeypatch.setattr(openai_llm_service, "OPENAI_MAX_RETRIES", 2)
+    monkeypatch.setattr(openai_llm_service, "OPENAI_RETRY_BACKOFF", 0.5)
+    monkeypatch.setattr(openai_llm_service, "LLM_RETRY_AFTER", 7)
+    created = []
+
+    def factory(server: StubServer) -> OpenAiLlmService:
+        OpenAiLlmService._instance = None
+        OpenAiLlmService._client = None
+        service = OpenAiLlmService()
+        service._client.close()
+        OpenAiLlmService._client = httpx.Client(base_url="http://stub/v1",
+                                                transport=httpx.MockTransport(server))
+        created.append(service)
+        return service
+
+    yield factory
+    for service in created:
+        service.shutdown()
+    OpenAiLlmService._instance = None
+    OpenAiLlmService._client = None
+
+
+def test_retries_transient_errors_with_jittered_backoff(make_service, sleeps, monkeypatch):
+    bounds = []
+
+    def uniform(low, high):
+        bounds.append((low, high))
+        return high / 2
+
+    monkeypatch.setattr(openai_llm_service.random, "uniform", uniform)
+    server = StubServer(httpx.ConnectError("refused"), httpx.Response(503), completion("Étape 1"))
+    service = make_service(server)
+
+    assert service.generate_response("prompt") == "Étape 1"
+    # Jitter complet : délai tiré dans [0, backoff * 2^tentative]
+    assert bounds == [(0, 0.5), (0, 1.0)]
+    assert sleeps == [0.25, 0.5]
+    assert len(server.requests) == 3
+    assert service.get_scheduler_stats()["retries"] == 2
+
+
+def test_retry_after_from_server_is_honoured(make_service, sleeps):
+    server = StubServer(httpx.Response(429, headers={"Retry-After": "2"}), completion("ok"))
+    service = make_service(server)
+
+    assert service.generate_response("prompt") == "ok"
+    assert sleeps == [2.0]
+
+
+@pytest.mark.parametrize("status_code", [429, 503])
+def test_exhausted_retries_map_to_http_exception(make_service, sleeps, status_code):
+    server = StubServer(*[httpx.Response(status_code, headers={"Retry-After": "3"}) for _ in range(3)])
+    service = make_service(server)
+
+    with pytest.raises(HTTPException) as error:
+        service.generate_response("prompt")
+    assert error.value.status_code == status_code
+    assert error.value.headers == {"Retry-After": "3"}
+    assert len(server.requests) == 3
+    assert service.get_scheduler_stats()["failures"] == 1
+
+
+def test_unreachable_server_maps_to_503(make_service, sleeps):
+    server = StubServer(*[httpx.ConnectError("refused") for _ in range(3)])
+    service = make_service(server)
+
+    with pytest.raises(HTTPException) as error:
+        service.generate_response("prompt")
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "7"}
+
+
+def test_client_errors_are_not_retried(make_service, sleeps):
+    server = StubServer(httpx.Response(400, text="prompt trop long"))
+    service = make_service(server)
+
+    with pytest.raises(HTTPException) as error:
+        service.generate_response("prompt")
+    assert error.value.status_code == 502
+    assert sleeps == []
+
+
+def test_malformed_completion_maps_to_502(make_service, sleeps):
+    server = StubServer(httpx.Response(200, json={"choices": []}))
+    service = make_service(server)
+
+    with pytest.raises(HTTPException) as error:
+        service.generate_response("prompt")
+    assert error.value.status_code == 502
+
+
+def test_stream_parses_sse_deltas_until_done(make_service, sleeps):
+    server = StubServer(sse(
+        ": commentaire ignoré",
+        delta("1. Ouvrir "),
+        "data: " + json.dumps({"choices": [{"text": None}]}),
+        delta("le panneau"),
+        "data: [DONE]",
+        delta(" jamais lu"),
+    ))
+    service = make_service(server)
+
+    fragments = list(service.stream_with_context("Comment installer ?", ["chunk"], lambda: False))
+
+    assert "".join(fragments) == "1. Ouvrir le panneau"
+    assert server.requests[0]["stream"] is True
+    assert "Comment installer ?" in server.requests[0]["prompt"]
+    assert service.get_scheduler_stats()["in_flight"] == 0
+
+
+def test_stream_error_event_maps_to_502(make_service, sleeps):
+    server = StubServer(sse(delta("début"), "data: " + json.dumps({"error": "out of memory"})))
+    service = make_service(server)
+
+    with pytest.raises(HTTPException) as error:
+        list(service.stream_with_context("question", ["chunk"], lambda: False))
+    assert error.value.status_code == 502
+
+
+def test_stream_stops_when_cancelled(make_service, sleeps):
+    server = StubServer(sse(delta("Étape 1. "), delta("Étape 2. "), delta("Étape 3."), "data: [DONE]"))
+    service = make_service(server)
+    received = []
+
+    fragments = service.stream_with_context("question", ["chunk"], lambda: len(received) >= 1)
+    for fragment in fragments:
+        received.append(fragment)
+
+    assert received == ["Étape 1."]
+    assert service.get_scheduler_stats()["in_flight"] == 0
+
+
+def test_closing_the_stream_releases_the_slot(make_service, sleeps):
+    server = StubServer(sse(delta("Étape 1. "), delta("Étape 2."), "data: [DONE]"))
+    service = make_service(server)
+
+    fragments = service.stream_with_context("question", ["chunk"], lambda: False)
+    assert next(fragments) == "Étape 1."
+    assert service.get_scheduler_stats()["in_flight"] == 1
+    fragments.close()
+    assert service.get_scheduler_stats()["in_flight"] == 0